@@ -0,0 +1,75 @@
+import random
+import time
+
+from typecraft_python.alignment.gale_church import align_sentence_lengths, align_sentences, align_phrases
+
+
+def _bead_sizes(alignment):
+    return [(len(source), len(target)) for source, target in alignment]
+
+
+def test_align_sentence_lengths_one_to_one():
+    alignment = align_sentence_lengths([10, 50, 20], [11, 48, 22])
+
+    assert [(list(source), list(target)) for source, target in alignment] == [([0], [0]), ([1], [1]), ([2], [2])]
+
+
+def test_align_sentence_lengths_finds_merged_and_split_sentences():
+    alignment = align_sentence_lengths([40, 20, 20, 60, 30], [40, 41, 30, 30, 30])
+
+    assert _bead_sizes(alignment) == [(1, 1), (2, 1), (1, 2), (1, 1)]
+
+
+def test_align_sentence_lengths_covers_all_sentences_in_order():
+    generator = random.Random(0)
+    source = [generator.randint(1, 100) for _ in range(300)]
+    target = [generator.randint(1, 100) for _ in range(280)]
+
+    alignment = align_sentence_lengths(source, target, band=10)
+
+    assert [i for source_indices, _ in alignment for i in source_indices] == list(range(300))
+    assert [j for _, target_indices in alignment for j in target_indices] == list(range(280))
+
+
+def test_align_sentence_lengths_many_target_sentences_per_source_sentence():
+    alignment = align_sentence_lengths([10], [10] * 7, band=2)
+
+    assert sum(len(target) for _, target in alignment) == 7
+
+
+def test_align_sentence_lengths_empty():
+    assert align_sentence_lengths([], []) == []
+    assert _bead_sizes(align_sentence_lengths([5, 5], [])) == [(1, 0), (1, 0)]
+    assert _bead_sizes(align_sentence_lengths([], [5])) == [(0, 1)]
+
+
+def test_align_sentence_lengths_is_fast():
+    generator = random.Random(1)
+    source = [generator.randint(10, 200) for _ in range(5000)]
+    target = [int(length * 1.2) for length in source]
+
+    start = time.time()
+    alignment = align_sentence_lengths(source, target)
+
+    assert time.time() - start < 2
+    assert _bead_sizes(alignment) == [(1, 1)] * 5000
+
+
+def test_align_sentences():
+    source = ["Hello there.", "How are you doing today, my friend?", "Fine."]
+    target = ["Hei.", "Hallo der.", "Hvordan har du det i dag, min venn?", "Bra."]
+
+    assert align_sentences(source, target) == [
+        ("Hello there.", "Hei. Hallo der."),
+        ("How are you doing today, my friend?", "Hvordan har du det i dag, min venn?"),
+        ("Fine.", "Bra.")
+    ]
+
+
+def test_align_phrases():
+    phrases = align_phrases(["One sentence.", "Another sentence."], ["En setning.", "En annen setning."])
+
+    assert [(phrase.phrase, phrase.translation) for phrase in phrases] == [
+        ("One sentence.", "En setning."),
+        ("Another sentence.", "En annen setning.")
+    ]
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import random
+
+import numpy as np
+
+from typecraft_python.alignment.ibm_model1 import align_words, train_model1, tokenize_translation, NULL_LINK
+from typecraft_python.core.models import Corpus, Phrase, Text
+from typecraft_python.parsing.convenience import words_to_phrase
+
+
+def _create_phrase(words, translation):
+    phrase = words_to_phrase(words.split())
+    phrase.translation = translation
+    return phrase
+
+
+def _create_text():
+    return Text(phrases=[
+        _create_phrase("das Haus", "the house"),
+        _create_phrase("das Buch", "the book"),
+        _create_phrase("ein Buch", "a book"),
+        _create_phrase("ein Haus ist klein", "a house is small."),
+        _create_phrase("das Haus ist klein", "The house is small"),
+    ])
+
+
+def test_tokenize_translation():
+    assert tokenize_translation(u"The house, it's small.") == \
+        [u"The", u"house", u",", u"it", u"'", u"s", u"small", u"."]
+
+
+def test_align_words():
+    alignments = align_words(_create_text(), iterations=10)
+
+    assert len(alignments) == 5
+    assert [(word.word, token) for word, token in alignments.iter_aligned_words(0)] == [
+        ("das", "the"), ("Haus", "house")
+    ]
+    assert [(word.word, token) for word, token in alignments.iter_aligned_words(3)][:3] == [
+        ("ein", "a"), ("Haus", "house"), ("ist", "is")
+    ]
+    assert list(alignments.get_links(2)) == [0, 1]
+
+
+def test_align_words_links_are_flat_and_linked_to_words():
+    text = _create_text()
+    corpus = Corpus()
+    corpus.texts.append(text)
+    alignments = align_words(corpus)
+
+    assert alignments.links.dtype == np.int32
+    assert len(alignments.links) == sum(len(phrase.words) for phrase in text.phrases)
+    assert alignments.phrases[4].words[0] is text.phrases[4].words[0]
+
+
+def test_align_words_phrases_without_words_or_translation():
+    text = _create_text()
+    text.phrases.append(_create_phrase(u"ohne Übersetzung", u""))
+    text.phrases.append(Phrase(phrase="no words", translation=u"keine Wörter"))
+
+    alignments = align_words(text)
+
+    assert list(alignments.get_links(5)) == [NULL_LINK, NULL_LINK]
+    assert list(alignments.get_links(6)) == []
+
+
+def test_align_words_empty():
+    alignments = align_words(Text())
+
+    assert len(alignments) == 0
+    assert len(alignments.links) == 0
+
+
+def test_align_words_no_phrase_has_words_and_translation():
+    text = Text(phrases=[_create_phrase(u"ohne Übersetzung", u""), Phrase(phrase="no words", translation=u"Wörter")])
+
+    alignments = align_words(text)
+
+    assert list(alignments.get_links(0)) == [NULL_LINK, NULL_LINK]
+    assert list(alignments.get_links(1)) == []
+
+
+def test_train_model1_chunks_give_same_model():
+    generator = random.Random(0)
+    pairs = []
+    for _ in range(200):
+        ids = [generator.randint(0, 50) for _ in range(generator.randint(1, 8))]
+        pairs.append((["w%d" % i for i in ids], ["t%d" % i for i in reversed(ids)]))
+
+    model, links = train_model1(pairs, iterations=5, chunk_size=1000)
+    chunked_model, chunked_links = train_model1(pairs, iterations=5, chunk_size=7)
+
+    assert np.array_equal(links, chunked_links)
+    assert np.allclose(model.probabilities, chunked_model.probabilities)
+
+    # Every word is aligned to its reversed position, and the model agrees
+    offset = 0
+    for words, tokens in pairs:
+        assert list(links[offset:offset + len(words)]) == list(model.align(words, tokens))
+        offset += len(words)
+    assert model.get_probability("w1", "t1") > 0.5
+    assert model.get_probability("w1", "unseen") == 0.0
+
+
+def test_train_model1_probabilities_sum_to_one():
+    model, _ = train_model1([(["a", "b"], ["x", "y"]), (["a"], ["x"])], iterations=3)
+
+    for token in [None, "x", "y"]:
+        total = sum(model.get_probability(word, token) for word in ["a", "b"])
+        assert abs(total - 1.0) < 1e-9
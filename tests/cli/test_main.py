@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+
+from click.testing import CliRunner
+
+from typecraft_python.cli import main as cli_main
+from typecraft_python.cli.main import main
+from typecraft_python.parsing.parser import Parser
+from typecraft_python.util import TAGGER_REGISTRY, register_tagger
+from tests.test_util import LanguageTagger
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+file_path = os.path.join(BASE_DIR, 'parsing/resources/xml_1_test.xml')
+file_path_2 = os.path.join(BASE_DIR, 'parsing/resources/xml_2_test.xml')
+
+
+def _invoke(args):
+    result = CliRunner().invoke(main, args, catch_exceptions=False)
+    assert result.exit_code == 0
+    return result.output
+
+
+class TestXml(object):
+
+    def setup_method(self):
+        LanguageTagger.instances = []
+        register_tagger('language', LanguageTagger)
+        cli_main._taggers.clear()
+
+    def teardown_method(self):
+        TAGGER_REGISTRY.pop('language', None)
+
+    def test_passes_texts_through(self):
+        texts = Parser.parse(_invoke(['xml', file_path, file_path_2]))
+
+        assert len(texts) == len(Parser.parse_file(file_path)) + len(Parser.parse_file(file_path_2))
+
+    def test_tag_uses_one_tagger_per_language(self):
+        texts = Parser.parse(_invoke(['xml', '--tag', '--tagger', 'language', file_path, file_path_2]))
+        languages = set(text.language for text in texts)
+
+        assert len(LanguageTagger.instances) == len(languages)
+        for text in texts:
+            for phrase in text:
+                assert all(word.pos == text.language for word in phrase)
+
+    def test_split(self):
+        texts = Parser.parse(_invoke(['xml', '--split', '3', file_path]))
+
+        assert len(texts) == 3 * len(Parser.parse_file(file_path))
+
+    def test_stream_output_equals_non_stream_output(self):
+        args = ['xml', '--tag', '--tagger', 'language', '--split', '2', '--meta', 'Annotator', 'Me', '--title', 'T',
+                file_path, file_path_2]
+
+        assert _invoke(args + ['--stream']).rstrip() == _invoke(args).rstrip()
+
+    def test_jobs_output_equals_single_process_output(self):
+        args = ['xml', '--tag', '--tagger', 'language', '--split', '2', file_path, file_path_2]
+
+        assert _invoke(args + ['--jobs', '2']) == _invoke(args)
+
+    def test_stream_with_jobs_output_equals_single_process_output(self):
+        args = ['xml', '--tag', '--tagger', 'language', file_path, file_path_2]
+
+        assert _invoke(args + ['--stream', '--jobs', '2']).rstrip() == _invoke(args).rstrip()
+
+    def test_split_into_shards(self, tmpdir):
+        shard_dir = str(tmpdir.join('shards'))
+        for stream in ['--stream', '--no-stream']:
+            _invoke(['xml', stream, '--split', '3', '--shard-dir', shard_dir, '--jobs', '2', file_path])
+
+            with open(os.path.join(shard_dir, 'manifest.json')) as _file:
+                manifest = json.load(_file)
+            assert [shard['file'] for shard in manifest['shards']] == ['00001.xml', '00002.xml', '00003.xml']
+            assert all(len(Parser.parse_file(os.path.join(shard_dir, shard['file']))) == 1
+                       for shard in manifest['shards'])
+
+    def test_compressed_input_and_output(self, tmpdir):
+        compressed_input = str(tmpdir.join('input.xml.gz'))
+        Parser.write_to_file(compressed_input, Parser.parse_file(file_path))
+        compressed_output = str(tmpdir.join('output.xml.bz2'))
+
+        for stream in ['--stream', '--no-stream']:
+            _invoke(['xml', stream, compressed_input, '-o', compressed_output])
+
+            assert len(Parser.parse_file(compressed_output)) == len(Parser.parse_file(file_path))
+
+    def test_stream_with_merge_should_throw(self):
+        result = CliRunner().invoke(main, ['xml', '--stream', '--merge', file_path])
+
+        assert result.exit_code != 0
+
+
+class TestRaw(object):
+
+    def test_paragraph_chunks(self):
+        inputs = [io.StringIO(u"a\nb\n\nc\n\nd"), io.StringIO(u"e\n")]
+        chunks = list(cli_main._iter_paragraph_chunks(inputs, chunk_size=3))
+
+        assert chunks == [u"a\nb\n\n", u"c\n\n", u"d\ne\n"]
+        assert "".join(cli_main._iter_paragraph_chunks(inputs)) == u""
+
+    def test_paragraph_chunks_without_paragraph_breaks(self):
+        lines = u"".join(u"Sentence number %d.\n" % number for number in range(100))
+        chunks = list(cli_main._iter_paragraph_chunks([io.StringIO(lines)], chunk_size=50))
+
+        assert len(chunks) > 1
+        assert all(len(chunk) < cli_main.MAX_CHUNK_FACTOR * 50 + 30 for chunk in chunks)
+        assert u"".join(chunks) == lines
+
+    def test_without_sentence_tokenization_input_is_one_phrase(self, tmpdir):
+        path = tmpdir.join('input.txt')
+        path.write(u"First paragraph.\n\nSecond paragraph.")
+        texts = Parser.parse(_invoke(['raw', '--no-sent-tokenize', '--no-tokenize', '--no-tag', '--title', 'T',
+                                      '--meta', 'Annotator', 'Me', str(path)]))
+
+        assert len(texts) == 1
+        assert texts[0].title == 'T'
+        assert texts[0].metadata == {'Annotator': 'Me'}
+        assert [phrase.phrase for phrase in texts[0]] == [u"First paragraph.\n\nSecond paragraph.\n"]
+
+
+class TestStats(object):
+
+    def test_ntexts(self):
+        assert _invoke(['ntexts', file_path]).strip() == str(len(Parser.parse_file(file_path)))
+
+    def test_stats_json(self):
+        statistics = json.loads(_invoke(['stats', '--json', file_path_2]))
+
+        assert statistics['texts'] == 1
+        assert statistics['phrases'] == len(Parser.parse_file(file_path_2)[0].phrases)
+
+    def test_stats_table(self):
+        lines = _invoke(['stats', file_path_2]).splitlines()
+
+        assert lines[0].split("\t") == ['language', 'texts', 'phrases', 'words', 'morphemes', 'glosses']
+        assert lines[2].startswith('total\t1\t')
+
+
+class TestCatAndShard(object):
+
+    def test_cat(self):
+        texts = Parser.parse(_invoke(['cat', file_path, file_path_2]))
+
+        assert len(texts) == len(Parser.parse_file(file_path)) + len(Parser.parse_file(file_path_2))
+
+    def test_shard(self, tmpdir):
+        shard_dir = str(tmpdir.join('shards'))
+        _invoke(['shard', '--shard-dir', shard_dir, file_path, file_path_2])
+
+        assert sorted(os.listdir(shard_dir)) == ['00001.xml', '00002.xml', 'manifest.json']
+
+
+class TestHeadAndSample(object):
+
+    def test_head(self):
+        texts = Parser.parse(_invoke(['head', '-n', '3', '--phrases', file_path]))
+
+        assert len(texts) == 1
+        assert len(texts[0].phrases) == 3
+
+    def test_sample_with_index(self, tmpdir):
+        path = str(tmpdir.join('corpus.xml'))
+        Parser.write_to_file(path, Parser.parse_file(file_path_2))
+        without_index = _invoke(['sample', '-n', '5', '--seed', '1', path])
+        _invoke(['index', path])
+
+        assert os.path.exists(path + '.index.json')
+        assert _invoke(['sample', '-n', '5', '--seed', '1', path]) == without_index
+        assert len(Parser.parse(without_index)[0].phrases) == 5
+
+    def test_inverted_index(self, tmpdir):
+        path = str(tmpdir.join('corpus.xml'))
+        Parser.write_to_file(path, Parser.parse_file(file_path_2))
+        _invoke(['index', '--inverted', path])
+
+        assert os.path.exists(path + '.index.json')
+        assert os.path.exists(path + '.search.npz')
+        assert os.path.exists(path + '.search.json')
+
+
+class TestKwic(object):
+
+    def test_kwic(self):
+        lines = _invoke(['kwic', '--tsv', '-w', '2', 'pos:V AND gloss:3SG', file_path_2]).splitlines()
+
+        assert len(lines) > 0
+        for line in lines:
+            text_number, phrase_number, left, keyword, right = line.split(u"\t")
+            assert len(left.split()) <= 2 and len(right.split()) <= 2
+
+    def test_kwic_with_inverted_index(self, tmpdir):
+        path = str(tmpdir.join('corpus.xml'))
+        Parser.write_to_file(path, Parser.parse_file(file_path_2))
+        without_index = _invoke(['kwic', '--sort', 'left', 'lemma:na', path])
+        _invoke(['index', '--inverted', path])
+
+        assert _invoke(['kwic', '--sort', 'left', 'lemma:na', path]) == without_index
+        assert len(without_index.splitlines()) > 1
+
+
+class TestQuery(object):
+
+    def test_query(self):
+        lines = _invoke(['query', '[pos="N"] [pos="V"]', file_path_2]).splitlines()
+
+        assert len(lines) > 0
+        for line in lines:
+            text_number, phrase_number, start, end, words = line.split(u"\t")
+            assert int(end) - int(start) == 2 == len(words.split())
+
+
+class TestGrep(object):
+
+    def test_grep(self):
+        lines = _invoke(['grep', u'ɔ', file_path_2]).splitlines()
+
+        assert len(lines) > 0
+        for line in lines:
+            text_number, phrase_number, field, offset, value = line.split(u"\t")
+            assert value[int(offset):].startswith(u'ɔ')
+
+    def test_grep_with_suffix_array(self, tmpdir):
+        path = str(tmpdir.join('corpus.xml'))
+        Parser.write_to_file(path, Parser.parse_file(file_path_2))
+        without_index = _invoke(['grep', 'na', path])
+        prefixes = _invoke(['grep', '--prefix', 'na', path])
+        count = _invoke(['grep', '-c', 'na', path])
+        _invoke(['index', '--suffix-array', path])
+
+        assert os.path.exists(path + '.suffix')
+        assert _invoke(['grep', 'na', path]) == without_index
+        assert _invoke(['grep', '--prefix', 'na', path]) == prefixes
+        assert _invoke(['grep', '-c', 'na', path]) == count == u"%d\n" % len(without_index.splitlines())
+
+
+class TestSortAndShuffle(object):
+
+    def test_sort(self):
+        texts = Parser.parse(_invoke(['sort', '--key', 'characters', '--max-memory', '2000', file_path_2]))
+        lengths = [len(phrase.phrase) for phrase in texts[0]]
+
+        assert lengths == sorted(lengths)
+        assert len(lengths) == len(Parser.parse_file(file_path_2)[0].phrases)
+
+    def test_shuffle(self):
+        output = _invoke(['shuffle', '--seed', '3', file_path_2])
+
+        assert output == _invoke(['shuffle', '--seed', '3', file_path_2])
+        assert len(Parser.parse(output)[0].phrases) == len(Parser.parse_file(file_path_2)[0].phrases)
+
+
+class TestPar(object):
+
+    def _write(self, tmpdir, name, contents):
+        path = tmpdir.join(name)
+        path.write_text(contents, encoding='utf-8')
+        return str(path)
+
+    def _phrases(self, output):
+        return [(phrase.phrase, phrase.translation) for phrase in Parser.parse(output)[0]]
+
+    def test_formats(self, tmpdir):
+        expected = [(u"First.", u"Første."), (u"Second.", u"Andre.")]
+        continuous = self._write(tmpdir, 'continuous.txt', u"First.\nFørste.\n\nSecond.\nAndre.")
+        tsv = self._write(tmpdir, 'parallel.tsv', u"First.\tFørste.\nSecond.\tAndre.\n")
+        english = self._write(tmpdir, 'en.txt', u"First.\nSecond.\n")
+        norwegian = self._write(tmpdir, 'nb.txt', u"Første.\nAndre.\n")
+
+        assert self._phrases(_invoke(['par', continuous])) == expected
+        assert self._phrases(_invoke(['par', '--format', 'tsv', tsv])) == expected
+        assert self._phrases(_invoke(['par', '--format', 'files', english, norwegian])) == expected
+
+    def test_align(self, tmpdir):
+        english = self._write(tmpdir, 'en.txt', u"Hello there.\nHow are you doing today, my friend?\nFine.\n")
+        norwegian = self._write(tmpdir, 'nb.txt', u"Hei.\nHallo der.\nHvordan har du det i dag, min venn?\nBra.\n")
+
+        assert self._phrases(_invoke(['par', '--format', 'files', '--align', english, norwegian])) == [
+            (u"Hello there.", u"Hei. Hallo der."),
+            (u"How are you doing today, my friend?", u"Hvordan har du det i dag, min venn?"),
+            (u"Fine.", u"Bra.")
+        ]
+
+    def test_align_requires_two_files(self, tmpdir):
+        english = self._write(tmpdir, 'en.txt', u"Hello there.\n")
+
+        result = CliRunner().invoke(main, ['par', '--align', english, english])
+
+        assert result.exit_code != 0
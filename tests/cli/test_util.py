@@ -0,0 +1,64 @@
+# coding: utf-8
+import io
+
+from typecraft_python.cli.util import write_to_stdout_or_file
+from typecraft_python.parsing.compression import open_input
+
+
+class _RecordingFile(io.BytesIO):
+
+    def __init__(self):
+        super(_RecordingFile, self).__init__()
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super(_RecordingFile, self).write(data)
+
+
+def test_write_bytes_to_file_object():
+    output = io.BytesIO()
+    write_to_stdout_or_file(b'<typecraft />', output)
+
+    assert output.getvalue() == b'<typecraft />'
+
+
+def test_write_chunks_and_strings():
+    output = io.BytesIO()
+    write_to_stdout_or_file(iter([b'<typecraft>', u'ɔ', b'</typecraft>']), output)
+
+    assert output.getvalue() == u'<typecraft>ɔ</typecraft>'.encode('utf-8')
+
+
+def test_write_to_text_file_object():
+    output = io.StringIO()
+    write_to_stdout_or_file(iter([b'<typecraft>', u'ɔ'.encode('utf-8')[:1], u'ɔ'.encode('utf-8')[1:], u'ɛ']), output)
+
+    assert output.getvalue() == u'<typecraft>ɔɛ'
+
+
+def test_write_to_text_file_with_earlier_writes(tmpdir):
+    path = str(tmpdir.join('output.txt'))
+    with io.open(path, 'w', encoding='utf-8') as _file:
+        _file.write(u'first\n')
+        write_to_stdout_or_file(u'second\n', _file)
+        _file.write(u'third\n')
+
+    with io.open(path, encoding='utf-8') as _file:
+        assert _file.read() == u'first\nsecond\nthird\n'
+
+
+def test_small_chunks_are_buffered():
+    output = _RecordingFile()
+    write_to_stdout_or_file((b'x' for _ in range(1000)), output)
+
+    assert output.getvalue() == b'x' * 1000
+    assert output.writes == 1
+
+
+def test_write_to_compressed_path(tmpdir):
+    path = str(tmpdir.join('output.xml.gz'))
+    write_to_stdout_or_file([b'a', b'b'], path)
+
+    with open_input(path) as _file:
+        assert _file.read() == b'ab'
@@ -0,0 +1,6 @@
+import sys
+
+# The asyncio integration, and its tests, use syntax of Python 3.6 and newer
+collect_ignore = []
+if sys.version_info < (3, 6):
+    collect_ignore.append('integrations/test_asynchronous.py')
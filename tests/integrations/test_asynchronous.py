@@ -0,0 +1,120 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from typecraft_python.core.interfaces import TypecraftTagger
+from typecraft_python.core.models import Text, Phrase
+from typecraft_python.integrations.asynchronous import AsyncTaggerPool, run_subprocess
+
+
+class SleepingTagger(TypecraftTagger):
+    """
+    A tagger which sleeps while tagging, and records how many calls run concurrently.
+    """
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+    instances = 0
+
+    def __init__(self):
+        with SleepingTagger.lock:
+            SleepingTagger.instances += 1
+
+    def tag_text(self, text, language='en'):
+        with SleepingTagger.lock:
+            SleepingTagger.running += 1
+            SleepingTagger.max_running = max(SleepingTagger.max_running, SleepingTagger.running)
+        time.sleep(float(text.title))
+        with SleepingTagger.lock:
+            SleepingTagger.running -= 1
+        text.language = language + "-tagged"
+        return text
+
+
+def _run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine) if sys.version_info < (3, 7) \
+        else asyncio.run(coroutine)
+
+
+def _collect(pool, texts, language=None):
+    async def collect():
+        return [text async for text in pool.tag_texts_async(texts, language)]
+    return _run(collect())
+
+
+class TestAsyncTaggerPool(object):
+
+    def setup_method(self):
+        SleepingTagger.running = 0
+        SleepingTagger.max_running = 0
+        SleepingTagger.instances = 0
+
+    def test_tag_texts_keeps_input_order(self):
+        pool = AsyncTaggerPool(SleepingTagger, max_concurrency=3)
+        texts = [Text(title=duration, language='en') for duration in ['0.05', '0.01', '0.03', '0', '0.02']]
+        tagged = _collect(pool, texts)
+        pool.close()
+
+        assert tagged == texts
+        assert all(text.language == 'en-tagged' for text in tagged)
+
+    def test_concurrency_is_bounded(self):
+        pool = AsyncTaggerPool(SleepingTagger, max_concurrency=2)
+        texts = [Text(title='0.02') for _ in range(8)]
+        _collect(pool, texts, language='de')
+        pool.close()
+
+        assert SleepingTagger.max_running <= 2
+        assert SleepingTagger.instances <= 2
+
+    def test_timeout(self):
+        pool = AsyncTaggerPool(SleepingTagger, max_concurrency=1, timeout=0.01)
+        text = Text(title='0.2', language='en')
+        with pytest.raises(asyncio.TimeoutError):
+            _run(pool.tag_text_async(text))
+        pool.close()
+
+        # The call kept running after the timeout, but tagged a copy
+        assert text.language == 'en'
+
+    def test_timeout_returns_tagged_copy(self):
+        pool = AsyncTaggerPool(SleepingTagger, timeout=10)
+        text = Text(title='0', language='en')
+        tagged = _run(pool.tag_text_async(text))
+        pool.close()
+
+        assert tagged is not text
+        assert tagged.language == 'en-tagged'
+
+    def test_tag_phrases_async(self):
+        class PhraseTagger(TypecraftTagger):
+            def tag_phrases(self, phrases, language='en'):
+                for phrase in phrases:
+                    phrase.comment = language
+                return phrases
+
+        pool = AsyncTaggerPool(PhraseTagger)
+        phrases = _run(pool.tag_phrases_async([Phrase("A"), Phrase("B")], 'nob'))
+        pool.close()
+
+        assert [phrase.comment for phrase in phrases] == ['nob', 'nob']
+
+
+class TestRunSubprocess(object):
+
+    def test_returns_stdout(self):
+        output = _run(run_subprocess([sys.executable, '-c', 'import sys; sys.stdout.write(sys.stdin.read())'],
+                                     input=b'hello'))
+        assert output == b'hello'
+
+    def test_non_zero_exit_should_throw(self):
+        with pytest.raises(subprocess.CalledProcessError):
+            _run(run_subprocess([sys.executable, '-c', 'import sys; sys.exit(3)']))
+
+    def test_timeout_kills_process(self):
+        with pytest.raises(asyncio.TimeoutError):
+            _run(run_subprocess([sys.executable, '-c', 'import time; time.sleep(10)'], timeout=0.2))
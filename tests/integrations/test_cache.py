@@ -0,0 +1,145 @@
+import os
+import tempfile
+
+from typecraft_python.core.interfaces import TypecraftTagger
+from typecraft_python.core.models import Morpheme
+from typecraft_python.integrations.cache import LRUCache, TaggingCache, CachedTagger
+from typecraft_python.parsing.convenience import words_to_phrase
+
+
+class CountingTagger(TypecraftTagger):
+    """
+    A tagger which tags every word with its length, and lemmatizes it to lower case.
+    """
+
+    def __init__(self):
+        self.tagged_phrases = 0
+
+    def tag_phrases(self, phrases, language='en'):
+        for phrase in phrases:
+            self.tagged_phrases += 1
+            for word in phrase:
+                word.pos = str(len(word.word))
+                word.add_morpheme(Morpheme(word.word, baseform=word.word.lower()))
+        return phrases
+
+
+class IpaTagger(CountingTagger):
+    """
+    A tagger which also sets the ipa and stem morpheme of every word.
+    """
+
+    def tag_phrases(self, phrases, language='en'):
+        super(IpaTagger, self).tag_phrases(phrases, language)
+        for phrase in phrases:
+            for word in phrase:
+                word.ipa = "/" + word.word.lower() + "/"
+                word.stem_morpheme = word.word.lower()
+        return phrases
+
+
+class TestLRUCache(object):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert len(cache) == 2
+
+    def test_get_missing_returns_default(self):
+        cache = LRUCache(2)
+        assert cache.get('a') is None
+        assert cache.get('a', 5) == 5
+
+
+class TestCachedTagger(object):
+
+    def test_repeated_phrases_are_tagged_once(self):
+        inner = CountingTagger()
+        tagger = CachedTagger(inner)
+        phrases = [words_to_phrase(["The", "Cat"]) for _ in range(5)]
+
+        tagger.tag_phrases(phrases)
+        tagger.tag_phrase(words_to_phrase(["The", "Cat"]))
+
+        assert inner.tagged_phrases == 1
+        for phrase in phrases:
+            assert phrase[0].pos == "3"
+            assert phrase[1].morphemes[0].baseform == "cat"
+
+    def test_counters(self):
+        tagger = CachedTagger(CountingTagger())
+        tagger.tag_phrase(words_to_phrase(["The", "Cat"]))
+        tagger.tag_phrase(words_to_phrase(["The", "Cat"]))
+        tagger.tag_phrase(words_to_phrase(["A", "Dog"]))
+
+        stats = tagger.cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 2
+        assert stats['memory_size'] == 2
+
+    def test_language_is_part_of_key(self):
+        inner = CountingTagger()
+        tagger = CachedTagger(inner)
+        tagger.tag_phrase(words_to_phrase(["The", "Cat"]), language='en')
+        tagger.tag_phrase(words_to_phrase(["The", "Cat"]), language='de')
+
+        assert inner.tagged_phrases == 2
+
+    def test_existing_morphemes_are_kept(self):
+        tagger = CachedTagger(CountingTagger())
+        tagger.tag_phrase(words_to_phrase(["The", "Cat"]))
+        phrase = words_to_phrase(["The", "Cat"])
+        phrase[1].add_morpheme(Morpheme("Cat", baseform="feline"))
+        tagger.tag_phrase(phrase)
+
+        assert len(phrase[1].morphemes) == 1
+        assert phrase[1].morphemes[0].baseform == "feline"
+        assert phrase[1].pos == "3"
+
+    def test_all_word_attributes_are_cached(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            cache = TaggingCache(path=path)
+            tagger = CachedTagger(IpaTagger(), cache)
+            expected = tagger.tag_phrase(words_to_phrase(["The", "Cat"])).to_dict()
+            memory_hit = tagger.tag_phrase(words_to_phrase(["The", "Cat"]))
+            cache.close()
+
+            cache = TaggingCache(path=path)
+            disk_hit = CachedTagger(IpaTagger(), cache).tag_phrase(words_to_phrase(["The", "Cat"]))
+            cache.close()
+
+            assert expected['words'][1]['ipa'] == "/cat/"
+            assert expected['words'][1]['stem_morpheme'] == "cat"
+            assert memory_hit.to_dict() == expected
+            assert disk_hit.to_dict() == expected
+            assert cache.disk_hits == 1
+        finally:
+            os.remove(path)
+
+    def test_disk_cache_persists(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            cache = TaggingCache(path=path)
+            CachedTagger(CountingTagger(), cache).tag_phrase(words_to_phrase(["The", "Cat"]))
+            cache.close()
+
+            inner = CountingTagger()
+            cache = TaggingCache(path=path)
+            phrase = CachedTagger(inner, cache).tag_phrase(words_to_phrase(["The", "Cat"]))
+            cache.close()
+
+            assert inner.tagged_phrases == 0
+            assert phrase[0].pos == "3"
+            assert cache.disk_hits == 1
+        finally:
+            os.remove(path)
@@ -0,0 +1,67 @@
+from typecraft_python.core.interfaces import TypecraftTagger
+from typecraft_python.core.models import Corpus, Text, Morpheme
+from typecraft_python.integrations.wordtypes import iter_words, collect_word_types, annotate_word_types
+from typecraft_python.parsing.convenience import words_to_phrase
+
+
+class CountingWordTagger(TypecraftTagger):
+
+    def __init__(self):
+        self.tagged_words = []
+
+    def tag_word(self, word, language='en'):
+        self.tagged_words.append(word.word)
+        word.pos = word.word.upper()
+        word.add_morpheme(Morpheme(word.word, baseform=word.word.lower()))
+        return word
+
+
+def _create_corpus():
+    corpus = Corpus()
+    corpus.texts.append(Text(phrases=[words_to_phrase(["The", "cat", "sat"]), words_to_phrase(["the", "cat"])]))
+    corpus.texts.append(Text(phrases=[words_to_phrase(["The", "dog"])]))
+    return corpus
+
+
+class TestWordTypes(object):
+
+    def test_iter_words(self):
+        corpus = _create_corpus()
+
+        assert [word.word for word in iter_words(corpus)] == ["The", "cat", "sat", "the", "cat", "The", "dog"]
+        assert [word.word for word in iter_words(corpus[1])] == ["The", "dog"]
+        assert [word.word for word in iter_words(corpus.texts)] == [word.word for word in iter_words(corpus)]
+
+    def test_collect_word_types(self):
+        word_types = collect_word_types(_create_corpus())
+
+        assert list(word_types.keys()) == ["The", "cat", "sat", "the", "dog"]
+        assert len(word_types["The"]) == 2
+        assert len(word_types["cat"]) == 2
+
+    def test_collect_word_types_with_key(self):
+        word_types = collect_word_types(_create_corpus(), key=lambda word: word.word.lower())
+
+        assert list(word_types.keys()) == ["the", "cat", "sat", "dog"]
+        assert len(word_types["the"]) == 3
+
+    def test_annotate_word_types_tags_each_type_once(self):
+        corpus = _create_corpus()
+        tagger = CountingWordTagger()
+        num_types = annotate_word_types(corpus, tagger)
+
+        assert num_types == 5
+        assert tagger.tagged_words == ["The", "cat", "sat", "the", "dog"]
+        for word in iter_words(corpus):
+            assert word.pos == word.word.upper()
+            assert len(word.morphemes) == 1
+            assert word.morphemes[0].baseform == word.word.lower()
+
+    def test_annotate_word_types_keeps_existing_morphemes(self):
+        phrase = words_to_phrase(["cat", "cat"])
+        phrase[0].add_morpheme(Morpheme("cat", baseform="feline"))
+        annotate_word_types(phrase, CountingWordTagger())
+
+        assert phrase[0].morphemes[0].baseform == "feline"
+        assert phrase[1].morphemes[0].baseform == "cat"
+        assert phrase[0].morphemes[0] is not phrase[1].morphemes[0]
@@ -0,0 +1,113 @@
+import io
+import os
+
+import pytest
+
+from typecraft_python.parsing.compression import open_input, open_output, detect_compression, \
+    get_compression_from_path, ThreadedReader
+from typecraft_python.parsing.parser import Parser
+from typecraft_python.parsing.statistics import collect_statistics
+from typecraft_python.parsing.streaming import iter_texts
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+file_path = os.path.join(BASE_DIR, 'parsing/resources/xml_2_test.xml')
+
+with open(file_path, 'rb') as _file:
+    document = _file.read()
+
+
+class _UnseekableReader(io.RawIOBase):
+    """
+    Reads a few bytes at a time, like a pipe.
+    """
+
+    def __init__(self, data):
+        self._data = data
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._data[:min(len(buffer), 3)]
+        self._data = self._data[len(data):]
+        buffer[:len(data)] = data
+        return len(data)
+
+
+@pytest.fixture(params=['', '.gz', '.bz2', '.xz'])
+def compressed_path(request, tmpdir):
+    path = str(tmpdir.join('corpus.xml' + request.param))
+    with open_output(path) as _file:
+        _file.write(document)
+    return path
+
+
+def test_get_compression_from_path():
+    assert get_compression_from_path('corpus.xml.GZ') == 'gzip'
+    assert get_compression_from_path('corpus.xml.bz2') == 'bz2'
+    assert get_compression_from_path('corpus.xml') is None
+
+
+def test_roundtrip(compressed_path):
+    with open_input(compressed_path) as _file:
+        assert _file.read() == document
+
+
+def test_output_is_compressed(compressed_path):
+    with open(compressed_path, 'rb') as _file:
+        compression = detect_compression(_file.read(6))
+
+    assert compression == get_compression_from_path(compressed_path)
+
+
+def test_compression_is_detected_from_contents(compressed_path, tmpdir):
+    misnamed_path = str(tmpdir.join('misnamed'))
+    os.rename(compressed_path, misnamed_path)
+
+    with open_input(misnamed_path) as _file:
+        assert _file.read() == document
+
+
+def test_unseekable_file_object(compressed_path):
+    with open(compressed_path, 'rb') as _file:
+        data = _file.read()
+
+    with open_input(_UnseekableReader(data)) as _file:
+        assert _file.read() == document
+
+
+def test_empty_input():
+    assert open_input(io.BytesIO(b'')).read() == b''
+
+
+def test_closing_threaded_reader_early():
+    reader = ThreadedReader(io.BytesIO(b'x' * (10 * 1024 * 1024)), max_blocks=1)
+    assert reader.read(1) == b'x'
+    reader.close()
+
+    assert reader.closed
+
+
+def test_parser_and_streaming_read_compressed_files(compressed_path):
+    texts = Parser.parse_file(compressed_path)
+
+    assert [text.to_dict() for text in iter_texts(compressed_path)] == [text.to_dict() for text in texts]
+    assert collect_statistics(compressed_path)['phrases'] == len(texts[0].phrases)
+
+
+def test_write_to_compressed_file(tmpdir):
+    texts = Parser.parse(document)
+    path = str(tmpdir.join('output.xml.gz'))
+    Parser.write_to_file(path, texts)
+
+    assert Parser.parse_file(path)[0].to_dict() == texts[0].to_dict()
+
+
+def test_text_file_object():
+    text_file = io.StringIO(document.decode('utf-8'))
+    texts = Parser.parse_file(text_file)
+
+    assert not text_file.closed
+    assert [text.to_dict() for text in texts] == [text.to_dict() for text in Parser.parse(document)]
+    assert len(list(iter_texts(io.StringIO(document.decode('utf-8'))))) == len(texts)
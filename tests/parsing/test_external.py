@@ -0,0 +1,70 @@
+import io
+
+from typecraft_python.core.models import Text
+from typecraft_python.parsing.convenience import words_to_phrase
+from typecraft_python.parsing import external
+from typecraft_python.parsing.external import sort_phrases, shuffle_phrases
+from typecraft_python.parsing.parser import Parser
+
+
+def _create_document(num_phrases):
+    half = num_phrases // 2
+    first = [words_to_phrase(["w"] * ((i * 7) % 5) + [str(i)]) for i in range(half)]
+    second = [words_to_phrase(["w"] * ((i * 3) % 4) + [str(i)]) for i in range(half, num_phrases)]
+    texts = [Text(title="First", language="nob", phrases=first), Text(title="Second", phrases=second)]
+    return io.BytesIO(Parser.write(texts))
+
+
+def _run(function, num_phrases, **kwargs):
+    output = io.BytesIO()
+    num_written = function(_create_document(num_phrases), output, **kwargs)
+    texts = Parser.parse(output.getvalue())
+    assert num_written == len(texts[0].phrases)
+    return texts
+
+
+def _phrases(texts):
+    return [phrase.phrase for phrase in texts[0]]
+
+
+def test_sort_in_memory_and_with_runs_are_equal():
+    in_memory = _run(sort_phrases, 60)
+    with_runs = _run(sort_phrases, 60, max_memory=500)
+    lengths = [len(phrase.words) for phrase in in_memory[0]]
+
+    assert len(in_memory) == 1
+    assert in_memory[0].title == "First"
+    assert in_memory[0].language == "nob"
+    assert lengths == sorted(lengths)
+    assert _phrases(with_runs) == _phrases(in_memory)
+
+
+def test_sort_merges_many_runs_in_passes(monkeypatch):
+    monkeypatch.setattr(external, 'MAX_MERGE_RUNS', 3)
+    in_memory = _run(sort_phrases, 60)
+    with_runs = _run(sort_phrases, 60, max_memory=200)
+
+    assert _phrases(with_runs) == _phrases(in_memory)
+
+
+def test_sort_is_stable():
+    texts = _run(sort_phrases, 60, key='words', max_memory=500)
+    for first, second in zip(texts[0].phrases, texts[0].phrases[1:]):
+        if len(first.words) == len(second.words):
+            assert int(first.words[-1].word) < int(second.words[-1].word)
+
+
+def test_shuffle_is_a_seeded_permutation():
+    for max_memory in [10 ** 9, 500]:
+        shuffled = _phrases(_run(shuffle_phrases, 60, seed=1, max_memory=max_memory))
+
+        assert sorted(shuffled) == sorted(_phrases(_run(sort_phrases, 60)))
+        assert shuffled != _phrases(_run(sort_phrases, 60, key='phrase'))
+        assert shuffled == _phrases(_run(shuffle_phrases, 60, seed=1, max_memory=max_memory))
+
+
+def test_empty_document():
+    output = io.BytesIO()
+
+    assert sort_phrases(io.BytesIO(Parser.write([])), output) == 0
+    assert Parser.parse(output.getvalue()) == []
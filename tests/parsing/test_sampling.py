@@ -0,0 +1,121 @@
+# coding: utf-8
+import io
+import os
+
+from typecraft_python.core.models import Text, Phrase
+from typecraft_python.parsing.index import write_offset_index, load_offset_index, build_offset_index, \
+    iter_indexed_texts
+from typecraft_python.parsing.parser import Parser
+from typecraft_python.parsing.sampling import head_texts, head_phrases, reservoir_sample, sample_phrases
+
+
+def _create_texts(num_texts, phrases_per_text):
+    return [
+        Text(title=str(i), phrases=[Phrase("%d-%d" % (i, j)) for j in range(phrases_per_text)])
+        for i in range(num_texts)
+    ]
+
+
+def _phrases(texts):
+    return [phrase.phrase for text in texts for phrase in text]
+
+
+def _write(tmpdir, texts, file_name='corpus.xml'):
+    path = str(tmpdir.join(file_name))
+    Parser.write_to_file(path, texts)
+    return path
+
+
+def test_head_texts_stops_reading():
+    document = Parser.write(_create_texts(3, 1))
+    # Cut the document off in the middle of the second text
+    truncated = io.BytesIO(document[:document.index(b'</text>') + 20])
+
+    assert [text.title for text in head_texts(truncated, 1)] == ['0']
+
+
+def test_head_phrases():
+    texts = list(head_phrases(io.BytesIO(Parser.write(_create_texts(3, 2))), 3))
+
+    assert [text.title for text in texts] == ['0', '1']
+    assert _phrases(texts) == ['0-0', '0-1', '1-0']
+
+
+def test_reservoir_sample():
+    sample = reservoir_sample(iter(range(100)), 10, seed=1)
+
+    assert len(sample) == 10
+    assert [number for number, _ in sample] == sorted(item for _, item in sample)
+    assert sample == reservoir_sample(range(100), 10, seed=1)
+    assert reservoir_sample(range(3), 10) == [(0, 0), (1, 1), (2, 2)]
+
+
+def test_sample_phrases_keeps_document_order():
+    texts = sample_phrases(io.BytesIO(Parser.write(_create_texts(5, 4))), 6, seed=3)
+    phrases = _phrases(texts)
+
+    assert len(phrases) == 6
+    assert phrases == sorted(phrases)
+    assert all(phrase.startswith(text.title + "-") for text in texts for phrase in _phrases([text]))
+
+
+def test_offset_index(tmpdir):
+    texts = _create_texts(4, 3)
+    path = _write(tmpdir, texts)
+    index = write_offset_index(path)
+
+    assert load_offset_index(path) == index
+    assert [num_phrases for _, _, num_phrases in index['texts']] == [3, 3, 3, 3]
+    indexed = list(iter_indexed_texts(path, index, [2, 0]))
+    assert [(number, text.title) for number, text in indexed] == [(0, '0'), (2, '2')]
+
+
+def test_offset_index_ignores_phrase_tags_in_comments_and_cdata(tmpdir):
+    path = _write(tmpdir, _create_texts(2, 2))
+    with open(path, 'rb') as _file:
+        document = _file.read()
+    end_of_first_text = document.index(b'</text>')
+    document = document[:end_of_first_text] + b'<!-- <phrase> --><![CDATA[<phrase/>]]>' + \
+        document[end_of_first_text:]
+    with open(path, 'wb') as _file:
+        _file.write(document)
+    index = write_offset_index(path)
+
+    assert [num_phrases for _, _, num_phrases in index['texts']] == [2, 2]
+    assert _phrases(sample_phrases(path, 4, seed=1)) == _phrases(_create_texts(2, 2))
+
+
+def test_offset_index_of_compressed_file(tmpdir):
+    path = _write(tmpdir, _create_texts(4, 3), 'corpus.xml.gz')
+    index = build_offset_index(path)
+
+    assert [text.title for _, text in iter_indexed_texts(path, index, [3, 1])] == ['1', '3']
+
+
+def test_offset_index_of_prefixed_latin_1_file(tmpdir):
+    path = str(tmpdir.join('corpus.xml'))
+    texts = [Text(title=u"Blåbær", phrases=[Phrase(u"æøå"), Phrase(u"b")]), Text(title=u"ñ")]
+    document = Parser.write(texts).replace(b'<', b'<tc:').replace(b'<tc:/', b'</tc:').replace(b'xmlns=', b'xmlns:tc=')
+    with open(path, 'wb') as _file:
+        _file.write(b'<?xml version="1.0" encoding="latin-1"?>' + document.decode('utf-8').encode('latin-1'))
+    index = write_offset_index(path)
+
+    assert [num_phrases for _, _, num_phrases in index['texts']] == [2, 0]
+    assert [text.title for _, text in iter_indexed_texts(path, load_offset_index(path), [1, 0])] == [u"Blåbær", u"ñ"]
+
+
+def test_stale_offset_index_is_ignored(tmpdir):
+    path = _write(tmpdir, _create_texts(4, 3))
+    write_offset_index(path)
+    Parser.write_to_file(path, _create_texts(2, 1))
+    os.utime(path, (0, 0))
+
+    assert load_offset_index(path) is None
+
+
+def test_sample_with_index_equals_sample_without(tmpdir):
+    path = _write(tmpdir, _create_texts(10, 7))
+    without_index = _phrases(sample_phrases(path, 5, seed=42))
+    write_offset_index(path)
+
+    assert _phrases(sample_phrases(path, 5, seed=42)) == without_index
@@ -0,0 +1,117 @@
+# coding: utf-8
+import io
+import os
+import re
+
+import pytest
+
+from typecraft_python.core.exceptions import TypecraftParseException
+from typecraft_python.core.models import Text, Phrase
+from typecraft_python.parsing import scanning
+from typecraft_python.parsing.parser import Parser
+from typecraft_python.parsing.scanning import iter_raw_texts, concatenate_documents, shard_documents
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+file_path = os.path.join(BASE_DIR, 'parsing/resources/xml_1_test.xml')
+file_path_2 = os.path.join(BASE_DIR, 'parsing/resources/xml_2_test.xml')
+
+
+def _to_dicts(texts):
+    return [text.to_dict() for text in texts]
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # Makes texts, comments and tags span several blocks
+    monkeypatch.setattr(scanning, 'READ_BLOCK_SIZE', 7)
+
+
+def test_raw_texts_are_complete_text_elements():
+    texts = [Text(title="a<text>"), Text(title="]]>", phrases=[Phrase("b")]), Text()]
+    raw_texts = list(iter_raw_texts(io.BytesIO(Parser.write(texts))))
+
+    assert len(raw_texts) == 3
+    assert all(raw_text.startswith(b'<text ') and raw_text.endswith(b'</text>') for raw_text in raw_texts)
+
+
+def test_comments_cdata_and_self_closing_texts(small_blocks):
+    document = b'<?xml version="1.0"?><!-- <text> --><typecraft><text/><text a="x>y"></text>' \
+               b'<![CDATA[<text>]]><text><!-- </text> --></text></typecraft>'
+
+    expected = [b'<text/>', b'<text a="x>y"></text>', b'<text><!-- </text> --></text>']
+
+    assert list(iter_raw_texts(io.BytesIO(document))) == expected
+
+
+def test_concatenate_documents_equals_parsed_texts(small_blocks):
+    output = io.BytesIO()
+    num_texts = concatenate_documents([file_path, file_path_2], output)
+    expected = Parser.parse_file(file_path) + Parser.parse_file(file_path_2)
+
+    assert num_texts == len(expected)
+    assert _to_dicts(Parser.parse(output.getvalue())) == _to_dicts(expected)
+
+
+def test_shard_documents(tmpdir):
+    texts = [Text(title=str(i)) for i in range(5)]
+    directory = str(tmpdir.join('shards'))
+    manifest = shard_documents([io.BytesIO(Parser.write(texts))], directory, texts_per_shard=2)
+
+    assert [shard['texts'] for shard in manifest['shards']] == [2, 2, 1]
+    titles = [text.title for shard in manifest['shards']
+              for text in Parser.parse_file(os.path.join(directory, shard['file']))]
+    assert titles == [str(i) for i in range(5)]
+
+
+def test_truncated_document_should_throw():
+    document = Parser.write([Text(), Text()])
+
+    with pytest.raises(TypecraftParseException):
+        list(iter_raw_texts(io.BytesIO(document[:-30])))
+
+
+def test_bad_root_should_throw():
+    with pytest.raises(TypecraftParseException):
+        list(iter_raw_texts(io.BytesIO(b'<nottypecraft><text/></nottypecraft>')))
+
+
+def _prefix_document(document):
+    # Moves the elements of a document written by Parser.write into the namespace prefix tc
+    document = re.sub(br'<(/?)(?=[a-z])', br'<\1tc:', document)
+    return document.replace(b'xmlns="', b'xmlns:tc="')
+
+
+def test_concatenate_prefixed_document(small_blocks):
+    texts = [Text(title="0", phrases=[Phrase("a b")]), Text(title="1")]
+    document = _prefix_document(Parser.write(texts))
+    assert document.startswith(b'<tc:typecraft xmlns:tc=')
+
+    output = io.BytesIO()
+    num_texts = concatenate_documents([io.BytesIO(document), file_path], output)
+
+    assert num_texts == 2 + len(Parser.parse_file(file_path))
+    expected = Parser.parse(Parser.write(texts)) + Parser.parse_file(file_path)
+    assert _to_dicts(Parser.parse(output.getvalue())) == _to_dicts(expected)
+
+
+def test_concatenate_latin_1_document(small_blocks):
+    texts = [Text(title=u"Blåbær", phrases=[Phrase(u"æøå")]), Text(title=u"ñ")]
+    document = b'<?xml version="1.0" encoding="ISO-8859-1"?>\n' + Parser.write(texts).decode('utf-8').encode('latin-1')
+    expected = Parser.parse(document)
+    assert [text.title for text in expected] == [u"Blåbær", u"ñ"]
+
+    output = io.BytesIO()
+    concatenate_documents([io.BytesIO(document)], output)
+
+    assert _to_dicts(Parser.parse(output.getvalue())) == _to_dicts(expected)
+
+
+def test_utf_16_document_should_throw():
+    document = u'<?xml version="1.0" encoding="UTF-16"?><typecraft><text/></typecraft>'.encode('utf-16')
+
+    with pytest.raises(TypecraftParseException):
+        list(iter_raw_texts(io.BytesIO(document)))
+
+    with pytest.raises(TypecraftParseException):
+        list(iter_raw_texts(io.BytesIO(document[2:].decode('utf-16').encode('utf-16-le'))))
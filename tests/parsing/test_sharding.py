@@ -0,0 +1,76 @@
+import json
+import os
+
+from typecraft_python.core.models import Text, Phrase
+from typecraft_python.parsing.parser import Parser
+from typecraft_python.parsing.sharding import group_texts, write_shard, write_shards
+from typecraft_python.parsing.streaming import serialize_text
+
+
+def _create_texts(n):
+    return [Text(title=str(i), phrases=[Phrase("Phrase %d" % i)]) for i in range(n)]
+
+
+def test_group_texts_by_count():
+    groups = list(group_texts(_create_texts(5), texts_per_shard=2))
+
+    assert [[text.title for text in group] for group in groups] == [['0', '1'], ['2', '3'], ['4']]
+
+
+def test_group_texts_by_size():
+    texts = _create_texts(5)
+    size = len(serialize_text(texts[0]))
+    groups = list(group_texts(texts, texts_per_shard=None, max_shard_size=2 * size + 1))
+
+    assert [len(group) for group in groups] == [2, 2, 1]
+    assert groups[0][0] == serialize_text(texts[0])
+
+
+def test_text_larger_than_max_size_gets_own_shard():
+    groups = list(group_texts(_create_texts(2), texts_per_shard=None, max_shard_size=1))
+
+    assert [len(group) for group in groups] == [1, 1]
+
+
+def test_write_shard(tmpdir):
+    texts = _create_texts(2)
+    path = str(tmpdir.join('shard.xml'))
+    size = write_shard(path, [texts[0], serialize_text(texts[1])])
+
+    assert size == os.path.getsize(path)
+    assert [text.title for text in Parser.parse_file(path)] == ['0', '1']
+    assert os.listdir(str(tmpdir)) == ['shard.xml']
+
+
+def test_write_shards(tmpdir):
+    directory = str(tmpdir.join('shards'))
+    manifest = write_shards(_create_texts(5), directory, texts_per_shard=2, name_format='%03d.xml.gz', jobs=2)
+
+    assert [shard['file'] for shard in manifest['shards']] == ['001.xml.gz', '002.xml.gz', '003.xml.gz']
+    assert manifest['texts'] == 5
+    with open(os.path.join(directory, 'manifest.json')) as _file:
+        assert json.load(_file) == manifest
+
+    paths = [os.path.join(directory, shard['file']) for shard in manifest['shards']]
+    titles = [text.title for path in paths for text in Parser.parse_file(path)]
+    assert titles == ['0', '1', '2', '3', '4']
+
+
+def test_write_shard_replaces_existing_file(tmpdir):
+    path = str(tmpdir.join('shard.xml'))
+    write_shard(path, _create_texts(1))
+    write_shard(path, _create_texts(2))
+
+    assert [text.title for text in Parser.parse_file(path)] == ['0', '1']
+
+
+def test_rewriting_shards_removes_stale_shards(tmpdir):
+    directory = str(tmpdir.join('shards'))
+    write_shards(_create_texts(5), directory, texts_per_shard=1, name_format='%03d.xml')
+    write_shards(_create_texts(5), directory, texts_per_shard=1, name_format='%03d.xml.gz')
+    manifest = write_shards(_create_texts(5), directory, texts_per_shard=2, name_format='%03d.xml')
+
+    assert sorted(os.listdir(directory)) == ['001.xml', '002.xml', '003.xml', 'manifest.json']
+    titles = [text.title for shard in manifest['shards']
+              for text in Parser.parse_file(os.path.join(directory, shard['file']))]
+    assert titles == ['0', '1', '2', '3', '4']
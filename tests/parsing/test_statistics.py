@@ -0,0 +1,78 @@
+import io
+import os
+
+import pytest
+
+from typecraft_python.core.exceptions import TypecraftParseException
+from typecraft_python.core.models import Text, Phrase, PhraseValidity
+from typecraft_python.parsing.convenience import words_to_phrase
+from typecraft_python.parsing.parser import Parser
+from typecraft_python.parsing.statistics import collect_statistics, count_texts
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+file_path = os.path.join(BASE_DIR, 'parsing/resources/xml_1_test.xml')
+file_path_2 = os.path.join(BASE_DIR, 'parsing/resources/xml_2_test.xml')
+
+
+def test_statistics_equal_counts_of_parsed_texts():
+    for path in [file_path, file_path_2]:
+        statistics = collect_statistics(path)
+        texts = Parser.parse_file(path)
+        phrases = [phrase for text in texts for phrase in text]
+        words = [word for phrase in phrases for word in phrase]
+        morphemes = [morpheme for word in words for morpheme in word]
+
+        assert statistics['texts'] == len(texts)
+        assert statistics['phrases'] == len(phrases)
+        assert statistics['words'] == len(words)
+        assert statistics['morphemes'] == len(morphemes)
+        assert statistics['glosses'] == sum(len(morpheme.glosses) for morpheme in morphemes)
+        assert sum(statistics['validity'].values()) == len(phrases)
+        for validity, count in statistics['validity'].items():
+            assert count == len([phrase for phrase in phrases if phrase.validity.value == validity])
+
+
+def test_statistics_per_language():
+    valid_phrase = words_to_phrase(["a", "b"])
+    valid_phrase.validity = PhraseValidity.VALID
+    document = Parser.write([
+        Text(language='nob', phrases=[valid_phrase, Phrase("c")]),
+        Text(language='en', phrases=[words_to_phrase(["d"])]),
+        Text(language='nob')
+    ])
+    statistics = collect_statistics(io.BytesIO(document))
+
+    assert list(statistics['languages'].keys()) == ['nob', 'en']
+    assert statistics['languages']['nob']['texts'] == 2
+    assert statistics['languages']['nob']['phrases'] == 2
+    assert statistics['languages']['nob']['words'] == 2
+    assert statistics['languages']['en']['words'] == 1
+    assert statistics['validity'] == {'VALID': 1, 'EMPTY': 2}
+
+
+def test_statistics_of_phrases_outside_texts():
+    document = b'<typecraft xmlns="http://typecraft.org/typecraft"><phrase/>' \
+        b'<text lang="nob"><phrase><word/></phrase></text><phrase valid="VALID"/></typecraft>'
+    statistics = collect_statistics(io.BytesIO(document))
+
+    assert statistics['texts'] == 1
+    assert statistics['phrases'] == 3
+    assert statistics['languages']['nob']['phrases'] == 1
+    assert statistics['languages']['und']['phrases'] == 2
+    assert statistics['languages']['und']['texts'] == 0
+
+
+def test_count_texts():
+    assert count_texts(io.BytesIO(Parser.write([Text(), Text()]))) == 2
+    assert count_texts(file_path) == len(Parser.parse_file(file_path))
+
+
+def test_bad_root_should_throw():
+    with pytest.raises(TypecraftParseException):
+        collect_statistics(io.BytesIO(b'<nottypecraft><text/></nottypecraft>'))
+
+
+def test_malformed_document_should_throw():
+    with pytest.raises(TypecraftParseException):
+        collect_statistics(io.BytesIO(Parser.write([Text()])[:-5]))
@@ -0,0 +1,114 @@
+import io
+import os
+
+import pytest
+
+from typecraft_python.core.exceptions import TypecraftParseException
+from typecraft_python.core.models import Text, Phrase
+from typecraft_python.parsing.parser import Parser
+from typecraft_python.parsing.streaming import iter_texts, iter_serialized_document, serialize_text, TextWriter
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+file_path = os.path.join(BASE_DIR, 'parsing/resources/xml_1_test.xml')
+file_path_2 = os.path.join(BASE_DIR, 'parsing/resources/xml_2_test.xml')
+
+
+def _write(texts):
+    output = io.BytesIO()
+    with TextWriter(output) as writer:
+        writer.write_texts(texts)
+    return output.getvalue()
+
+
+class TestIterTexts(object):
+
+    def test_iter_texts_equals_parse(self):
+        for path in [file_path, file_path_2]:
+            streamed = list(iter_texts(path))
+            parsed = Parser.parse_file(path)
+
+            assert len(streamed) == len(parsed)
+            for streamed_text, parsed_text in zip(streamed, parsed):
+                assert streamed_text.to_dict() == parsed_text.to_dict()
+
+    def test_iter_texts_from_file_object(self):
+        document = Parser.write([Text(title="1"), Text(title="2"), Text(title="3")])
+        texts = list(iter_texts(io.BytesIO(document)))
+
+        assert [text.title for text in texts] == ["1", "2", "3"]
+
+    def test_iter_texts_is_lazy(self):
+        document = Parser.write([Text(title="1"), Text(title="2")])
+        # Cut the document off after the first text
+        truncated = document[:document.index(b'</text>') + len(b'</text>')]
+        texts = iter_texts(io.BytesIO(truncated))
+
+        assert next(texts).title == "1"
+
+    def test_bad_root_should_throw(self):
+        with pytest.raises(TypecraftParseException):
+            list(iter_texts(io.BytesIO(b'<nottypecraft><text/></nottypecraft>')))
+
+
+class TestTextWriter(object):
+
+    def test_output_equals_parser_write(self):
+        for path in [file_path, file_path_2]:
+            texts = Parser.parse_file(path)
+
+            assert _write(texts) == Parser.write(texts)
+
+    def test_multiple_texts_roundtrip(self):
+        texts = [Text(title="A", phrases=[Phrase("One")]), Text(title="B", language="nob")]
+        parsed = Parser.parse(_write(texts))
+
+        assert [text.title for text in parsed] == ["A", "B"]
+        assert parsed[0][0].phrase == "One"
+        assert parsed[1].language == "nob"
+
+    def test_no_texts_is_valid_document(self):
+        assert Parser.parse(_write([])) == []
+
+    def test_serialize_text(self):
+        serialized = serialize_text(Text(title="A"))
+
+        assert serialized.startswith(b'<text lang="und">')
+        assert b'<title>A</title>' in serialized
+
+    def test_counts_texts(self):
+        output = io.BytesIO()
+        writer = TextWriter(output)
+        writer.write_texts([Text(), Text()])
+
+        assert writer.num_texts == 2
+
+    def test_phrase_by_phrase_output_equals_parser_write(self):
+        for path in [file_path, file_path_2]:
+            texts = Parser.parse_file(path)
+            output = io.BytesIO()
+            with TextWriter(output) as writer:
+                for text in texts:
+                    writer.start_text(text)
+                    for phrase in text:
+                        writer.write_phrase(phrase)
+                    writer.end_text()
+
+            assert output.getvalue() == Parser.write(texts)
+
+    def test_close_ends_started_text(self):
+        output = io.BytesIO()
+        with TextWriter(output) as writer:
+            writer.start_text(Text(title="A", metadata={'Annotator': 'Me'}))
+            writer.write_phrase(Phrase("One"))
+
+        expected = Text(title="A", metadata={'Annotator': 'Me'}, phrases=[Phrase("One")])
+
+        assert writer.num_texts == 1
+        assert output.getvalue() == Parser.write([expected])
+
+    def test_serialized_document_equals_parser_write(self):
+        texts = Parser.parse_file(file_path_2)
+
+        assert b"".join(iter_serialized_document(texts)) == Parser.write(texts)
+        assert Parser.parse(b"".join(iter_serialized_document([]))) == []
@@ -0,0 +1,55 @@
+from typecraft_python.core.models import Phrase, Text
+from typecraft_python.search.concordance import concordance, format_concordance_line, ConcordanceLine
+from typecraft_python.search.index import InvertedIndex
+from tests.search.test_index import _create_text, _create_word
+
+
+def _create_index():
+    third = Phrase(phrase="store hus og et hus")
+    third.add_words([
+        _create_word("store", "ADJ", "stor"), _create_word("hus", "N", "hus"), _create_word("og", "CONJ", "og"),
+        _create_word("et", "DET", "en"), _create_word("hus", "N", "hus")
+    ])
+    index = InvertedIndex()
+    index.add_text(_create_text())
+    index.add_text(Text(phrases=[third]))
+    return index
+
+
+def test_concordance():
+    lines = list(concordance(_create_index(), 'lemma:hus', window=2))
+
+    assert lines == [
+        ConcordanceLine(0, 0, 0, [], "Husene", ["er", "store"]),
+        ConcordanceLine(0, 1, 1, ["Et"], "hus", []),
+        ConcordanceLine(1, 0, 1, ["store"], "hus", ["og", "et"]),
+        ConcordanceLine(1, 0, 4, ["og", "et"], "hus", []),
+    ]
+
+
+def test_concordance_context_stays_within_phrase():
+    lines = list(concordance(_create_index(), 'pos:DET', window=10))
+
+    assert [(line.left, line.right) for line in lines] == [([], ["hus"]), (["store", "hus", "og"], ["hus"])]
+
+
+def test_concordance_sorted():
+    index = _create_index()
+
+    assert [line.left for line in concordance(index, 'pos:N', sort='left')] == \
+        [[], ["Et"], ["store", "hus", "og", "et"], ["store"]]
+    assert [line.right for line in concordance(index, 'pos:N', sort='right')] == \
+        [[], [], ["og", "et", "hus"], ["er", "store"]]
+
+
+def test_concordance_streams():
+    lines = concordance(_create_index(), 'pos:N')
+
+    assert next(lines).keyword == "Husene"
+
+
+def test_format_concordance_line():
+    line = ConcordanceLine(0, 0, 2, ["a", "long", "context"], "hit", ["after"])
+
+    assert format_concordance_line(line, width=16) == "  a long context  hit  after"
+    assert format_concordance_line(line, width=8) == " context  hit  after"
@@ -0,0 +1,133 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from typecraft_python.core.models import Morpheme, Phrase, Text, Word
+from typecraft_python.parsing.parser import Parser
+from typecraft_python.search import index as index_module
+from typecraft_python.search.index import InvertedIndex, build_inverted_index, write_inverted_index, \
+    load_inverted_index, parse_query
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+file_path_2 = os.path.join(BASE_DIR, 'parsing/resources/xml_2_test.xml')
+
+
+def _create_word(form, pos="", baseform="", glosses=()):
+    morpheme = Morpheme(morpheme=form, baseform=baseform, glosses=list(glosses))
+    return Word(word=form, pos=pos, morphemes=[morpheme])
+
+
+def _create_text():
+    first = Phrase(phrase="Husene er store")
+    first.add_words([
+        _create_word("Husene", "N", "hus", ["DEF", "PL"]),
+        _create_word("er", "V", "være", ["PRES"]),
+        _create_word("store", "ADJ", "stor", ["PL"])
+    ])
+    second = Phrase(phrase="Et hus")
+    second.add_words([_create_word("Et", "DET", "en", ["INDEF"]), _create_word("hus", "N", "hus", ["INDEF"])])
+    return Text(phrases=[first, second])
+
+
+def test_parse_query():
+    assert parse_query('hus') == ('term', 'form', 'hus')
+    assert parse_query('pos:N AND gloss:PL OR lemma:hus') == \
+        ('or', [('and', [('term', 'pos', 'N'), ('term', 'gloss', 'PL')]), ('term', 'lemma', 'hus')])
+    assert parse_query('pos:N AND (gloss:"PL" OR gloss:DEF)') == \
+        ('and', [('term', 'pos', 'N'), ('or', [('term', 'gloss', 'PL'), ('term', 'gloss', 'DEF')])])
+
+    for query in ['', 'pos:N AND', 'colour:red', '(pos:N', 'pos:N)']:
+        with pytest.raises(ValueError):
+            parse_query(query)
+
+
+def test_search():
+    index = InvertedIndex()
+    index.add_text(_create_text())
+
+    assert len(index) == 5
+    assert list(index.search('lemma:hus')) == [0, 4]
+    assert list(index.search('lower:husene')) == [0]
+    assert list(index.search('Husene')) == [0]
+    assert list(index.search('gloss:PL AND pos:N')) == [0]
+    assert list(index.search('gloss:PL OR gloss:INDEF')) == [0, 2, 3, 4]
+    assert list(index.search('lemma:ukjent')) == []
+    assert list(index.iter_locations(index.search('lemma:hus'))) == [(0, 0, 0), (0, 1, 1)]
+    assert index.get_forms(index.search('pos:N')) == ['Husene', 'hus']
+    assert index.get_frequency('gloss', 'PL') == 2
+
+
+def test_add_texts_incrementally():
+    texts = Parser.parse_file(file_path_2)
+    at_once = InvertedIndex()
+    at_once.add_texts(texts * 3)
+
+    incremental = InvertedIndex()
+    incremental.add_texts(texts)
+    incremental.search('pos:N')
+    incremental.add_texts(texts * 2)
+
+    assert incremental.num_texts == 3
+    for query in ['pos:N', 'gloss:3SG OR pos:V', 'pos:N AND gloss:PL']:
+        result = incremental.search(query)
+        assert np.array_equal(result, at_once.search(query))
+        assert np.all(np.diff(result) > 0)
+
+
+def test_add_texts_compacts_in_batches(monkeypatch):
+    texts = Parser.parse_file(file_path_2) * 3
+    at_once = InvertedIndex()
+    at_once.add_texts(texts)
+    at_once.compact()
+
+    monkeypatch.setattr(index_module, 'COMPACTION_SIZE', 50)
+    batched = InvertedIndex()
+    for text in texts:
+        batched.add_text(text)
+        assert len(batched._pending_locations['texts']) < 50
+    batched.compact()
+
+    for name, field in at_once.fields.items():
+        assert batched.fields[name].terms == field.terms
+        assert np.array_equal(batched.fields[name].offsets, field.offsets)
+        assert np.array_equal(batched.fields[name].postings, field.postings)
+    assert np.array_equal(batched.get_location_array('phrases'), at_once.get_location_array('phrases'))
+
+
+def test_save_and_load(tmpdir):
+    index = build_inverted_index(file_path_2)
+    path = str(tmpdir.join('corpus'))
+    index.save(path)
+
+    loaded = InvertedIndex.load(path)
+    assert len(loaded) == len(index)
+    assert np.array_equal(loaded.search('pos:N OR gloss:PL'), index.search('pos:N OR gloss:PL'))
+    assert loaded.get_forms(loaded.search('pos:V')) == index.get_forms(index.search('pos:V'))
+
+    loaded.add_text(_create_text())
+    assert list(loaded.iter_locations(loaded.search('lemma:hus')))[-2:] == [(1, 0, 0), (1, 1, 1)]
+
+
+def test_write_and_load_inverted_index(tmpdir):
+    path = str(tmpdir.join('corpus.xml'))
+    Parser.write_to_file(path, Parser.parse_file(file_path_2))
+
+    assert load_inverted_index(path) is None
+    write_inverted_index(path)
+    assert len(load_inverted_index(path)) == len(build_inverted_index(path))
+
+    with open(path, 'ab') as _file:
+        _file.write(b'\n')
+    assert load_inverted_index(path) is None
+
+
+def test_search_is_fast():
+    index = InvertedIndex()
+    index.add_texts(Parser.parse_file(file_path_2) * 200)
+    index.compact()
+
+    start = time.time()
+    index.search('(pos:N OR pos:V) AND gloss:3SG')
+    assert time.time() - start < 0.1
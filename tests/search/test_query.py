@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from typecraft_python.core.models import Morpheme, Word
+from typecraft_python.parsing.index import write_offset_index
+from typecraft_python.parsing.parser import Parser
+from typecraft_python.search.index import build_inverted_index, write_inverted_index
+from typecraft_python.search.query import TokenQuery, QuerySyntaxError, parse_query, search_texts, search_file
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+file_path_2 = os.path.join(BASE_DIR, 'parsing/resources/xml_2_test.xml')
+
+
+def _create_words(tags):
+    """
+    Creates words from strings like "N.PL", of a POS tag and an optional gloss.
+    """
+    words = []
+    for number, tag in enumerate(tags.split()):
+        pos, _, gloss = tag.partition('.')
+        words.append(Word(word="w%d" % number, pos=pos, morphemes=[Morpheme(baseform=pos.lower(), glosses=[gloss])]))
+    return words
+
+
+def _find_spans(query, tags):
+    return TokenQuery(query).find_spans(_create_words(tags))
+
+
+def test_parse_query():
+    assert parse_query('[pos="ADJ"] []{0,2} [pos="N" & gloss="PL"]') == ('sequence', [
+        ('word', ('compare', 'pos', 'ADJ', False)),
+        ('repeat', ('word', ('any',)), 0, 2),
+        ('word', ('and', [('compare', 'pos', 'N', False), ('compare', 'gloss', 'PL', False)]))
+    ])
+    assert parse_query('([word!="a"] | [lemma="b"])+') == ('repeat', ('alternatives', [
+        ('word', ('compare', 'word', 'a', True)), ('word', ('compare', 'lemma', 'b', False))
+    ]), 1, None)
+
+    for query in ['', '[pos="N"', '[colour="red"]', '[pos=N]', '[pos="N"]{2,1}', '[pos="N"] foo']:
+        with pytest.raises(QuerySyntaxError):
+            parse_query(query)
+
+
+def test_find_spans():
+    assert _find_spans('[pos="ADJ"] []{0,2} [pos="N" & gloss="PL"]', "ADJ N.SG ADV N.PL V ADJ N.PL") == [(0, 4), (5, 7)]
+    assert _find_spans('[pos="ADJ"]+ [pos="N"]', "ADJ ADJ N ADJ V ADJ N") == [(0, 3), (5, 7)]
+    assert _find_spans('[pos="N"] ([pos="V"] | [pos="ADV"]+ [pos="V"])', "N ADV ADV V N V N") == [(0, 4), (4, 6)]
+    assert _find_spans('[pos!="N"]{2,3}', "N N A A A A A N") == [(2, 5), (5, 7)]
+    assert _find_spans('[pos="A|N" & !gloss="P.*"]', "N.PL A.SG V N") == [(1, 2), (3, 4)]
+    assert _find_spans('[lemma="v"]*', "N V V N") == [(1, 3)]
+    assert _find_spans('[pos="N"]', "") == []
+
+
+def test_get_required_terms():
+    assert TokenQuery('[pos="ADJ"] []{0,2} [pos="N" & gloss="PL"]').get_required_terms() == \
+        [('pos', 'ADJ'), ('pos', 'N'), ('gloss', 'PL')]
+    assert TokenQuery('[pos="ADJ"]? [word!="x"] [gloss="P.*"]').get_required_terms() == []
+    assert TokenQuery('[pos="ADJ"] | [pos="N"]').get_required_terms() == []
+
+
+def test_search_texts_with_and_without_index():
+    texts = Parser.parse_file(file_path_2)
+    index = build_inverted_index(file_path_2)
+
+    for query in ['[pos="N"] [pos="V"]', '[] [pos="V" & gloss="3SG"]', '[pos="N"] []? [gloss="DEF"]']:
+        matches = list(search_texts(query, texts))
+        assert len(matches) > 0
+        assert list(search_texts(query, texts, index)) == matches
+        for match in matches:
+            phrase = texts[match.text].phrases[match.phrase]
+            assert match.words == phrase.words[match.span[0]:match.span[1]]
+
+
+def test_search_file_with_indexes(tmpdir):
+    path = str(tmpdir.join('corpus.xml'))
+    Parser.write_to_file(path, Parser.parse_file(file_path_2) * 3)
+    query = '[pos="N"] []{0,2} [gloss="3SG"]'
+    without_indexes = [match[:3] for match in search_file(query, path)]
+
+    write_inverted_index(path)
+    assert [match[:3] for match in search_file(query, path)] == without_indexes
+    write_offset_index(path)
+    assert [match[:3] for match in search_file(query, path)] == without_indexes
+    assert set(match[0] for match in without_indexes) == set([0, 1, 2])
@@ -0,0 +1,84 @@
+# coding: utf-8
+import random
+
+import numpy as np
+
+from typecraft_python.core.models import Phrase, Text
+from typecraft_python.search.suffix_array import SuffixArray, SubstringMatch, build_suffixes, scan_substring, \
+    write_suffix_array, load_suffix_array
+from typecraft_python.parsing.parser import Parser
+
+
+def _create_texts():
+    first = Phrase(phrase=u"Husene er store", translation=u"The houses are big")
+    second = Phrase(phrase=u"Et hus", translation=u"A house")
+    third = Phrase(phrase=u"ɔbaa no", translation=u"")
+    return [Text(phrases=[first, second]), Text(phrases=[third])]
+
+
+def test_build_suffixes():
+    generator = random.Random(2)
+    for _ in range(100):
+        codes = [generator.randint(0, 3) for _ in range(generator.randint(0, 30))]
+
+        assert list(build_suffixes(np.array(codes, dtype=np.uint32))) == \
+            sorted(range(len(codes)), key=lambda start: codes[start:])
+
+
+def test_find():
+    suffix_array = SuffixArray.build(_create_texts())
+
+    assert suffix_array.find(u"hus") == [SubstringMatch(0, 1, 'phrase', 3)]
+    assert suffix_array.find(u"ouse") == [
+        SubstringMatch(0, 0, 'translation', 5), SubstringMatch(0, 1, 'translation', 3)
+    ]
+    assert suffix_array.find(u"ɔba") == [SubstringMatch(1, 0, 'phrase', 0)]
+    assert suffix_array.find(u"xyz") == []
+    assert suffix_array.find(u"") == []
+    assert suffix_array.count(u"e") == 8
+
+
+def test_find_does_not_cross_phrases():
+    suffix_array = SuffixArray.build(_create_texts())
+
+    assert suffix_array.find(u"storeThe") == []
+    assert suffix_array.find(u"big") == [SubstringMatch(0, 0, 'translation', 15)]
+
+
+def test_find_prefix():
+    suffix_array = SuffixArray.build(_create_texts())
+
+    assert suffix_array.find(u"A", prefix=True) == [SubstringMatch(0, 1, 'translation', 0)]
+    assert suffix_array.find(u"hus", prefix=True) == []
+
+
+def test_get_segment():
+    suffix_array = SuffixArray.build(_create_texts())
+
+    assert suffix_array.get_segment(0, 1, 'translation') == u"A house"
+    assert suffix_array.get_segment(1, 0, 'phrase') == u"ɔbaa no"
+    assert suffix_array.get_segment(1, 0, 'translation') == u""
+
+
+def test_find_matches_scan():
+    path = 'tests/parsing/resources/xml_2_test.xml'
+    suffix_array = SuffixArray.build(Parser.parse_file(path))
+
+    for query in [u"a", u"na", u"ɔ", u"beaa", u"no "]:
+        for prefix in [False, True]:
+            assert suffix_array.find(query, prefix) == [match for match, _ in scan_substring(query, path, prefix)]
+
+
+def test_save_and_load(tmpdir):
+    path = str(tmpdir.join('corpus.xml'))
+    Parser.write_to_file(path, _create_texts())
+    suffix_array = write_suffix_array(path)
+    loaded = load_suffix_array(path)
+
+    assert isinstance(loaded.suffixes, np.memmap)
+    assert loaded.find(u"ouse") == suffix_array.find(u"ouse")
+
+    with open(path, 'a') as _file:
+        _file.write('\n')
+
+    assert load_suffix_array(path) is None
@@ -0,0 +1,65 @@
+import json
+import subprocess
+import sys
+
+"""
+Import time budget, in seconds, for the modules loaded by every `tpy` invocation.
+"""
+IMPORT_TIME_BUDGET = 0.5
+
+"""
+Import time budget, in seconds, for the models and the parser.
+"""
+PARSER_IMPORT_TIME_BUDGET = 0.25
+
+HEAVY_MODULES = ['nltk', 'treetaggerwrapper']
+
+
+def _import_in_subprocess(module_name, heavy_modules=HEAVY_MODULES):
+    """
+    Imports a module in a fresh interpreter.
+
+    :return: A tuple of the import time in seconds and the heavy modules which were imported.
+    """
+    script = (
+        "import json, sys, time\n"
+        "start = time.time()\n"
+        "import %s\n"
+        "elapsed = time.time() - start\n"
+        "print(json.dumps([elapsed, [name for name in %r if name in sys.modules]]))\n"
+    ) % (module_name, list(heavy_modules))
+    output = subprocess.check_output([sys.executable, '-c', script])
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+class TestImportTime(object):
+
+    def test_package_import_is_light(self):
+        elapsed, heavy_modules = _import_in_subprocess('typecraft_python')
+
+        assert heavy_modules == []
+        assert elapsed < IMPORT_TIME_BUDGET
+
+    def test_cli_import_is_light(self):
+        elapsed, heavy_modules = _import_in_subprocess('typecraft_python.cli.main')
+
+        assert heavy_modules == []
+        assert elapsed < IMPORT_TIME_BUDGET
+
+    def test_util_import_does_not_load_taggers(self):
+        elapsed, heavy_modules = _import_in_subprocess('typecraft_python.util')
+
+        assert heavy_modules == []
+        assert elapsed < IMPORT_TIME_BUDGET
+
+    def test_parser_import_does_not_load_optional_dependencies(self):
+        elapsed, heavy_modules = _import_in_subprocess('typecraft_python.parsing.parser', ['nltk', 'yaml'])
+
+        assert heavy_modules == []
+        assert elapsed < PARSER_IMPORT_TIME_BUDGET
+
+    def test_models_import_does_not_load_optional_dependencies(self):
+        elapsed, heavy_modules = _import_in_subprocess('typecraft_python.models', ['nltk', 'yaml'])
+
+        assert heavy_modules == []
+        assert elapsed < PARSER_IMPORT_TIME_BUDGET
@@ -0,0 +1,143 @@
+import pytest
+
+from typecraft_python.core.interfaces import TypecraftTagger
+from typecraft_python.core.models import Text
+from typecraft_python.parsing.convenience import words_to_phrase
+from typecraft_python.util import get_tagger_by_name, get_tagger_names, register_tagger, TAGGER_REGISTRY, \
+    group_texts_by_language, tag_texts_by_language, imap_ordered, batch
+
+
+class DummyTagger(TypecraftTagger):
+    pass
+
+
+def _square(number):
+    return number * number
+
+
+class LanguageTagger(TypecraftTagger):
+    """
+    Tags every word with the language. Records the calls made to it.
+    """
+    instances = []
+
+    def __init__(self):
+        self.warmed_up = []
+        self.calls = []
+        LanguageTagger.instances.append(self)
+
+    def warm_up(self, *languages):
+        self.warmed_up.extend(languages)
+
+    def tag_phrases(self, phrases, language='en'):
+        self.calls.append((language, len(phrases)))
+        for phrase in phrases:
+            for word in phrase:
+                word.pos = language
+        return phrases
+
+
+class TestTaggerRegistry(object):
+
+    def teardown_method(self):
+        TAGGER_REGISTRY.pop('dummy', None)
+
+    def test_get_tagger_by_name(self):
+        tagger = get_tagger_by_name('nltk')
+
+        assert tagger.__name__ == 'NltkTagger'
+        assert issubclass(tagger, TypecraftTagger)
+
+    def test_abbreviations(self):
+        assert get_tagger_by_name('NLTK') is get_tagger_by_name('nltk')
+        assert get_tagger_by_name('treetagger') is get_tagger_by_name('tree')
+        assert get_tagger_by_name('nl') is get_tagger_by_name('nltk')
+
+    def test_unknown_tagger_should_throw(self):
+        with pytest.raises(ValueError):
+            get_tagger_by_name('unknown')
+
+    def test_register_tagger(self):
+        register_tagger('dummy', DummyTagger)
+
+        assert get_tagger_by_name('dummy') is DummyTagger
+        assert 'dummy' in get_tagger_names()
+
+    def test_register_tagger_by_path(self):
+        register_tagger('dummy', 'tests.test_util:DummyTagger')
+
+        assert get_tagger_by_name('Dummy') is DummyTagger
+
+    def test_tagger_names(self):
+        names = get_tagger_names()
+
+        assert 'nltk' in names
+        assert 'tree' in names
+        assert 'obt' in names
+
+
+class TestTagTextsByLanguage(object):
+
+    def setup_method(self):
+        LanguageTagger.instances = []
+        register_tagger('language', LanguageTagger)
+
+    def teardown_method(self):
+        TAGGER_REGISTRY.pop('language', None)
+
+    def _create_texts(self):
+        return [
+            Text(language='en', phrases=[words_to_phrase(["A", "b"]), words_to_phrase(["C"])]),
+            Text(language='de', phrases=[words_to_phrase(["D"])]),
+            Text(language='en', phrases=[words_to_phrase(["E"])])
+        ]
+
+    def test_group_texts_by_language(self):
+        texts = self._create_texts()
+        groups = group_texts_by_language(texts)
+
+        assert list(groups.keys()) == ['en', 'de']
+        assert groups['en'] == [texts[0], texts[2]]
+
+    def test_one_warm_tagger_per_language(self):
+        texts = self._create_texts()
+        tag_texts_by_language(texts, 'language')
+
+        assert len(LanguageTagger.instances) == 2
+        assert LanguageTagger.instances[0].warmed_up == ['en']
+        assert LanguageTagger.instances[0].calls == [('en', 3)]
+        assert LanguageTagger.instances[1].calls == [('de', 1)]
+        for text in texts:
+            for phrase in text:
+                assert all(word.pos == text.language for word in phrase)
+
+    def test_taggers_are_reused_across_calls(self):
+        taggers = {}
+        tag_texts_by_language(self._create_texts(), 'language', taggers)
+        tag_texts_by_language(self._create_texts(), 'language', taggers)
+
+        assert len(LanguageTagger.instances) == 2
+        assert sorted(taggers.keys()) == ['de', 'en']
+
+
+class TestImapOrdered(object):
+
+    def test_in_process(self):
+        results = list(imap_ordered(_square, ((i, i) for i in range(5))))
+
+        assert results == [(i, i * i) for i in range(5)]
+
+    def test_results_are_in_task_order(self):
+        results = list(imap_ordered(_square, ((i, i) for i in range(50)), jobs=3, max_pending=4))
+
+        assert results == [(i, i * i) for i in range(50)]
+
+
+def test_batch_sequence():
+    assert list(batch([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+    assert list(batch("abc", 2)) == ["ab", "c"]
+
+
+def test_batch_iterable():
+    assert list(batch(iter([1, 2, 3, 4, 5]), 2)) == [[1, 2], [3, 4], [5]]
+    assert list(batch((i for i in range(0)), 2)) == []
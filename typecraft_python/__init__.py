@@ -5,4 +5,4 @@ __email__ = 'tormod.haugland@gmail.com'
 __version__ = '0.11.0'
 
 
-__all__ = ['models', 'parsing', 'core', 'integrations']
+__all__ = ['models', 'parsing', 'core', 'integrations', 'alignment', 'search']
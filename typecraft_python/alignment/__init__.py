@@ -0,0 +1 @@
+__all__ = ['gale_church', 'ibm_model1']
@@ -0,0 +1,201 @@
+"""
+This module contains length-based sentence alignment of two sentence-split documents, after
+Gale & Church (1993), "A Program for Aligning Sentences in Bilingual Corpora".
+
+Sentences are aligned in beads of 1-1, 1-2, 2-1, 1-0 and 0-1 sentences, by dynamic programming
+over the character lengths of the sentences. The cost of a bead is the negative log probability of
+the length difference of its sentences, plus a penalty for beads other than 1-1.
+
+Only the cells within `band` sentences of the diagonal of the search matrix are computed, and each row
+of the band is computed with numpy at once, so documents of thousands of sentences align in well under
+a second:
+
+    phrases = align_phrases(source_sentences, target_sentences)
+"""
+import numpy as np
+
+from typecraft_python.parsing.parallell import parallel_tuple_to_phrase
+
+"""
+The beads, as (number of source sentences, number of target sentences), and their penalties,
+as negative log probabilities relative to 1-1 beads.
+"""
+BEADS = [(1, 1), (1, 0), (0, 1), (2, 1), (1, 2)]
+BEAD_PENALTIES = [0.0, 4.5, 4.5, 2.3, 2.3]
+
+"""
+The variance of the number of target characters per source character.
+"""
+DEFAULT_VARIANCE = 6.8
+
+"""
+The default number of target sentences searched on either side of the diagonal.
+"""
+DEFAULT_BAND = 50
+
+_ONE_TO_ONE, _ONE_TO_ZERO, _ZERO_TO_ONE, _TWO_TO_ONE, _ONE_TO_TWO = range(len(BEADS))
+
+
+def _length_costs(source_lengths, target_lengths, ratio, variance):
+    """
+    Gets the negative log probability of the length differences of aligned source and target lengths,
+    by the two-tailed normal approximation of Gale & Church.
+
+    :param source_lengths: A numpy array of character counts.
+    :param target_lengths: A numpy array of character counts.
+    :return: A numpy array of costs.
+    """
+    mean = (source_lengths + target_lengths / ratio) / 2.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.abs(ratio * source_lengths - target_lengths) / np.sqrt(variance * mean)
+    z = np.where(mean > 0, z, 0.0)
+
+    # Abramowitz & Stegun 26.2.17, in log space, so that large differences do not underflow
+    t = 1.0 / (1.0 + 0.2316419 * z)
+    polynomial = ((((1.330274429 * t - 1.821255978) * t + 1.781477937) * t - 0.356563782) * t + 0.319381530) * t
+    return -(np.log(2 * 0.3989423) - z * z / 2.0 + np.log(polynomial))
+
+
+def _shifted(row, shift, padding):
+    """
+    Gets the values of a band row padded with `padding` cells on either side, shifted `shift` cells to the left.
+    """
+    return row[padding + shift:len(row) - padding + shift]
+
+
+def align_sentence_lengths(source_lengths, target_lengths, ratio=None, variance=DEFAULT_VARIANCE,
+                           band=DEFAULT_BAND):
+    """
+    Aligns two sequences of sentences by their lengths.
+
+    :param source_lengths: A sequence of the character counts of the source sentences.
+    :param target_lengths: A sequence of the character counts of the target sentences.
+    :param ratio: The expected number of target characters per source character. Defaults to the
+                  ratio of the total lengths.
+    :param variance: The variance of the number of target characters per source character.
+    :param band: The number of target sentences searched on either side of the diagonal. It is widened to
+                 at least 2, and to at least the number of target sentences per source sentence.
+    :return: A list of beads, as (source indices, target indices) tuples of ranges, in order.
+    """
+    source_lengths = np.asarray(source_lengths, dtype=np.float64)
+    target_lengths = np.asarray(target_lengths, dtype=np.float64)
+    num_source, num_target = len(source_lengths), len(target_lengths)
+    if num_source == 0 or num_target == 0:
+        return [(range(i, i + 1), range(0)) for i in range(num_source)] + \
+            [(range(0), range(j, j + 1)) for j in range(num_target)]
+
+    if ratio is None:
+        ratio = max(target_lengths.sum(), 1.0) / max(source_lengths.sum(), 1.0)
+    # Consecutive rows of the band must overlap for every path to be searched
+    band = max(band, 2, -(-num_target // num_source))
+    width = 2 * band + 1
+
+    # Row i of the band covers the columns starts[i] to starts[i] + width - 1, around the diagonal
+    # from (0, 0) to (n, m). Columns outside the search matrix have infinite costs.
+    starts = np.arange(num_source + 1) * num_target // num_source - band
+    columns = starts[:, np.newaxis] + np.arange(width)
+    rows = np.arange(num_source + 1)[:, np.newaxis]
+
+    # The lengths of the sentences ending before each row and column, 0 at the first
+    padded_source = np.concatenate([[0.0, 0.0], source_lengths])
+    padded_target = np.concatenate([[0.0, 0.0], target_lengths])
+    clipped = np.clip(columns, 0, num_target)
+    source_1 = padded_source[rows + 1]
+    source_2 = source_1 + padded_source[rows]
+    target_1 = padded_target[clipped + 1]
+    target_2 = target_1 + padded_target[clipped]
+
+    # The costs of the beads ending at every cell of the band, computed at once.
+    # 0-1 beads are handled separately below.
+    bead_costs = np.full((len(BEADS), num_source + 1, width), np.inf)
+    bead_costs[_ONE_TO_ONE] = _length_costs(source_1, target_1, ratio, variance)
+    bead_costs[_ONE_TO_ZERO] = _length_costs(source_1, 0.0 * target_1, ratio, variance)
+    bead_costs[_TWO_TO_ONE] = _length_costs(source_2, target_1, ratio, variance)
+    bead_costs[_ONE_TO_TWO] = _length_costs(source_1, target_2, ratio, variance)
+    bead_costs += np.array(BEAD_PENALTIES)[:, np.newaxis, np.newaxis]
+    for bead, (source_count, target_count) in enumerate(BEADS):
+        bead_costs[bead, (rows < source_count) | (columns < target_count)] = np.inf
+    bead_costs[:, (columns < 0) | (columns > num_target)] = np.inf
+
+    # The cumulative cost of leaving out target sentences, for chains of 0-1 beads
+    zero_to_one = _length_costs(0.0 * target_lengths, target_lengths, ratio, variance) + \
+        BEAD_PENALTIES[_ZERO_TO_ONE]
+    cumulative_zero_to_one = np.concatenate([[0.0], np.cumsum(zero_to_one)])[clipped]
+
+    # The rows are padded with infinite costs on both sides, so that the cells of the previous rows
+    # a bead starts at are found by slicing. The bands of two rows apart are at most 2 * ceil(m / n) apart.
+    padding_size = 2 * (num_target // num_source + 1) + 2
+    padding = np.full(padding_size, np.inf)
+    infinite = np.full(width, np.inf)
+    first_row = np.where((columns[0] >= 0) & (columns[0] <= num_target), cumulative_zero_to_one[0], np.inf)
+    costs = [np.concatenate([padding, first_row, padding])]
+    beads = [np.full(width, _ZERO_TO_ONE, dtype=np.int8)]
+    for i in range(1, num_source + 1):
+        shift = starts[i] - starts[i - 1]
+        candidates = np.array([
+            _shifted(costs[i - 1], shift - 1, padding_size),
+            _shifted(costs[i - 1], shift, padding_size),
+            infinite,
+            _shifted(costs[i - 2], starts[i] - starts[i - 2] - 1, padding_size) if i >= 2 else infinite,
+            _shifted(costs[i - 1], shift - 2, padding_size)
+        ]) + bead_costs[:, i]
+
+        row_beads = np.argmin(candidates, axis=0)
+        row = candidates[row_beads, np.arange(width)]
+
+        # 0-1 beads depend on the cell to the left in the same row. Chains of them are found with a
+        # running minimum: cost[j] = C[j] + min over k <= j of (row[k] - C[k]), C the cumulative 0-1 cost
+        values = row - cumulative_zero_to_one[i]
+        best = np.minimum.accumulate(values)
+        beads.append(np.where(values > best, _ZERO_TO_ONE, row_beads).astype(np.int8))
+        costs.append(np.concatenate([padding, best + cumulative_zero_to_one[i], padding]))
+
+    if not np.isfinite(costs[num_source][padding_size + num_target - starts[num_source]]):
+        raise ValueError("Unable to align the sentences within a band of %d sentences" % (band,))
+
+    # Trace back from the last cell
+    alignment = []
+    i, j = num_source, num_target
+    while i > 0 or j > 0:
+        source_count, target_count = BEADS[beads[i][j - starts[i]]]
+        alignment.append((range(i - source_count, i), range(j - target_count, j)))
+        i, j = i - source_count, j - target_count
+    alignment.reverse()
+    return alignment
+
+
+def align_sentences(source_sentences, target_sentences, **kwargs):
+    """
+    Aligns two lists of sentences by their lengths, see align_sentence_lengths.
+    The sentences of a bead are joined by spaces.
+
+    :param source_sentences: A list of strings.
+    :param target_sentences: A list of strings.
+    :return: A list of (source, target) tuples of strings. The source or target is empty for 0-1 and 1-0 beads.
+    """
+    alignment = align_sentence_lengths(
+        [len(sentence) for sentence in source_sentences],
+        [len(sentence) for sentence in target_sentences],
+        **kwargs
+    )
+    return [
+        (
+            " ".join(source_sentences[i] for i in source_indices),
+            " ".join(target_sentences[j] for j in target_indices)
+        )
+        for source_indices, target_indices in alignment
+    ]
+
+
+def align_phrases(source_sentences, target_sentences, **kwargs):
+    """
+    Aligns two lists of sentences by their lengths, see align_sentence_lengths.
+
+    :param source_sentences: A list of strings.
+    :param target_sentences: A list of strings.
+    :return: A list of Phrase objects, with the aligned target sentences as translations.
+    """
+    return [
+        parallel_tuple_to_phrase(pair)
+        for pair in align_sentences(source_sentences, target_sentences, **kwargs)
+    ]
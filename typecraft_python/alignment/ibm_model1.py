@@ -0,0 +1,321 @@
+"""
+This module contains word alignment of phrases and their translations with IBM Model 1
+(Brown et al. 1993, "The Mathematics of Statistical Machine Translation").
+
+Every word of a phrase is aligned to one token of the translation, or to no token. The probabilities
+t(word | translation token) are estimated by expectation maximization:
+
+    alignments = align_words(corpus)
+    for word, token in alignments.iter_aligned_words(0):
+        ...
+
+Words and tokens are interned to integer ids, and only the (word, token) pairs which co-occur in some
+phrase are given a probability. All pair occurrences of the corpus are held as a flat array of pair ids,
+in chunks, so each iteration of EM is a few numpy operations per chunk.
+"""
+import re
+
+import numpy as np
+
+from typecraft_python.core.models import Corpus, Text, Phrase
+from typecraft_python.search.index import sorted_unique
+
+"""
+The number of phrases whose pair occurrences are computed at once.
+"""
+CHUNK_SIZE = 10000
+
+DEFAULT_ITERATIONS = 5
+
+"""
+The link of a word aligned to no token of the translation.
+"""
+NULL_LINK = -1
+
+_TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]', re.UNICODE)
+
+
+def tokenize_translation(translation):
+    """
+    Splits a free translation into word and punctuation tokens.
+
+    :param translation: A string.
+    :return: A list of strings.
+    """
+    return _TOKEN_PATTERN.findall(translation)
+
+
+def _iter_phrases(obj):
+    """
+    Iterates over all phrases of a Corpus or a Text, or of an iterable of these or of phrases.
+
+    :param obj:
+    :return: A generator of Phrase objects.
+    """
+    if isinstance(obj, Phrase):
+        yield obj
+    elif isinstance(obj, Text):
+        for phrase in obj.phrases:
+            yield phrase
+    else:
+        for child in (obj.texts if isinstance(obj, Corpus) else obj):
+            for phrase in _iter_phrases(child):
+                yield phrase
+
+
+def _intern(tokens, vocabulary):
+    return [vocabulary.setdefault(token, len(vocabulary)) for token in tokens]
+
+
+class _Chunk(object):
+    """
+    The pair occurrences of some phrases. Every word of a phrase occurs once with the null token,
+    and once with every token of the translation, in this order, and the occurrences of a word
+    form a group.
+    """
+
+    def __init__(self, word_ids, translation_ids, word_counts, translation_counts):
+        """
+        :param word_ids: The flat word ids of the phrases.
+        :param translation_ids: The flat translation token ids of the phrases, each translation starting
+                                with the null token.
+        :param word_counts: The number of words of each phrase.
+        :param translation_counts: The number of translation tokens of each phrase, including the null token.
+        """
+        pair_counts = word_counts * translation_counts
+        occurrence_phrases = np.repeat(np.arange(len(word_counts)), pair_counts)
+        occurrence_starts = np.cumsum(pair_counts) - pair_counts
+        positions = np.arange(pair_counts.sum()) - occurrence_starts[occurrence_phrases]
+
+        group_sizes = translation_counts[occurrence_phrases]
+        word_positions = (np.cumsum(word_counts) - word_counts)[occurrence_phrases] + positions // group_sizes
+        translation_positions = (np.cumsum(translation_counts) - translation_counts)[occurrence_phrases] + \
+            positions % group_sizes
+
+        self.word_ids = word_ids[word_positions]
+        self.translation_ids = translation_ids[translation_positions]
+        self.group_sizes = np.repeat(translation_counts, word_counts)
+        self.group_starts = np.cumsum(self.group_sizes) - self.group_sizes
+        self.pair_ids = None
+
+
+class Model1(object):
+    """
+    The translation probabilities t(word | translation token) of IBM Model 1.
+    """
+
+    def __init__(self, word_vocabulary, translation_vocabulary, pair_keys, probabilities):
+        """
+        :param word_vocabulary: A dict mapping words to ids.
+        :param translation_vocabulary: A dict mapping translation tokens to ids. The null token is None, with id 0.
+        :param pair_keys: A sorted numpy array of word id * len(translation_vocabulary) + translation token id.
+        :param probabilities: A numpy array of the probability of each pair.
+        """
+        self.word_vocabulary = word_vocabulary
+        self.translation_vocabulary = translation_vocabulary
+        self.pair_keys = pair_keys
+        self.probabilities = probabilities
+
+    def _pair_keys(self, word_ids, translation_ids):
+        return word_ids.astype(np.int64) * len(self.translation_vocabulary) + translation_ids
+
+    def get_probabilities(self, word_ids, translation_ids):
+        """
+        Gets the probabilities of pairs of word and translation token ids, 0 for pairs never seen together.
+
+        :param word_ids: A numpy array of word ids.
+        :param translation_ids: A numpy array of translation token ids of the same shape.
+        :return: A numpy array of probabilities.
+        """
+        keys = self._pair_keys(word_ids, translation_ids)
+        if len(self.pair_keys) == 0:
+            return np.zeros(keys.shape)
+        positions = np.clip(np.searchsorted(self.pair_keys, keys), 0, len(self.pair_keys) - 1)
+        return np.where(self.pair_keys[positions] == keys, self.probabilities[positions], 0.0)
+
+    def get_probability(self, word, translation_token):
+        """
+        Gets t(word | translation token). The null token is None.
+        """
+        if word not in self.word_vocabulary or translation_token not in self.translation_vocabulary:
+            return 0.0
+        return float(self.get_probabilities(
+            np.array([self.word_vocabulary[word]]),
+            np.array([self.translation_vocabulary[translation_token]])
+        )[0])
+
+    def align(self, words, translation_tokens):
+        """
+        Gets the Viterbi alignment of the words of a phrase to the tokens of its translation.
+
+        :param words: A list of strings.
+        :param translation_tokens: A list of strings.
+        :return: A numpy array with the index of the translation token of every word, or NULL_LINK.
+        """
+        unknown = len(self.word_vocabulary) + len(self.translation_vocabulary)
+        word_ids = np.array([self.word_vocabulary.get(word, unknown) for word in words], dtype=np.int64)
+        translation_ids = np.array(
+            [0] + [self.translation_vocabulary.get(token, unknown) for token in translation_tokens], dtype=np.int64
+        )
+        if len(word_ids) == 0:
+            return np.zeros(0, dtype=np.int32)
+        probabilities = self.get_probabilities(word_ids[:, np.newaxis], translation_ids[np.newaxis, :])
+        return (np.argmax(probabilities, axis=1) - 1).astype(np.int32)
+
+
+class WordAlignments(object):
+    """
+    The word alignments of a number of phrases. The links of all phrases are held in a single array:
+    the link of word i of phrase n is links[offsets[n] + i], the index of the translation token the word
+    is aligned to, or NULL_LINK.
+    """
+
+    def __init__(self, phrases, translation_tokens, links, offsets):
+        self.phrases = phrases
+        self.translation_tokens = translation_tokens
+        self.links = links
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def get_links(self, phrase_number):
+        """
+        :return: A numpy array with the link of every word of the phrase.
+        """
+        return self.links[self.offsets[phrase_number]:self.offsets[phrase_number + 1]]
+
+    def iter_aligned_words(self, phrase_number):
+        """
+        Iterates over the words of a phrase with the translation token they are aligned to.
+
+        :return: A generator of (Word, string) tuples. The string is None for words aligned to no token.
+        """
+        tokens = self.translation_tokens[phrase_number]
+        for word, link in zip(self.phrases[phrase_number].words, self.get_links(phrase_number)):
+            yield word, (tokens[link] if link != NULL_LINK else None)
+
+
+def _iter_chunks(word_ids, translation_ids, word_counts, translation_counts, chunk_size):
+    word_offsets = np.concatenate([[0], np.cumsum(word_counts)])
+    translation_offsets = np.concatenate([[0], np.cumsum(translation_counts)])
+    for start in range(0, len(word_counts), chunk_size):
+        end = min(start + chunk_size, len(word_counts))
+        yield _Chunk(
+            word_ids[word_offsets[start]:word_offsets[end]],
+            translation_ids[translation_offsets[start]:translation_offsets[end]],
+            word_counts[start:end],
+            translation_counts[start:end]
+        )
+
+
+def _get_posteriors(chunk, probabilities):
+    """
+    Gets the probability of each pair occurrence of a chunk being the alignment of its word.
+    """
+    occurrence_probabilities = probabilities[chunk.pair_ids]
+    totals = np.add.reduceat(occurrence_probabilities, chunk.group_starts)
+    return occurrence_probabilities / np.repeat(totals, chunk.group_sizes)
+
+
+def _get_viterbi_links(chunk, probabilities):
+    """
+    Gets the most probable translation token of every word of a chunk, the first of equally probable ones.
+    """
+    occurrence_probabilities = probabilities[chunk.pair_ids]
+    maxima = np.maximum.reduceat(occurrence_probabilities, chunk.group_starts)
+    positions = np.flatnonzero(occurrence_probabilities == np.repeat(maxima, chunk.group_sizes))
+    groups = np.repeat(np.arange(len(chunk.group_sizes)), chunk.group_sizes)[positions]
+    _, first = np.unique(groups, return_index=True)
+    # The null token is the first token of every group
+    return (positions[first] - chunk.group_starts - 1).astype(np.int32)
+
+
+def train_model1(pairs, iterations=DEFAULT_ITERATIONS, chunk_size=CHUNK_SIZE):
+    """
+    Estimates the translation probabilities of IBM Model 1 from pairs of phrases and translations.
+
+    :param pairs: An iterable of (words, translation tokens) tuples of lists of strings.
+    :param iterations: The number of iterations of EM.
+    :param chunk_size: The number of pairs whose pair occurrences are computed at once.
+    :return: A tuple of the Model1 and the Viterbi links of the words of the pairs,
+             as a numpy array of the links of all words.
+    """
+    word_vocabulary = {}
+    translation_vocabulary = {None: 0}
+    word_ids, translation_ids, word_counts, translation_counts = [], [], [], []
+    for words, translation_tokens in pairs:
+        word_ids.extend(_intern(words, word_vocabulary))
+        translation_ids.append(0)
+        translation_ids.extend(_intern(translation_tokens, translation_vocabulary))
+        word_counts.append(len(words))
+        translation_counts.append(len(translation_tokens) + 1)
+
+    chunks = list(_iter_chunks(
+        np.array(word_ids, dtype=np.int64),
+        np.array(translation_ids, dtype=np.int64),
+        np.array(word_counts, dtype=np.int64),
+        np.array(translation_counts, dtype=np.int64),
+        chunk_size
+    ))
+    del word_ids, translation_ids
+
+    # Intern the pairs co-occurring in each chunk, and then in all chunks
+    num_translation_tokens = len(translation_vocabulary)
+    chunk_keys = []
+    for chunk in chunks:
+        keys, chunk.pair_ids = np.unique(chunk.word_ids * num_translation_tokens + chunk.translation_ids,
+                                         return_inverse=True)
+        chunk_keys.append(keys)
+        chunk.word_ids = chunk.translation_ids = None
+    pair_keys = sorted_unique(np.concatenate(chunk_keys)) if chunk_keys else np.zeros(0, dtype=np.int64)
+    for chunk, keys in zip(chunks, chunk_keys):
+        chunk.pair_ids = np.searchsorted(pair_keys, keys).astype(np.int32)[chunk.pair_ids.ravel()]
+    del chunk_keys
+
+    pair_translation_ids = pair_keys % num_translation_tokens
+    probabilities = np.ones(len(pair_keys))
+    for _ in range(iterations):
+        counts = np.zeros(len(pair_keys))
+        for chunk in chunks:
+            counts += np.bincount(chunk.pair_ids, _get_posteriors(chunk, probabilities), minlength=len(pair_keys))
+        totals = np.bincount(pair_translation_ids, counts, minlength=num_translation_tokens)
+        probabilities = counts / totals[pair_translation_ids]
+
+    links = [_get_viterbi_links(chunk, probabilities) for chunk in chunks]
+    model = Model1(word_vocabulary, translation_vocabulary, pair_keys, probabilities)
+    return model, np.concatenate(links) if links else np.zeros(0, dtype=np.int32)
+
+
+def align_words(obj, iterations=DEFAULT_ITERATIONS, lowercase=True, chunk_size=CHUNK_SIZE):
+    """
+    Aligns the words of the phrases of a Corpus, Text or iterable of these to the tokens of their translations,
+    with IBM Model 1 trained on the phrases themselves. The phrases must be tokenized. The translations are
+    tokenized with tokenize_translation.
+
+    :param obj:
+    :param iterations: The number of iterations of EM.
+    :param lowercase: If true, words and translation tokens are lowercased before they are interned.
+    :param chunk_size: The number of phrases whose pair occurrences are computed at once.
+    :return: A WordAlignments object. Phrases without words or translation have all words aligned to no token.
+    """
+    phrases = list(_iter_phrases(obj))
+    translation_tokens = [tokenize_translation(phrase.translation or "") for phrase in phrases]
+    normalize = (lambda token: token.lower()) if lowercase else (lambda token: token)
+
+    def pairs():
+        for phrase, tokens in zip(phrases, translation_tokens):
+            if phrase.words and tokens:
+                yield [normalize(word.word) for word in phrase.words], [normalize(token) for token in tokens]
+
+    _, trained_links = train_model1(pairs(), iterations, chunk_size)
+
+    # Phrases left out of training get null links
+    word_counts = np.array([len(phrase.words) for phrase in phrases], dtype=np.int64)
+    trained = np.array(
+        [bool(phrase.words and tokens) for phrase, tokens in zip(phrases, translation_tokens)], dtype=bool
+    )
+    offsets = np.concatenate([[0], np.cumsum(word_counts)])
+    links = np.full(offsets[-1], NULL_LINK, dtype=np.int32)
+    links[np.repeat(trained, word_counts)] = trained_links
+    return WordAlignments(phrases, translation_tokens, links, offsets)
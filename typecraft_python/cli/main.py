@@ -1,15 +1,55 @@
 import copy
+import re
+import sys
 
 import click
-import nltk
 
-from typecraft_python.parsing.parallell import parse_continuous_parallel_text_to_phrases
-from typecraft_python.cli.util import write_to_stdout_or_file
+from typecraft_python.parsing.parallell import iter_lines, iter_continuous_parallel_tuples, \
+    iter_tab_separated_parallel_tuples, iter_aligned_files_parallel_tuples, iter_parallel_phrases
+from typecraft_python.cli.util import write_to_stdout_or_file, open_binary_output, open_text_input
 from typecraft_python.parsing.parser import Parser
+from typecraft_python.parsing.streaming import iter_texts, iter_serialized_document, TextWriter
+from typecraft_python.parsing.statistics import collect_statistics, count_texts
+from typecraft_python.parsing.sharding import write_shards, SHARD_NAME_FORMAT
+from typecraft_python.parsing.scanning import concatenate_documents, shard_documents
+from typecraft_python.parsing.sampling import head_texts, head_phrases, sample_phrases
+from typecraft_python.parsing.index import write_offset_index
+from typecraft_python.parsing.external import sort_phrases, shuffle_phrases, SORT_KEYS, DEFAULT_MAX_MEMORY
 from typecraft_python.core.models import Phrase, Text
-from typecraft_python.integrations.nltk.tokenization import raw_phrase_to_tokenized_phrase, raw_text_to_phrases, \
-    raw_text_to_tokenized_phrases, tokenize_phrase
-from typecraft_python.util import get_tagger_by_name, split as split_into_sublists
+from typecraft_python.util import get_tagger_for_language, tag_texts_by_language, imap_ordered, batch, \
+    split as split_into_sublists
+
+# Note that nltk and the tokenization module are imported inside the commands using them,
+# as importing nltk is slow, and most commands do not need it.
+
+"""
+Raw input is processed in chunks of at least this many characters. Chunks end at a paragraph
+break, i.e. a blank line, so that no sentence is split between two chunks, if there is one
+before MAX_CHUNK_FACTOR times this many characters.
+"""
+RAW_CHUNK_SIZE = 64 * 1024
+
+"""
+Input without paragraph breaks, such as one sentence per line, is cut at the next line end once a chunk
+reaches this many times the chunk size, so that memory stays bounded. A sentence spanning lines may then
+be split between two chunks.
+"""
+MAX_CHUNK_FACTOR = 4
+
+"""
+The number of phrases of a text processed together in one job by `tpy xml --jobs`.
+"""
+PHRASES_PER_JOB = 200
+
+"""
+The taggers used by the current process, by tagger name and language. When running with --jobs,
+each worker process gets its own taggers, which are kept warm between jobs.
+"""
+_taggers = {}
+
+
+def _get_tagger(tagger_name, language):
+    return get_tagger_for_language(tagger_name, language, _taggers.setdefault(tagger_name, {}))
 
 
 @click.group()
@@ -17,6 +57,77 @@ def main():
     pass
 
 
+def _iter_paragraph_chunks(inputs, chunk_size=RAW_CHUNK_SIZE):
+    """
+    Reads raw text files lazily, in chunks of at least `chunk_size` characters ending at paragraph breaks,
+    or at line ends once a chunk reaches MAX_CHUNK_FACTOR times `chunk_size` characters.
+    A newline is added to the end of a file not ending with one.
+
+    :param inputs: An iterable of text file objects.
+    :param chunk_size:
+    :return: A generator of strings.
+    """
+    lines = []
+    size = 0
+    for _input in inputs:
+        line = ""
+        for line in _input:
+            lines.append(line)
+            size += len(line)
+            if size >= chunk_size and (not line.strip() or size >= MAX_CHUNK_FACTOR * chunk_size):
+                yield "".join(lines)
+                lines = []
+                size = 0
+        if line and not line.endswith("\n"):
+            lines.append("\n")
+            size += 1
+    if lines:
+        yield "".join(lines)
+
+
+def _raw_chunk_to_phrases(arguments):
+    """
+    Sentence tokenizes, tokenizes and tags a chunk of raw text, as specified by the options of the raw command.
+    Runs in the worker processes when using --jobs.
+
+    :param arguments: A tuple of (chunk, sent_tokenize, tokenize, tag, tagger, language).
+    :return: A list of phrases.
+    """
+    import nltk
+    from typecraft_python.integrations.nltk.tokenization import raw_phrase_to_tokenized_phrase, \
+        raw_text_to_phrases, raw_text_to_tokenized_phrases
+
+    contents, sent_tokenize, tokenize, tag, tagger, language = arguments
+
+    _tagger = None
+    if tag:
+        _tagger = _get_tagger(tagger, language)
+
+    if _tagger and _tagger.has_automatic_word_tokenization_support(language) and \
+       _tagger.has_automatic_sentence_tokenization_support(language):
+        # The tagger has everything we need to get full tokenization
+        phrases = _tagger.tag_raw(contents, language)
+    elif _tagger and _tagger.has_automatic_word_tokenization_support(language):
+        # Sentence tokenize, then tag.
+        phrases = []
+        for phrase in nltk.sent_tokenize(contents, language):
+            phrases.extend(_tagger.tag_raw(phrase, language))
+    else:
+        if sent_tokenize and tokenize:
+            phrases = raw_text_to_tokenized_phrases(contents)
+        elif sent_tokenize:
+            phrases = raw_text_to_phrases(contents)
+        elif tokenize:
+            phrases = [raw_phrase_to_tokenized_phrase(contents)]
+        else:
+            phrases = [Phrase(contents)]
+
+        if tag:
+            phrases = _tagger.tag_phrases(phrases, language)
+
+    return phrases
+
+
 @main.command()
 @click.option('--sent-tokenize/--no-sent-tokenize', default=True, help='Will sentence tokenize if true.')
 @click.option('--tokenize/--no-tokenize', default=True, help='Will tokenize if true.')
@@ -26,8 +137,9 @@ def main():
 @click.option('--language', default='en', help='The language of the input text(s).')
 @click.option('--meta', nargs=2, type=click.Tuple([str, str]), multiple=True, help="Metadata to attach to generated text(s)")
 @click.option('--tagset', type=str, default='', help='If set, the tags in the output will be converted into this tagset.')
+@click.option('-j', '--jobs', default=1, type=int, help='The number of processes to tokenize and tag with.')
 @click.option('-o', '--output', type=click.Path(), help='If given, the output will be written to this file, instead of stdout.')
-@click.argument('input', type=click.File('r'), nargs=-1)
+@click.argument('input', type=click.File('rb'), nargs=-1)
 def raw(
     input,
     sent_tokenize,
@@ -38,6 +150,7 @@ def raw(
     language,
     meta,
     tagset,
+    jobs,
     output
 ):
     # Perform input validation
@@ -45,51 +158,100 @@ def raw(
         raise ValueError("Cannot tag untokenized text. Please set both `sent_tokenize` "
                          "and `tokenize` to true")
 
-    contents = ""
-    for _input in input:
-        _contents = _input.read()
-        if _contents[-1] != "\n":
-            _contents += "\n"
-        contents += _contents
-
-    _tagger = None
-    if tag:
-        _tagger = get_tagger_by_name(tagger)()
-
-    if _tagger and _tagger.has_automatic_word_tokenization_support(language) and \
-       _tagger.has_automatic_sentence_tokenization_support(language):
-        # The tagger has everything we need to get full tokenization
-        phrases = _tagger.tag_raw(contents, language)
-    elif _tagger and _tagger.has_automatic_word_tokenization_support(language):
-        # Sentence tokenize, then tag.
-        phrases = nltk.sent_tokenize(contents, language)
-        _phrases = []
-        for phrase in phrases:
-            _phrases.extend(_tagger.tag_raw(phrase, language))
+    inputs = (open_text_input(_input) for _input in input)
+    if sent_tokenize:
+        chunks = _iter_paragraph_chunks(inputs)
     else:
-        if sent_tokenize and tokenize:
-            phrases = raw_text_to_tokenized_phrases(contents)
-        elif sent_tokenize:
-            phrases = raw_text_to_phrases(contents)
-        elif tokenize:
-            phrases = [raw_phrase_to_tokenized_phrase(contents)]
-        else:
-            phrases = [Phrase(contents)]
-
-        if tag:
-            phrases = _tagger.tag_phrases(phrases, language)
+        # Without sentence tokenization, the whole input becomes a single phrase
+        chunks = ["".join(_iter_paragraph_chunks(inputs))]
+    tasks = ((None, (chunk, sent_tokenize, tokenize, tag, tagger, language)) for chunk in chunks)
 
     text = Text(
-        phrases=phrases,
         title=title,
         metadata=dict(meta),
         language=language
     )
 
+    # The phrases are written as soon as their chunk is done, so only a few chunks are held in memory
+    with open_binary_output(output) as _output:
+        with TextWriter(_output) as writer:
+            writer.start_text(text)
+            for _, phrases in imap_ordered(_raw_chunk_to_phrases, tasks, jobs):
+                for phrase in phrases:
+                    if tagset != '':
+                        phrase.map_tags(tagset)
+                    writer.write_phrase(phrase)
+            writer.end_text()
+
+
+def _prepare_phrases(arguments):
+    """
+    Performs the steps of the xml command which must be done before tagging, and tags.
+    Runs in the worker processes when using --jobs.
+
+    :param arguments: A tuple of (phrases, language, tokenize, tag, tagger).
+    :return: The phrases.
+    """
+    phrases, language, tokenize, tag, tagger = arguments
+
+    if tokenize:
+        from typecraft_python.integrations.nltk.tokenization import tokenize_phrase
+        for phrase in phrases:
+            tokenize_phrase(phrase)
+
+    if tag:
+        _get_tagger(tagger, language).tag_phrases(phrases, language)
+
+    return phrases
+
+
+def _iter_prepared_texts(texts, override_language, tokenize, tag, tagger, jobs):
+    """
+    Tokenizes and tags texts, in chunks of PHRASES_PER_JOB phrases processed by `jobs` processes.
+
+    :return: A generator of the texts, in input order.
+    """
+    def tasks():
+        for text in texts:
+            if override_language:
+                text.language = override_language
+
+            chunks = list(batch(text.phrases, PHRASES_PER_JOB)) or [[]]
+            for index, chunk in enumerate(chunks):
+                yield (text, index == len(chunks) - 1), (chunk, text.language, tokenize, tag, tagger)
+
+    phrases = []
+    for (text, is_last_chunk), chunk in imap_ordered(_prepare_phrases, tasks(), jobs):
+        phrases.extend(chunk)
+        if is_last_chunk:
+            text.phrases = phrases
+            phrases = []
+            yield text
+
+
+def _finish_text(text, title, meta, split, tagset):
+    """
+    Performs the steps of the xml command which are done after tagging.
+
+    :return: A generator of one or more texts, depending on `split`.
+    """
+    if title:
+        text.title = title
+
+    for key, value in meta:
+        text.add_metadata(key, value)
+
     if tagset != '':
         text.map_tags(tagset)
 
-    write_to_stdout_or_file(Parser.write([text]), output)
+    if split > 1:
+        batched_phrases = split_into_sublists(text.phrases, split)
+        for phrase_batch in batched_phrases:
+            new_text = copy.copy(text)
+            new_text.phrases = list(phrase_batch)
+            yield new_text
+    else:
+        yield text
 
 
 @main.command()
@@ -102,8 +264,14 @@ def raw(
 @click.option('--override-language', default=None, help='If set, will override the language used in all calculations and set the language for all texts.')
 @click.option('--meta', nargs=2, type=click.Tuple([str, str]), multiple=True, help="Metadata to attach to generated text(s)")
 @click.option('--tagset', type=str, default='', help='If set, the tags in the output will be converted into this tagset.')
+@click.option('--stream/--no-stream', default=False, help='If true, texts are read, processed and written one at a time.')
+@click.option('-j', '--jobs', default=1, type=int, help='The number of processes to tokenize, tag and write shards with.')
+@click.option('--shard-dir', type=click.Path(file_okay=False), default=None, help='If given, the output will be written to numbered files in this directory, with a manifest.')
+@click.option('--texts-per-shard', default=1, type=int, help='The maximum number of texts per file written to --shard-dir.')
+@click.option('--max-shard-size', default=None, type=int, help='If given, the maximum size in bytes of the texts of a file written to --shard-dir.')
+@click.option('--shard-name', default=SHARD_NAME_FORMAT, help='The name format of the files written to --shard-dir.')
 @click.option('-o', '--output', type=click.Path(), help='If given, the output will be written to this file, instead of stdout.')
-@click.argument('input', type=click.File('r'), nargs=-1)
+@click.argument('input', type=click.File('rb'), nargs=-1)
 def xml(
     input,
     tokenize,
@@ -115,53 +283,213 @@ def xml(
     override_language,
     meta,
     tagset,
+    stream,
+    jobs,
+    shard_dir,
+    texts_per_shard,
+    max_shard_size,
+    shard_name,
     output
 ):
     if split > 1 and merge:
         raise ValueError("Error running tpy xml: Both merge and split cannot be set to true")
 
-    texts = []
-    for _input in input:
-        texts.extend(Parser.parse(_input.read()))
-    new_texts = []
-    for text in texts:
-        if override_language:
-            text.language = override_language
+    if stream and merge:
+        raise ValueError("Error running tpy xml: Merge cannot be used when streaming")
 
-        if tokenize:
-            for phrase in text:
-                tokenize_phrase(phrase)
+    if shard_dir and output:
+        raise ValueError("Error running tpy xml: Both output and shard-dir cannot be set")
+
+    if stream:
+        texts = (text for _input in input for text in iter_texts(_input))
+    else:
+        texts = []
+        for _input in input:
+            texts.extend(Parser.parse_file(_input))
+
+    if stream or jobs > 1:
+        texts = _iter_prepared_texts(texts, override_language, tokenize, tag, tagger, jobs)
+    else:
+        for text in texts:
+            if override_language:
+                text.language = override_language
+            _prepare_phrases((text.phrases, text.language, tokenize, False, tagger))
 
         if tag:
-            _tagger = get_tagger_by_name(tagger)()
-            _tagger.tag_text(text, text.language)
+            # Tag all texts of a language at once, with one tagger per language
+            tag_texts_by_language(texts, tagger, _taggers.setdefault(tagger, {}))
 
-        if title:
-            text.title = title
+    new_texts = (new_text for text in texts for new_text in _finish_text(text, title, meta, split, tagset))
 
-        for key, value in meta:
-            text.add_metadata(key, value)
+    if shard_dir and not merge:
+        write_shards(new_texts, shard_dir, texts_per_shard, max_shard_size, shard_name, jobs)
+        return
 
-        if split > 1:
-            batched_phrases = split_into_sublists(text.phrases, split)
-            for phrase_batch in batched_phrases:
-                new_text = copy.copy(text)
-                new_text.phrases = list(phrase_batch)
-                new_texts.append(new_text)
-        else:
-            new_texts.append(text)
+    if stream:
+        with open_binary_output(output) as _output:
+            with TextWriter(_output) as writer:
+                for new_text in new_texts:
+                    writer.write(new_text)
+                    _output.flush()
+        return
 
+    new_texts = list(new_texts)
     if merge:
         root_text = new_texts[0]
         for text in new_texts[1:]:
             root_text.merge(text)
         new_texts = [root_text]
 
-    if tagset != '':
-        for text in new_texts:
-            text.map_tags(tagset)
+    if shard_dir:
+        write_shards(new_texts, shard_dir, texts_per_shard, max_shard_size, shard_name, jobs)
+        return
+
+    write_to_stdout_or_file(iter_serialized_document(new_texts), output)
 
-    write_to_stdout_or_file(Parser.write(new_texts), output)
+
+@main.command()
+@click.option('-o', '--output', type=click.Path(), help='If given, the output will be written to this file, instead of stdout.')
+@click.argument('input', type=click.File('rb'), nargs=-1)
+def cat(
+    input,
+    output
+):
+    """
+    This command merges the texts of one or more TCXml files into a single file, without parsing the texts.
+    """
+    with open_binary_output(output) as _output:
+        concatenate_documents(input, _output)
+
+
+@main.command()
+@click.option('--shard-dir', type=click.Path(file_okay=False), required=True, help='The directory to write the numbered files and the manifest to.')
+@click.option('--texts-per-shard', default=1, type=int, help='The maximum number of texts per file.')
+@click.option('--max-shard-size', default=None, type=int, help='If given, the maximum size in bytes of the texts of a file.')
+@click.option('--shard-name', default=SHARD_NAME_FORMAT, help='The name format of the files.')
+@click.option('-j', '--jobs', default=1, type=int, help='The number of processes to write files with.')
+@click.argument('input', type=click.File('rb'), nargs=-1)
+def shard(
+    input,
+    shard_dir,
+    texts_per_shard,
+    max_shard_size,
+    shard_name,
+    jobs
+):
+    """
+    This command splits the texts of one or more TCXml files into numbered files, without parsing the texts.
+    """
+    shard_documents(input, shard_dir, texts_per_shard, max_shard_size, shard_name, jobs)
+
+
+def _get_source(path):
+    """
+    Gets the source to read for an input path, which is stdin for '-'.
+    """
+    return sys.stdin if path == '-' else path
+
+
+@main.command()
+@click.option('-n', '--number', default=10, type=int, help='The number of texts, or phrases, to output.')
+@click.option('--phrases/--texts', default=False, help='If true, the first phrases are output, instead of the first texts.')
+@click.option('-o', '--output', type=click.Path(), help='If given, the output will be written to this file, instead of stdout.')
+@click.argument('input', type=click.Path(dir_okay=False, allow_dash=True))
+def head(
+    input,
+    number,
+    phrases,
+    output
+):
+    """
+    This command outputs the first texts or phrases of a TCXml file, without reading the rest of the file.
+    """
+    texts = head_phrases(_get_source(input), number) if phrases else head_texts(_get_source(input), number)
+    write_to_stdout_or_file(iter_serialized_document(texts), output)
+
+
+@main.command()
+@click.option('-n', '--number', default=10, type=int, help='The number of phrases to sample.')
+@click.option('--seed', default=None, type=int, help='The seed of the random sampling. The same seed gives the same sample.')
+@click.option('-o', '--output', type=click.Path(), help='If given, the output will be written to this file, instead of stdout.')
+@click.argument('input', type=click.Path(dir_okay=False, allow_dash=True))
+def sample(
+    input,
+    number,
+    seed,
+    output
+):
+    """
+    This command outputs a uniform random sample of the phrases of a TCXml file.
+    If the file has an index, see `tpy index`, only the texts holding the sampled phrases are read.
+    """
+    texts = sample_phrases(_get_source(input), number, seed)
+    write_to_stdout_or_file(iter_serialized_document(texts), output)
+
+
+@main.command()
+@click.option('--inverted/--no-inverted', default=False, help='Also write an inverted index of word forms, lemmas, POS tags and glosses.')
+@click.option('--suffix-array/--no-suffix-array', default=False, help='Also write a suffix array of the phrases and translations.')
+@click.argument('input', type=click.Path(exists=True, dir_okay=False), nargs=-1)
+def index(
+    inverted,
+    suffix_array,
+    input
+):
+    """
+    This command writes an offset index of each TCXml file next to the file, which is used by `tpy sample`.
+    With --inverted, an inverted index for searching the words of the file is written as well, and with
+    --suffix-array, a suffix array for finding substrings of the phrases and translations, see `tpy grep`.
+    """
+    for path in input:
+        write_offset_index(path)
+        if inverted:
+            # numpy is only imported when building an inverted index
+            from typecraft_python.search.index import write_inverted_index
+            write_inverted_index(path)
+        if suffix_array:
+            # numpy is only imported when building a suffix array
+            from typecraft_python.search.suffix_array import write_suffix_array
+            write_suffix_array(path)
+
+
+@main.command()
+@click.option('--key', type=click.Choice(sorted(SORT_KEYS.keys())), default='words', help='What to sort the phrases by.')
+@click.option('--max-memory', default=DEFAULT_MAX_MEMORY, type=int, help='The maximum number of bytes of phrases held in memory.')
+@click.option('--temporary-dir', type=click.Path(file_okay=False), default=None, help='The directory to write temporary files to.')
+@click.option('-o', '--output', type=click.Path(), help='If given, the output will be written to this file, instead of stdout.')
+@click.argument('input', type=click.Path(dir_okay=False, allow_dash=True))
+def sort(
+    input,
+    key,
+    max_memory,
+    temporary_dir,
+    output
+):
+    """
+    This command sorts the phrases of a TCXml file into a single text, using temporary files for large files.
+    """
+    with open_binary_output(output) as _output:
+        sort_phrases(_get_source(input), _output, key, max_memory, temporary_dir)
+
+
+@main.command()
+@click.option('--seed', default=None, type=int, help='The seed of the shuffle. The same seed gives the same order.')
+@click.option('--max-memory', default=DEFAULT_MAX_MEMORY, type=int, help='The maximum number of bytes of phrases held in memory.')
+@click.option('--temporary-dir', type=click.Path(file_okay=False), default=None, help='The directory to write temporary files to.')
+@click.option('-o', '--output', type=click.Path(), help='If given, the output will be written to this file, instead of stdout.')
+@click.argument('input', type=click.Path(dir_okay=False, allow_dash=True))
+def shuffle(
+    input,
+    seed,
+    max_memory,
+    temporary_dir,
+    output
+):
+    """
+    This command shuffles the phrases of a TCXml file into a single text, using temporary files for large files.
+    """
+    with open_binary_output(output) as _output:
+        shuffle_phrases(_get_source(input), _output, seed, max_memory, temporary_dir)
 
 
 @main.command()
@@ -170,7 +498,133 @@ def convert():
 
 
 @main.command()
-@click.argument('input', type=click.File('r'))
+@click.option('-w', '--window', default=5, type=int, help='The number of words of context on either side of a hit.')
+@click.option('--sort', type=click.Choice(['left', 'right']), default=None, help='Sort the lines by their left or right context.')
+@click.option('--width', default=40, type=int, help='The number of characters the left context is aligned in.')
+@click.option('--tsv/--no-tsv', default=False, help='Output tab-separated text number, phrase number, left context, hit and right context.')
+@click.option('-o', '--output', type=click.Path(), help='If given, the output will be written to this file, instead of stdout.')
+@click.argument('query')
+@click.argument('input', type=click.Path(dir_okay=False, allow_dash=True))
+def kwic(
+    window,
+    sort,
+    width,
+    tsv,
+    output,
+    query,
+    input
+):
+    """
+    This command lists the words of a TCXml file matching a query, with their context.
+
+    The query consists of terms like lemma:hus, combined with AND, OR and parentheses. The fields are form,
+    lower, lemma, pos and gloss. If the file has an up to date inverted index, see `tpy index --inverted`,
+    the hits are looked up in it, and the file is not read.
+    """
+    # numpy is only imported when searching
+    from typecraft_python.search.index import load_inverted_index, build_inverted_index
+    from typecraft_python.search.concordance import concordance, format_concordance_line
+
+    inverted_index = load_inverted_index(input)
+    if inverted_index is None:
+        inverted_index = build_inverted_index(_get_source(input))
+
+    def lines():
+        for line in concordance(inverted_index, query, window, sort):
+            if tsv:
+                yield u"%d\t%d\t%s\t%s\t%s\n" % (
+                    line.text, line.phrase, u" ".join(line.left), line.keyword, u" ".join(line.right)
+                )
+            else:
+                yield format_concordance_line(line, width) + u"\n"
+
+    write_to_stdout_or_file(lines(), output)
+
+
+@main.command()
+@click.option('-o', '--output', type=click.Path(), help='If given, the output will be written to this file, instead of stdout.')
+@click.argument('query')
+@click.argument('input', type=click.Path(dir_okay=False, allow_dash=True))
+def query(
+    output,
+    query,
+    input
+):
+    """
+    This command lists the sequences of words of a TCXml file matching a query, such as
+
+        [pos="ADJ"] []{0,2} [pos="N" & gloss="PL"]
+
+    Each match is output as a tab-separated line of the text number, the phrase number, the start and end of the
+    match in the phrase, and the matched words. If the file has an up to date inverted index, see
+    `tpy index --inverted`, only the phrases holding the rarest word required by the query are searched.
+    """
+    # numpy is only imported when searching
+    from typecraft_python.search.query import search_file
+
+    def lines():
+        for match in search_file(query, _get_source(input)):
+            yield u"%d\t%d\t%d\t%d\t%s\n" % (
+                match.text, match.phrase, match.span[0], match.span[1], u" ".join(word.word for word in match.words)
+            )
+
+    write_to_stdout_or_file(lines(), output)
+
+
+@main.command()
+@click.option('--prefix/--no-prefix', default=False, help='Only find the string at the start of a phrase or translation.')
+@click.option('-c', '--count', is_flag=True, default=False, help='Only output the number of occurrences.')
+@click.option('-o', '--output', type=click.Path(), help='If given, the output will be written to this file, instead of stdout.')
+@click.argument('string')
+@click.argument('input', type=click.Path(dir_okay=False, allow_dash=True))
+def grep(
+    prefix,
+    count,
+    output,
+    string,
+    input
+):
+    """
+    This command finds a string, such as part of a morpheme, in the phrases and translations of a TCXml file.
+
+    Each occurrence is output as a tab-separated line of the text number, the phrase number, the field
+    (phrase, translation or translation2), the offset of the string in it, and the phrase or translation,
+    with tabs and line breaks replaced by spaces.
+    If the file has an up to date suffix array, see `tpy index --suffix-array`, the occurrences are looked
+    up in it, and the file is not read.
+    """
+    # numpy is only imported when searching
+    from typecraft_python.search.suffix_array import load_suffix_array, scan_substring
+
+    if not string:
+        raise ValueError("Error running tpy grep: The string to find is empty.")
+
+    suffix_array = load_suffix_array(input)
+    if suffix_array is not None:
+        matches = ((match, suffix_array.get_segment(match.text, match.phrase, match.field))
+                   for match in suffix_array.find(string, prefix))
+    else:
+        matches = scan_substring(string, _get_source(input), prefix)
+
+    if count:
+        if suffix_array is not None:
+            number = len(suffix_array.find(string, prefix)) if prefix else suffix_array.count(string)
+        else:
+            number = sum(1 for _ in matches)
+        write_to_stdout_or_file(u"%d\n" % number, output)
+        return
+
+    def lines():
+        for match, value in matches:
+            # Tabs and line breaks are replaced one for one, so that the offsets remain valid
+            value = re.sub(u"[\t\r\n]", u" ", value)
+            yield u"%d\t%d\t%s\t%d\t%s\n" % (match.text, match.phrase, match.field, match.offset, value)
+
+    write_to_stdout_or_file(lines(), output)
+
+
+@main.command()
+@click.argument('input', type=click.File('rb'))
 def ntexts(
     input
 ):
@@ -179,37 +633,84 @@ def ntexts(
     :param input:
     :return:
     """
-    texts = Parser.parse(input.read())
-    click.echo(len(texts))
+    click.echo(count_texts(input))
 
 
 @main.command()
-@click.option('-f', '--format', type=str, default='continuous', help='The format of the parallel file.')
+@click.option('--json/--no-json', 'as_json', default=False, help='If true, the statistics are output as json.')
+@click.argument('input', type=click.File('rb'))
+def stats(
+    input,
+    as_json
+):
+    """
+    This command counts the texts, phrases, words, morphemes and glosses in a TCXml file,
+    in total, per language and per phrase validity.
+    """
+    statistics = collect_statistics(input)
+
+    if as_json:
+        import json
+        click.echo(json.dumps(statistics, indent=2))
+        return
+
+    columns = ['texts', 'phrases', 'words', 'morphemes', 'glosses']
+    click.echo("\t".join(['language'] + columns))
+    for language, counts in statistics['languages'].items():
+        click.echo("\t".join([language] + [str(counts[column]) for column in columns]))
+    click.echo("\t".join(['total'] + [str(statistics[column]) for column in columns]))
+    click.echo("")
+    click.echo("validity\tphrases")
+    for validity, count in statistics['validity'].items():
+        click.echo("%s\t%d" % (validity, count))
+
+
+@main.command()
+@click.option('-f', '--format', type=click.Choice(['continuous', 'tsv', 'files']), default='continuous', help='The format of the parallel file(s).')
 @click.option('-n', '--num-langs', type=int, default=2, help='The number of languages present.')
+@click.option('--align/--no-align', default=False, help='Align the sentences of two files by their lengths, instead of by line. Requires --format files.')
 @click.option('-o', '--output', type=click.Path(), help='If given, the output will be written to this file, instead of stdout.')
-@click.argument('input', type=click.File('r'), nargs=-1)
+@click.argument('input', type=click.File('rb'), nargs=-1)
 def par(
     format,
     num_langs,
+    align,
     output,
     input
 ):
     """
     The `par` command attempts to parse raw text as parallel corpora.
 
-    The input is one or more files containing raw text, in some parallel format.
-    """
-    contents = ""
-    for _input in input:
-        _contents = _input.read()
-        if _contents[-1] != "\n":
-            _contents += "\n"
-        contents += _contents
-
-    phrases = parse_continuous_parallel_text_to_phrases(contents, num_langs)
-    text = Text(title="Automatically generated parallel corpus", phrases=phrases)
+    The input is one or more files containing raw text, in some parallel format:
+    `continuous`, where each phrase is followed by its translations on the following lines,
+    `tsv`, where each line holds a phrase and its translations separated by tabs, or
+    `files`, where each file holds one language, and line n of every file holds the same phrase.
 
-    write_to_stdout_or_file(Parser.write([text]), output)
+    With --align, the files are two sentence-split documents, one line per sentence, whose sentences
+    are aligned by their lengths, see typecraft_python.alignment.gale_church.
+    """
+    if align and (format != 'files' or len(input) != 2):
+        raise ValueError("Error running tpy par: Aligning requires --format files and exactly two input files")
+
+    inputs = [open_text_input(_input) for _input in input]
+    if align:
+        # numpy is only imported when aligning
+        from typecraft_python.alignment.gale_church import align_sentences
+        tuples = align_sentences(*[list(iter_lines([_input])) for _input in inputs])
+    elif format == 'files':
+        tuples = iter_aligned_files_parallel_tuples(inputs)
+    elif format == 'tsv':
+        tuples = iter_tab_separated_parallel_tuples(iter_lines(inputs))
+    else:
+        tuples = iter_continuous_parallel_tuples(iter_lines(inputs), num_langs)
+
+    # The phrases are written as they are read, so the input is never held in memory
+    with open_binary_output(output) as _output:
+        with TextWriter(_output) as writer:
+            writer.start_text(Text(title="Automatically generated parallel corpus"))
+            for phrase in iter_parallel_phrases(tuples):
+                writer.write_phrase(phrase)
+            writer.end_text()
 
 
 if __name__ == '__main__':
@@ -1,6 +1,17 @@
-import click
-import six
 import codecs
+import io
+import sys
+
+import six
+from contextlib import contextmanager
+
+from typecraft_python.parsing.compression import open_input, open_output
+
+
+"""
+Small chunks of output are collected until they amount to this many bytes, and then written at once.
+"""
+OUTPUT_BUFFER_SIZE = 1024 * 1024
 
 
 def write_to_stdout_or_file(
@@ -8,19 +19,97 @@ def write_to_stdout_or_file(
     path_or_file,
     encoding="utf-8"
 ):
+    """
+    Writes content to stdout, a file object or a file path. Bytes are written as they are,
+    without being decoded and re-encoded.
+
+    :param content_to_write: Bytes, a string, or an iterable of bytes or strings, which are written one at a time.
+    :param path_or_file: A path, a file object, or None or '-' for stdout. See open_binary_output.
+    :param encoding: The encoding strings are written in.
+    :return: Nothing
+    """
+    if isinstance(content_to_write, (six.binary_type, six.text_type)):
+        content_to_write = [content_to_write]
+
+    with open_binary_output(path_or_file) as _output:
+        buffered = []
+        buffered_size = 0
+        for chunk in content_to_write:
+            if isinstance(chunk, six.text_type):
+                chunk = chunk.encode(encoding)
+            buffered.append(chunk)
+            buffered_size += len(chunk)
+            if buffered_size >= OUTPUT_BUFFER_SIZE:
+                _output.write(b"".join(buffered))
+                buffered = []
+                buffered_size = 0
+        _output.write(b"".join(buffered))
+
+
+class _DecodingWriter(object):
+    """
+    Writes bytes to a text file object without a binary buffer, such as a StringIO, by decoding them.
+    """
+
+    def __init__(self, _file, encoding="utf-8"):
+        self._file = _file
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+
+    def write(self, data):
+        self._file.write(self._decoder.decode(data))
+
+    def flush(self):
+        self._file.write(self._decoder.decode(b"", final=True))
+        self._file.flush()
+
+
+@contextmanager
+def _open_file_object_output(_file):
+    """
+    Gets a binary stream writing to a file object. Text files are written through their binary buffer,
+    after flushing any text written before, or by decoding the bytes if they have no buffer.
+    """
+    if isinstance(_file, io.TextIOBase) or hasattr(_file, 'buffer'):
+        if hasattr(_file, 'buffer'):
+            _file.flush()
+            output = _file.buffer
+        else:
+            output = _DecodingWriter(_file)
+        yield output
+        output.flush()
+    else:
+        yield _file
+
+
+@contextmanager
+def open_binary_output(path_or_file):
+    """
+    Opens a binary output stream to stdout, a file object or a file path.
+
+    :param path_or_file: A path, a file object, or None or '-' for stdout.
+    :return: A context manager yielding a binary file object. Files opened by path are closed on exit,
+             and compressed if the path has a compressed extension.
+    """
     if not path_or_file or path_or_file == '-':
-        click.echo(content_to_write)
+        with _open_file_object_output(sys.stdout) as stdout:
+            yield stdout
+            stdout.flush()
     elif hasattr(path_or_file, 'write'):
-        if isinstance(content_to_write, str):
-            path_or_file.write(content_to_write)
-        else:
-            path_or_file.write(content_to_write.decode("utf-8"))
+        with _open_file_object_output(path_or_file) as _output:
+            yield _output
     elif isinstance(path_or_file, six.string_types):
-        # Try to open file given by path
-        with codecs.open(path_or_file, 'w+', encoding=encoding) as _file:
-            if isinstance(content_to_write, str):
-                _file.write(content_to_write)
-            else:
-                _file.write(content_to_write.decode("utf-8"))
+        with open_output(path_or_file) as _file:
+            yield _file
     else:
         raise ValueError("Argument `path_or_file` is not a path or a file.")
+
+
+def open_text_input(_file, encoding="utf-8"):
+    """
+    Opens an input file of raw text, decompressing it if it is compressed.
+
+    :param _file: A file object, as given by click.File('rb').
+    :param encoding:
+    :return: A text file object.
+    """
+    return io.TextIOWrapper(open_input(_file), encoding=encoding)
@@ -81,6 +81,34 @@ class TypecraftTagger(object):
     methods which taggers that accept typecraft objects should have.
     """
 
+    def get_name(self):
+        """
+        Returns the name of the tagger. Used to tell the results of different taggers apart,
+        e.g. when caching tagging results.
+
+        :return: The name of the tagger.
+        """
+        return self.__class__.__name__
+
+    def get_version(self):
+        """
+        Returns the version of the tagger, or of the tagging model it uses.
+        Results of different tagger versions are never mixed when caching.
+
+        :return: A version string.
+        """
+        return ""
+
+    def warm_up(self, *languages):
+        """
+        Loads whatever the tagger needs to tag the given languages, e.g. models or external processes,
+        so that the first tagging call does not pay for it. Does nothing by default.
+
+        :param languages: One or more languages.
+        :return: Nothing
+        """
+        pass
+
     def is_parser(self):
         """
         This method should return true if the tagger supports morphological parsing
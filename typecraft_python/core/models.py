@@ -4,12 +4,25 @@ This file contains all models.
 
 import six
 from enum import Enum
-from yaml import dump
 
 from typecraft_python.parsing.mappings import get_pos_conversions, get_gloss_conversions
 from typecraft_python.core.interfaces import TypecraftModel
 
 
+def _dump(dictionary):
+    """
+    Dumps a dict to a human-readable yaml string.
+
+    yaml is only used for the string representations of the models, so it is
+    imported here rather than when the models are loaded.
+
+    :param dictionary:
+    :return: A yaml string.
+    """
+    from yaml import dump as yaml_dump
+    return yaml_dump(dictionary)
+
+
 class Corpus(TypecraftModel):
     """
     The class representing a corpus files.
@@ -217,7 +230,7 @@ class Text(TypecraftModel):
         return self.phrases[item]
 
     def __str__(self):
-        return dump(self.to_dict())
+        return _dump(self.to_dict())
 
     def __iter__(self):
         return self.phrases.__iter__()
@@ -464,7 +477,7 @@ class Phrase(TypecraftModel):
         return self.words[item]
 
     def __str__(self):
-        return dump(self.to_dict())
+        return _dump(self.to_dict())
 
     def __iter__(self):
         return self.words.__iter__()
@@ -581,7 +594,7 @@ class Word(TypecraftModel):
         return self.morphemes[item]
 
     def __str__(self):
-        return dump(self.to_dict())
+        return _dump(self.to_dict())
 
     def __iter__(self):
         return self.morphemes.__iter__()
@@ -734,7 +747,7 @@ class Morpheme(TypecraftModel):
         }
 
     def __str__(self):
-        return dump(self.to_dict())
+        return _dump(self.to_dict())
 
 
 class GlobalTagSet(object):
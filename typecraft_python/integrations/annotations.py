@@ -0,0 +1,53 @@
+"""
+This module contains functionality for copying the annotations a tagger has added to a word onto other words
+of the same form, as done by the tagging cache and by annotating per word type.
+"""
+from typecraft_python.core.models import Morpheme
+
+
+def get_annotations(word):
+    """
+    Extracts the annotations of a word tagged from its form alone, in a json-serializable form.
+    Every attribute of the word but the form itself is included.
+
+    :param word: A Word.
+    :return: A dict.
+    """
+    return {
+        'ipa': word.ipa,
+        'pos': word.pos,
+        'stem_morpheme': word.stem_morpheme,
+        'morphemes': [[morpheme.morpheme, morpheme.meaning, morpheme.baseform, list(morpheme.glosses)]
+                      for morpheme in word.morphemes]
+    }
+
+
+def apply_annotations(word, annotations):
+    """
+    Applies annotations extracted with get_annotations to a word, in the same way as the taggers do:
+    The pos tag is always set, and morphemes are only added to a word without any morphemes.
+    The ipa and stem morpheme are only set if they were annotated, so that existing values are kept.
+
+    :param word: A Word.
+    :param annotations: A dict.
+    :return: Nothing
+    """
+    word.pos = annotations['pos']
+    if annotations['ipa']:
+        word.ipa = annotations['ipa']
+    if annotations['stem_morpheme'] is not None:
+        word.stem_morpheme = annotations['stem_morpheme']
+    if len(word.morphemes) == 0:
+        for morpheme, meaning, baseform, glosses in annotations['morphemes']:
+            word.add_morpheme(Morpheme(morpheme, meaning, baseform, list(glosses)))
+
+
+def copy_annotations(source, target):
+    """
+    Copies the annotations of a tagged word to another word. See apply_annotations.
+
+    :param source: A Word.
+    :param target: A Word.
+    :return: Nothing
+    """
+    apply_annotations(target, get_annotations(source))
@@ -0,0 +1,194 @@
+"""
+This module contains an asyncio based API for tagging.
+
+External taggers such as the TreeTagger and the OBT do their work in separate processes.
+The AsyncTaggerPool runs several of these concurrently, under a concurrency limit, while
+the event loop is free to parse and write other texts:
+
+    async def tag_files(paths):
+        async with AsyncTaggerPool(TreeTagger, max_concurrency=4, timeout=60) as pool:
+            async for text in pool.tag_texts_async(read_texts(paths)):
+                write_text(text)
+
+This module requires Python 3.6 or newer.
+"""
+import asyncio
+import collections
+import copy
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+async def run_subprocess(args, input=None, timeout=None):
+    """
+    Runs a subprocess, and returns its output.
+
+    :param args: The command to run, as a list.
+    :param input: Bytes to write to the stdin of the process, if any.
+    :param timeout: The maximum number of seconds to wait for the process. If exceeded, the
+                    process is killed and an asyncio.TimeoutError is raised.
+    :return: The stdout of the process, as bytes.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(input), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        process.kill()
+        await process.wait()
+        raise
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, args, stdout)
+    return stdout
+
+
+def _get_running_loop():
+    # asyncio.get_running_loop was added in Python 3.7
+    if hasattr(asyncio, 'get_running_loop'):
+        return asyncio.get_running_loop()
+    return asyncio.get_event_loop()
+
+
+async def _iterate(iterable):
+    """
+    Iterates over either a regular or an asynchronous iterable.
+    """
+    if hasattr(iterable, '__aiter__'):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+class AsyncTaggerPool(object):
+    """
+    Runs the blocking methods of a TypecraftTagger in a pool of worker threads, and exposes them as coroutines.
+
+    Each worker thread gets its own tagger instance from `tagger_factory`, which is kept warm
+    between calls. At most `max_concurrency` tagging calls run at the same time.
+    """
+
+    def __init__(self, tagger_factory, max_concurrency=4, timeout=None, max_pending=None):
+        """
+        :param tagger_factory: A callable returning a new TypecraftTagger, e.g. a tagger class.
+        :param max_concurrency: The maximum number of concurrent tagging calls.
+        :param timeout: The maximum number of seconds a single tagging call may take, or None.
+                        A call running in a thread cannot be interrupted, but the coroutine waiting
+                        for it raises asyncio.TimeoutError. With a timeout, texts and phrases are
+                        copied before they are tagged, and the tagged copies are returned, so that
+                        a call still running after its timeout does not modify the objects given.
+        :param max_pending: The maximum number of texts `tag_texts_async` reads ahead of the
+                            consumer. Defaults to twice `max_concurrency`.
+        """
+        assert max_concurrency > 0
+        self.tagger_factory = tagger_factory
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_pending = max_pending or 2 * max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._local = threading.local()
+        # Created on first use, so that it belongs to the running event loop
+        self._semaphore = None
+
+    def _get_tagger(self):
+        tagger = getattr(self._local, 'tagger', None)
+        if tagger is None:
+            tagger = self.tagger_factory()
+            self._local.tagger = tagger
+        return tagger
+
+    def _get_semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _call_tagger(self, method_name, *args):
+        return getattr(self._get_tagger(), method_name)(*args)
+
+    async def _run(self, method_name, *args):
+        """
+        Calls a method of the tagger of a worker thread, respecting the concurrency limit and the timeout.
+        """
+        async with self._get_semaphore():
+            future = _get_running_loop().run_in_executor(
+                self._executor, self._call_tagger, method_name, *args
+            )
+            return await asyncio.wait_for(future, self.timeout)
+
+    async def tag_raw_async(self, raw_text, language='en'):
+        """
+        Tags a raw text. See TypecraftTagger.tag_raw.
+
+        :param raw_text:
+        :param language:
+        :return: A list of Phrase objects.
+        """
+        return await self._run('tag_raw', raw_text, language)
+
+    async def tag_text_async(self, text, language=None):
+        """
+        Tags a Text object. See TypecraftTagger.tag_text.
+
+        :param text:
+        :param language: The language to tag the text as. Defaults to the language of the text.
+        :return: The tagged text, which is a copy of the text if the pool has a timeout.
+        """
+        language = language or text.language
+        if self.timeout is not None:
+            text = copy.deepcopy(text)
+        return await self._run('tag_text', text, language)
+
+    async def tag_phrases_async(self, phrases, language='en'):
+        """
+        Tags a list of Phrase objects. See TypecraftTagger.tag_phrases.
+
+        :param phrases:
+        :param language:
+        :return: The tagged phrases, which are copies of the phrases if the pool has a timeout.
+        """
+        if self.timeout is not None:
+            phrases = copy.deepcopy(phrases)
+        return await self._run('tag_phrases', phrases, language)
+
+    async def tag_texts_async(self, texts, language=None):
+        """
+        Tags an iterable or asynchronous iterable of texts concurrently, yielding each
+        text as soon as it and all texts before it are tagged.
+
+        At most `max_pending` texts are read from `texts` ahead of the consumer, which
+        bounds the memory used when the consumer is slower than the taggers.
+
+        :param texts: An iterable or asynchronous iterable of Text objects.
+        :param language: The language to tag the texts as. Defaults to the language of each text.
+        :return: An asynchronous generator of tagged texts, in input order. See tag_text_async.
+        """
+        pending = collections.deque()
+        try:
+            async for text in _iterate(texts):
+                pending.append(asyncio.ensure_future(self.tag_text_async(text, language)))
+                if len(pending) >= self.max_pending:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self):
+        """
+        Shuts down the worker threads.
+        """
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
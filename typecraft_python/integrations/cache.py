@@ -0,0 +1,298 @@
+"""
+This module contains a cache for tagging results, and a tagger decorator using it.
+
+Corpora often contain many repeated phrases (boilerplate, elicitation templates,
+duplicated sentences). A `CachedTagger` wraps any TypecraftTagger, and only calls out
+to the wrapped tagger for token sequences it has not seen before.
+"""
+import json
+import sqlite3
+from collections import OrderedDict
+
+from typecraft_python.core.interfaces import TypecraftTagger
+from typecraft_python.core.models import Phrase, Word
+from typecraft_python.integrations.annotations import get_annotations, apply_annotations
+
+"""
+The version of the format of the cached annotations, which is part of the keys, so that entries
+stored on disk in an older format are not used.
+"""
+ANNOTATION_FORMAT_VERSION = 2
+
+
+class LRUCache(object):
+    """
+    A simple dict-like cache holding at most `maxsize` entries. When full, the least
+    recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize=100000):
+        assert maxsize > 0
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        """
+        Gets a value from the cache, marking it as the most recently used.
+
+        :param key:
+        :param default: Returned if the key does not exist.
+        :return:
+        """
+        if key not in self._data:
+            return default
+        value = self._data.pop(key)
+        self._data[key] = value
+        return value
+
+    def put(self, key, value):
+        """
+        Puts a value into the cache, evicting the least recently used value if the cache is full.
+
+        :param key:
+        :param value:
+        :return: Nothing
+        """
+        if key in self._data:
+            del self._data[key]
+        elif len(self._data) >= self.maxsize:
+            self._data.popitem(last=False)
+        self._data[key] = value
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TaggingCache(object):
+    """
+    A two-tiered cache of tagging results.
+
+    The first tier is an in-memory LRU cache. The optional second tier is an sqlite database
+    on disk, which persists results between runs. Values are looked up in memory first, then
+    on disk. Values found on disk are promoted to memory.
+
+    The counters `hits`, `misses`, `memory_hits` and `disk_hits` can be used to size the cache.
+    """
+
+    def __init__(self, maxsize=100000, path=None):
+        """
+        :param maxsize: The maximum number of entries held in memory.
+        :param path: If given, the path of an sqlite database used as persistent store.
+        """
+        self.memory = LRUCache(maxsize)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self._connection = None
+
+        if path is not None:
+            self._connection = sqlite3.connect(path)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS tagging_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._connection.commit()
+
+    @staticmethod
+    def _serialize_key(key):
+        return json.dumps(key)
+
+    def get(self, key):
+        """
+        Looks up a key.
+
+        :param key: A hashable, json-serializable key.
+        :return: The cached value, or None if it does not exist.
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            self.memory_hits += 1
+            return value
+
+        if self._connection is not None:
+            row = self._connection.execute(
+                "SELECT value FROM tagging_cache WHERE key = ?", (self._serialize_key(key),)
+            ).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                self.memory.put(key, value)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """
+        Stores a value.
+
+        :param key: A hashable, json-serializable key.
+        :param value: A json-serializable value.
+        :return: Nothing
+        """
+        self.put_many([(key, value)])
+
+    def put_many(self, items):
+        """
+        Stores an iterable of (key, value) pairs. Writes to disk are done in a single transaction.
+
+        :param items:
+        :return: Nothing
+        """
+        items = list(items)
+        for key, value in items:
+            self.memory.put(key, value)
+
+        if self._connection is not None and len(items) > 0:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO tagging_cache (key, value) VALUES (?, ?)",
+                [(self._serialize_key(key), json.dumps(value)) for key, value in items]
+            )
+            self._connection.commit()
+
+    def stats(self):
+        """
+        Returns the hit and miss counters of the cache.
+
+        :return: A dict.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'memory_size': len(self.memory)
+        }
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class CachedTagger(TypecraftTagger):
+    """
+    A tagger decorator which caches the results of another tagger.
+
+    Results are keyed by (tagger name, tagger version, language, tokens). Every attribute the wrapped
+    tagger sets on the words is cached, see typecraft_python.integrations.annotations. Only tagging
+    of already tokenized words (`tag_text`, `tag_phrases`, `tag_phrase`, `tag_words` and
+    `tag_word`) is cached. Tagging of raw text is passed straight through.
+
+    Example:
+        tagger = CachedTagger(NltkTagger(), TaggingCache(path='tagging_cache.db'))
+        tagger.tag_text(text, 'en')
+    """
+
+    def __init__(self, tagger, cache=None):
+        """
+        :param tagger: The TypecraftTagger to cache the results of.
+        :param cache: A TaggingCache. If not given, an in-memory cache is used.
+        """
+        assert isinstance(tagger, TypecraftTagger)
+        self.tagger = tagger
+        self.cache = cache if cache is not None else TaggingCache()
+
+    def _get_key(self, words, language):
+        return (
+            ANNOTATION_FORMAT_VERSION,
+            self.tagger.get_name(),
+            self.tagger.get_version(),
+            language,
+            tuple(word.word for word in words)
+        )
+
+    def _tag_word_lists(self, word_lists, language):
+        """
+        Tags a number of word lists, looking up each in the cache first. All
+        lists that are not in the cache are tagged in a single call to the wrapped tagger.
+
+        :param word_lists: A list of lists of Word objects.
+        :param language:
+        :return: Nothing
+        """
+        missed = OrderedDict()
+        for words in word_lists:
+            if len(words) == 0:
+                continue
+            key = self._get_key(words, language)
+            if key in missed:
+                missed[key].append(words)
+                continue
+
+            annotations = self.cache.get(key)
+            if annotations is None:
+                missed[key] = [words]
+            else:
+                for word, word_annotations in zip(words, annotations):
+                    apply_annotations(word, word_annotations)
+
+        if len(missed) == 0:
+            return
+
+        # The wrapped tagger tags fresh copies, so that annotations already present
+        # on the words are not stored in the cache.
+        fresh_phrases = [Phrase(words=[Word(word.word) for word in group[0]]) for group in missed.values()]
+        self.tagger.tag_phrases(fresh_phrases, language)
+
+        items = []
+        for (key, group), fresh_phrase in zip(missed.items(), fresh_phrases):
+            annotations = [get_annotations(word) for word in fresh_phrase.words]
+            items.append((key, annotations))
+            for words in group:
+                for word, word_annotations in zip(words, annotations):
+                    apply_annotations(word, word_annotations)
+        self.cache.put_many(items)
+
+    def get_name(self):
+        return self.tagger.get_name()
+
+    def get_version(self):
+        return self.tagger.get_version()
+
+    def is_parser(self):
+        return self.tagger.is_parser()
+
+    def has_automatic_sentence_tokenization_support(self, language='en'):
+        return self.tagger.has_automatic_sentence_tokenization_support(language)
+
+    def has_automatic_word_tokenization_support(self, language='en'):
+        return self.tagger.has_automatic_word_tokenization_support(language)
+
+    def tag_raw(self, raw_text, language='en'):
+        return self.tagger.tag_raw(raw_text, language)
+
+    def tag_raw_phrases(self, phrases, language='en'):
+        return self.tagger.tag_raw_phrases(phrases, language)
+
+    def tag_raw_words(self, word_list, language='en'):
+        return self.tagger.tag_raw_words(word_list, language)
+
+    def tag_text(self, text, language='en'):
+        self.tag_phrases(text.phrases, language)
+        return text
+
+    def tag_phrases(self, phrases, language='en'):
+        self._tag_word_lists([phrase.words for phrase in phrases], language)
+        return phrases
+
+    def tag_phrase(self, phrase, language='en'):
+        self._tag_word_lists([phrase.words], language)
+        return phrase
+
+    def tag_words(self, words, language='en'):
+        self._tag_word_lists([words], language)
+        return words
+
+    def tag_word(self, word, language='en'):
+        self._tag_word_lists([[word]], language)
+        return word
@@ -7,8 +7,61 @@ except ImportError:
     sys.stderr.write("Unable to load NLTK, are you sure it is installed?")
 
 from typecraft_python.models import Word, Morpheme
+from typecraft_python.integrations.cache import LRUCache
+from typecraft_python.integrations.wordtypes import collect_word_types
 
-lemmatizer = nltk.WordNetLemmatizer()
+_lemmatizer = None
+
+"""
+The maximum number of lemmas kept in memory by `lemmatize`.
+"""
+LEMMA_CACHE_SIZE = 50000
+
+_lemma_cache = LRUCache(LEMMA_CACHE_SIZE)
+
+
+def _get_lemmatizer():
+    """
+    Gets the WordNet lemmatizer, creating it on first use.
+
+    :return: An nltk WordNetLemmatizer.
+    """
+    global _lemmatizer
+    if _lemmatizer is None:
+        _lemmatizer = nltk.WordNetLemmatizer()
+    return _lemmatizer
+
+
+def lemmatize(token):
+    """
+    Lemmatizes a single token. The lemmas of the most recently used tokens are memoized.
+
+    :param token: A string.
+    :return: The lemma of the lower-cased token.
+    """
+    token = token.lower()
+    lemma = _lemma_cache.get(token)
+    if lemma is None:
+        lemma = _get_lemmatizer().lemmatize(token)
+        _lemma_cache.put(token, lemma)
+    return lemma
+
+
+def _set_lemma(word, lemma):
+    """
+    Saves a lemma as the citation form of a word.
+    If the word has no morphemes, a single morpheme is created.
+
+    :param word:
+    :param lemma:
+    :return: Nothing
+    """
+    if len(word.morphemes) > 0:
+        word.morphemes[0].baseform = lemma
+    else:
+        morpheme = Morpheme(word.word)
+        morpheme.baseform = lemma
+        word.add_morpheme(morpheme)
 
 
 def lemmatize_word(word):
@@ -22,13 +75,7 @@ def lemmatize_word(word):
     """
     assert isinstance(word, Word)
 
-    lemma = lemmatizer.lemmatize(word.word.lower())
-    if len(word.morphemes) > 0:
-        word.morphemes[0].baseform = lemma
-    else:
-        morpheme = Morpheme(word.word)
-        morpheme.baseform = lemma
-        word.add_morpheme(morpheme)
+    _set_lemma(word, lemmatize(word.word))
     return word
 
 
@@ -42,3 +89,44 @@ def lemmatize_phrase(phrase):
     for word in phrase:
         lemmatize_word(word)
     return phrase
+
+
+def lemmatize_word_types(obj):
+    """
+    Lemmatizes all words of a Corpus, Text or an iterable of these.
+
+    The distinct (lower-cased) word types are collected first. Each type is then
+    lemmatized once, and the lemma is saved on every word of that type.
+
+    :param obj: A Corpus, Text, Phrase or an iterable of these.
+    :return: The number of distinct word types lemmatized.
+    """
+    word_types = collect_word_types(obj, key=lambda word: word.word.lower())
+    lemmatizer = _get_lemmatizer()
+    for word_type, words in word_types.items():
+        lemma = lemmatizer.lemmatize(word_type)
+        for word in words:
+            _set_lemma(word, lemma)
+    return len(word_types)
+
+
+def lemmatize_text(text):
+    """
+    Lemmatizes a text, annotating each distinct word type once. See `lemmatize_word_types`.
+
+    :param text: A Text object.
+    :return: The text.
+    """
+    lemmatize_word_types(text)
+    return text
+
+
+def lemmatize_corpus(corpus):
+    """
+    Lemmatizes all texts of a corpus, annotating each distinct word type once. See `lemmatize_word_types`.
+
+    :param corpus: A Corpus object.
+    :return: The corpus.
+    """
+    lemmatize_word_types(corpus)
+    return corpus
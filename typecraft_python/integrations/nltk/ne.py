@@ -1,7 +1,50 @@
+from multiprocessing import Pool
+
 import nltk
 
+from typecraft_python.integrations.nltk.tagger import NltkTagger
 from typecraft_python.integrations.nltk.util import _parse_entity_tree_for_named_entities
 
+"""
+The number of phrases sent to each worker process at a time by `find_named_entities_for_phrases`.
+"""
+DEFAULT_BATCH_SIZE = 500
+
+
+def _find_named_entities_for_token_lists(token_lists, binary=False):
+    """
+    Pos-tags and ne-chunks a list of token lists in batch.
+
+    :param token_lists: A list of lists of strings.
+    :param binary: Should the returned named entity tags be of binary type?
+    :return: A list with a list of (tag, entity) tuples for each token list.
+    """
+    non_empty = [tokens for tokens in token_lists if len(tokens) > 0]
+    tagged = NltkTagger._get_tagger_instance('en').tag_sents(non_empty)
+    parsed = iter([_parse_entity_tree_for_named_entities(tree)
+                   for tree in nltk.chunk.ne_chunk_sents(tagged, binary)])
+    return [next(parsed) if len(tokens) > 0 else [] for tokens in token_lists]
+
+
+def _find_named_entities_for_batch(args):
+    """
+    Entry point of the worker processes used by `find_named_entities_for_phrases`.
+
+    :param args: A (token_lists, binary) tuple.
+    :return:
+    """
+    return _find_named_entities_for_token_lists(*args)
+
+
+def _add_named_entities_to_phrase(phrase, parsed):
+    if len(parsed) == 0:
+        return phrase
+
+    phrase.comment += "\nNamed entities:\n%s" % ("\n".join(
+        [("%s: %s" % (ne[0], ne[1])) for ne in parsed]
+    ))
+    return phrase
+
 
 def find_named_entities_for_phrase(phrase, binary=False):
     """
@@ -14,14 +57,65 @@ def find_named_entities_for_phrase(phrase, binary=False):
              Thus this return value need not be used.
     """
     words = [word.word for word in phrase]
-    tagged = nltk.pos_tag(words)
-    entities = nltk.chunk.ne_chunk(tagged, binary)
-    parsed = _parse_entity_tree_for_named_entities(entities)
+    parsed = _find_named_entities_for_token_lists([words], binary)[0]
+    return _add_named_entities_to_phrase(phrase, parsed)
 
-    if len(parsed) == 0:
-        return phrase
 
-    phrase.comment += "\nNamed entities:\n%s" % ("\n".join(
-        [("%s: %s" % (ne[0], ne[1])) for ne in parsed]
-    ))
-    return phrase
+def find_named_entities_for_phrases(phrases, binary=False, processes=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Finds all the named entities of a list of phrases, and adds them to the comment of each phrase.
+
+    All phrases are pos-tagged and chunked in batches. If `processes` is greater than 1, the
+    batches are processed in a pool of that many processes.
+
+    :param phrases: A list of Phrase objects.
+    :param binary: Should the returned named entity tags be of binary type?
+    :param processes: The number of worker processes to use. Defaults to the current process only.
+    :param batch_size: The number of phrases in each batch sent to a worker process.
+    :return: The phrases. Note that the alteration is done in-place.
+    """
+    phrases = list(phrases)
+    token_lists = [[word.word for word in phrase] for phrase in phrases]
+
+    if processes is not None and processes > 1:
+        batches = [(token_lists[i:i + batch_size], binary) for i in range(0, len(token_lists), batch_size)]
+        pool = Pool(processes)
+        try:
+            parsed_lists = [parsed for batch in pool.map(_find_named_entities_for_batch, batches) for parsed in batch]
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        parsed_lists = _find_named_entities_for_token_lists(token_lists, binary)
+
+    for phrase, parsed in zip(phrases, parsed_lists):
+        _add_named_entities_to_phrase(phrase, parsed)
+    return phrases
+
+
+def find_named_entities_for_text(text, binary=False, processes=None):
+    """
+    Finds all the named entities of all phrases of a text, and adds them to the comment of each phrase.
+    See `find_named_entities_for_phrases`.
+
+    :param text: A Text.
+    :param binary: Should the returned named entity tags be of binary type?
+    :param processes: The number of worker processes to use.
+    :return: The Text.
+    """
+    find_named_entities_for_phrases(text.phrases, binary, processes)
+    return text
+
+
+def find_named_entities_for_corpus(corpus, binary=False, processes=None):
+    """
+    Finds all the named entities of all phrases in a corpus, processing the phrases of all texts together.
+    See `find_named_entities_for_phrases`.
+
+    :param corpus: A Corpus.
+    :param binary: Should the returned named entity tags be of binary type?
+    :param processes: The number of worker processes to use.
+    :return: The Corpus.
+    """
+    find_named_entities_for_phrases([phrase for text in corpus for phrase in text.phrases], binary, processes)
+    return corpus
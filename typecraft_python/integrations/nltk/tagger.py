@@ -9,8 +9,31 @@ except ImportError:
     nltk = None
     sys.stderr.write("Unable to load NLTK, are you sure it is installed?")
 
+"""
+Translations from the language codes used in Typecraft to the language codes
+understood by the nltk perceptron tagger. Nltk currently only supports English and Russian.
+"""
+NLTK_LANGUAGES = {
+    'en': 'eng',
+    'eng': 'eng',
+    'english': 'eng',
+    'ru': 'rus',
+    'rus': 'rus',
+    'russian': 'rus'
+}
+
 
 class NltkTagger(TypecraftTagger):
+    """
+    Tagger using the averaged perceptron tagger of nltk.
+
+    Loading the perceptron model is by far the most expensive part of tagging, so
+    the loaded taggers are kept in a class-level dict, one per language. Every
+    NltkTagger in the process shares them, and the model is loaded at most once
+    per language. Call `warm_up` to load the models up front.
+    """
+
+    _tagger_instances = {}
 
     def is_parser(self):
         return False
@@ -21,20 +44,89 @@ class NltkTagger(TypecraftTagger):
     def has_automatic_word_tokenization_support(self, language='en'):
         return False
 
+    @staticmethod
+    def _get_nltk_language(language='en'):
+        """
+        Translates a language code into the language code used by nltk.
+
+        :param language: A language code, e.g. 'en'.
+        :return: The nltk language code, e.g. 'eng'.
+        """
+        nltk_language = NLTK_LANGUAGES.get(language.lower())
+        if nltk_language is None:
+            raise NotImplementedError("Nltk does not support tagging the language '%s'" % (language,))
+        return nltk_language
+
+    @classmethod
+    def _get_tagger_instance(cls, language='en'):
+        """
+        Gets the perceptron tagger for a language, loading it if it is not already loaded.
+
+        :param language: The language of the tagger.
+        :return: An nltk tagger instance.
+        """
+        nltk_language = cls._get_nltk_language(language)
+        tagger = cls._tagger_instances.get(nltk_language)
+        if tagger is None:
+            try:
+                tagger = nltk.tag.PerceptronTagger(lang=nltk_language)
+            except TypeError:
+                # Older versions of nltk have no lang argument, and only load the English model
+                if nltk_language != 'eng':
+                    raise NotImplementedError("This version of nltk does not support tagging the language '%s'"
+                                              % (language,))
+                tagger = nltk.tag.PerceptronTagger()
+            cls._tagger_instances[nltk_language] = tagger
+        return tagger
+
+    @classmethod
+    def warm_up(cls, *languages):
+        """
+        Loads the tagger models of the given languages, so that later calls
+        do not pay for the model load.
+
+        :param languages: One or more languages. Defaults to English.
+        :return: Nothing
+        """
+        for language in languages or ('en',):
+            cls._get_tagger_instance(language)
+
+    @staticmethod
+    def _tag_and_add_to_word_lists(word_lists, language='en'):
+        """
+        Tags several lists of words in a single call to the tagger, and sets
+        the pos tag of each word.
+
+        :param word_lists: A list of lists of Word objects, e.g. one list per phrase.
+        :param language: The language of the words.
+        :return: The word lists.
+        """
+        word_lists = [words for words in word_lists if len(words) > 0]
+        if len(word_lists) == 0:
+            return word_lists
+
+        tagger = NltkTagger._get_tagger_instance(language)
+        tagged_lists = tagger.tag_sents([[word.word for word in words] for words in word_lists])
+        for tagged_list, words in zip(tagged_lists, word_lists):
+            for tagged, word in zip(tagged_list, words):
+                word.pos = tagged[1]
+        return word_lists
+
     @staticmethod
     def _tag_and_add_to_words(words, language='en'):
         """
-        Tags
-        :param word_tokens:
-        :param language:
-        :return:
+        Tags a list of words and sets the pos tag of each word.
+
+        :param words: A list of Word objects.
+        :param language: The language of the words.
+        :return: The words.
         """
-        tokens = [word.word for word in words]
-        tagged = nltk.pos_tag(tokens, lang=language)
-        for tagged, word in zip(tagged, words):
-            word.pos = tagged[1]
+        NltkTagger._tag_and_add_to_word_lists([words], language)
         return words
 
+    def get_version(self):
+        return nltk.__version__
+
     def tag_raw(self, raw_text, language='en'):
         raise NotImplementedError("Nltk cannot tag raw text. Please tokenize first.")
 
@@ -42,16 +134,15 @@ class NltkTagger(TypecraftTagger):
         raise NotImplementedError("Nltk cannot tag raw phrases. Please tokenize first.")
 
     def tag_raw_words(self, word_list, language='en'):
-        tagged = nltk.pos_tag(word_list, lang=language)
+        tagged = self._get_tagger_instance(language).tag(word_list)
         return word_pos_tuples_to_phrase(tagged)
 
     def tag_text(self, text, language='en'):
-        self.tag_phrases(text.phrases)
+        self.tag_phrases(text.phrases, language)
         return text
 
     def tag_phrases(self, phrases, language='en'):
-        for phrase in phrases:
-            self.tag_phrase(phrase)
+        self._tag_and_add_to_word_lists([phrase.words for phrase in phrases], language)
         return phrases
 
     def tag_phrase(self, phrase, language='en'):
@@ -63,5 +154,5 @@ class NltkTagger(TypecraftTagger):
         return words
 
     def tag_word(self, word, language='en'):
-        self._tag_and_add_to_words([word])
+        self._tag_and_add_to_words([word], language)
         return word
@@ -1,8 +1,11 @@
 # coding: utf-8
 import pytest
 
-from typecraft_python.integrations.nltk.lemmatization import lemmatize_word, lemmatize_phrase
-from typecraft_python.integrations.nltk.ne import find_named_entities_for_phrase
+from typecraft_python.integrations.nltk.lemmatization import lemmatize, lemmatize_word, lemmatize_phrase, \
+    lemmatize_text
+from typecraft_python.integrations.nltk.ne import find_named_entities_for_phrase, find_named_entities_for_text
+from typecraft_python.integrations.nltk.tagger import NltkTagger
+from typecraft_python.integrations.nltk.util import _parse_entity_tree_for_named_entities
 from typecraft_python.integrations.nltk.tokenization import raw_phrase_to_tokenized_phrase, raw_text_to_phrases, \
     raw_text_to_tokenized_phrases, tokenize_phrase
 from typecraft_python.models import Phrase, Word, Morpheme, Text
@@ -87,6 +90,28 @@ class TestNamedEntities(object):
         assert 'NE: Mike' in phrase.comment
         assert 'NE: Australia' in phrase.comment
 
+    def test_find_named_entities_for_text(self):
+        text = Text(phrases=[
+            raw_phrase_to_tokenized_phrase("Mike went travelling to Australia."),
+            Phrase("Empty"),
+            raw_phrase_to_tokenized_phrase("This has no named entities.")
+        ])
+        find_named_entities_for_text(text, binary=True)
+
+        assert 'NE: Mike' in text[0].comment
+        assert 'NE: Australia' in text[0].comment
+        assert 'Named entities' not in text[1].comment
+        assert 'Named entities' not in text[2].comment
+
+    def test_parse_entity_tree(self):
+        tree = nltk.tree.Tree('S', [
+            nltk.tree.Tree('PERSON', [('Mike', 'NNP'), ('Smith', 'NNP')]),
+            ('went', 'VBD'),
+            nltk.tree.Tree('GPE', [('Australia', 'NNP')])
+        ])
+
+        assert _parse_entity_tree_for_named_entities(tree) == [('PERSON', 'Mike Smith '), ('GPE', 'Australia ')]
+
 
 class TestSentTokenize(object):
 
@@ -150,6 +175,38 @@ und das halbe Königreich.
         assert len(phrases) == 22
 
 
+class TestNltkTagger(object):
+
+    def test_tag_phrases_tags_all_words(self):
+        phrases = [
+            raw_phrase_to_tokenized_phrase("This is a nice phrase."),
+            raw_phrase_to_tokenized_phrase("Here is another one.")
+        ]
+        NltkTagger().tag_phrases(phrases, language='en')
+
+        for phrase in phrases:
+            for word in phrase:
+                assert word.pos != ""
+        assert phrases[0].words[0].pos == 'DT'
+
+    def test_tag_text_uses_language(self):
+        text = Text(phrases=[raw_phrase_to_tokenized_phrase("This is a nice phrase.")])
+        NltkTagger().tag_text(text, language='eng')
+
+        assert all(word.pos != "" for word in text[0])
+
+    def test_tagger_instance_is_reused(self):
+        NltkTagger.warm_up('en')
+        tagger = NltkTagger._get_tagger_instance('en')
+
+        assert NltkTagger._get_tagger_instance('eng') is tagger
+        assert NltkTagger._get_tagger_instance('english') is tagger
+
+    def test_unsupported_language_should_throw(self):
+        with pytest.raises(NotImplementedError):
+            NltkTagger().tag_phrase(raw_phrase_to_tokenized_phrase("Dette er en setning."), language='nob')
+
+
 class TestLemmatize(object):
 
     @classmethod
@@ -179,3 +236,18 @@ class TestLemmatize(object):
         for word in phrase:
             morpheme = word.morphemes[0]
             assert morpheme.baseform is not ''
+
+    def test_lemmatize_is_memoized(self):
+        assert lemmatize('Cars') == 'car'
+        assert lemmatize('cars') == 'car'
+
+    def test_lemmatize_text(self):
+        text = Text(phrases=[
+            raw_phrase_to_tokenized_phrase('Robert has many cars.'),
+            raw_phrase_to_tokenized_phrase('Cars are nice.')
+        ])
+        lemmatize_text(text)
+
+        assert text[0][3].morphemes[0].baseform == 'car'
+        assert text[1][0].morphemes[0].baseform == 'car'
+        assert text[1][0].morphemes[0].morpheme == 'Cars'
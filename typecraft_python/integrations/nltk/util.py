@@ -14,18 +14,29 @@ LEGAL_NE_TAGS = [
 ]
 
 
-def _parse_entity_tree_to_string(tree, use_tags=False):
-    return_string = ""
+def _collect_entity_tree_tokens(tree, tokens):
+    """
+    Appends the tokens of all the leaves of an entity tree to a list.
+
+    :param tree: An nltk Tree.
+    :param tokens: The list to append the tokens to.
+    :return: The list.
+    """
     for child in tree:
         if isinstance(child, nltk.tree.Tree):
-            return_string += _parse_entity_tree_to_string(child) + " "
+            _collect_entity_tree_tokens(child, tokens)
         else:
-            return_string += child[0] + " "
-    return return_string
+            tokens.append(child[0])
+    return tokens
+
+
+def _parse_entity_tree_to_string(tree, use_tags=False):
+    return "".join([token + " " for token in _collect_entity_tree_tokens(tree, [])])
 
 
-def _parse_entity_tree_for_named_entities(tree):
-    parsed_entity_names = []
+def _parse_entity_tree_for_named_entities(tree, parsed_entity_names=None):
+    if parsed_entity_names is None:
+        parsed_entity_names = []
 
     if hasattr(tree, 'label') and tree.label() in LEGAL_NE_TAGS:
         parsed_entity_names.append((tree.label(), _parse_entity_tree_to_string(tree)))
@@ -33,5 +44,5 @@ def _parse_entity_tree_for_named_entities(tree):
     # So we check if it is in fact a tree
     elif isinstance(tree, nltk.tree.Tree):
         for child in tree:
-            parsed_entity_names.extend(_parse_entity_tree_for_named_entities(child))
+            _parse_entity_tree_for_named_entities(child, parsed_entity_names)
     return parsed_entity_names
@@ -0,0 +1,32 @@
+"""
+Asynchronous tagging with the Oslo-Bergen tagger.
+
+This module requires Python 3.6 or newer.
+"""
+import os
+
+from typecraft_python.integrations.asynchronous import AsyncTaggerPool, run_subprocess
+from typecraft_python.integrations.obt import tagger as obt
+
+
+class AsyncObtTagger(AsyncTaggerPool):
+    """
+    An AsyncTaggerPool for the OBT, which runs the OBT directly as an asyncio subprocess
+    when tagging raw text. A call exceeding the timeout kills its OBT process.
+    """
+
+    def __init__(self, max_concurrency=4, timeout=None, max_pending=None):
+        super(AsyncObtTagger, self).__init__(obt.ObtTagger, max_concurrency, timeout, max_pending)
+
+    async def tag_raw_async(self, raw_text, language='nob'):
+        if not obt.obt_available:
+            raise EnvironmentError("Attempted to parse using OBT when OBT is not available.")
+
+        temp_file_path = obt.ObtTagger._store_string_temporarily(raw_text)
+        try:
+            async with self._get_semaphore():
+                output = await run_subprocess(obt.ObtTagger._get_obt_command(temp_file_path), timeout=self.timeout)
+        finally:
+            os.remove(temp_file_path)
+
+        return obt.ObtTagger._parse_output_to_phrases(output.decode("utf-8"), raw_text, language)
@@ -11,7 +11,6 @@ from typecraft_python.core.interfaces import TypecraftTagger
 # Try to load OBT by the use of the OBT_PATH
 # environment variable. Also verify that the
 # file tag-bm.sh file exists.
-FNULL = open(os.devnull, 'w')
 obt_available = False
 obt_path = os.environ.get('OBT_PATH')
 if obt_path is None:
@@ -37,9 +36,14 @@ class ObtTagger(TypecraftTagger):
 
         return path
 
+    @staticmethod
+    def _get_obt_command(tempfile):
+        return [os.path.join(obt_path, 'tag-bm.sh'), tempfile]
+
     @staticmethod
     def _call_obt(tempfile):
-        return check_output([os.path.join(obt_path, 'tag-bm.sh'), tempfile], stderr=FNULL).decode("utf-8")
+        with open(os.devnull, 'w') as devnull:
+            return check_output(ObtTagger._get_obt_command(tempfile), stderr=devnull).decode("utf-8")
 
     @staticmethod
     def _word_is_sentence_breaker(tags):
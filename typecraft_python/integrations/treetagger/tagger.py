@@ -10,10 +10,49 @@ from typecraft_python.core.interfaces import TypecraftTagger
 
 
 class TreeTagger(TypecraftTagger):
+    """
+    Tagger using the TreeTagger, through treetaggerwrapper.
+
+    Each TreeTagger object keeps one treetaggerwrapper instance, and thereby one running
+    TreeTagger process, per language.
+    """
+
+    """
+    The token put between phrases tagged in one call, and removed from the output. The TreeTagger tags it
+    as a sentence end, so that its context does not run from one phrase into the next.
+    """
+    PHRASE_SEPARATOR = '.'
+
+    def __init__(self):
+        self._tagger_instances = {}
+
+    def _get_tagger_instance(self, language='en'):
+        tagger = self._tagger_instances.get(language)
+        if tagger is None:
+            tagger = treetaggerwrapper.TreeTagger(TAGLANG=language)
+            self._tagger_instances[language] = tagger
+        return tagger
 
     @staticmethod
-    def _get_tagger_instance(language='en'):
-        return treetaggerwrapper.TreeTagger(TAGLANG=language)
+    def _add_tag_results_to_words(tagged, words):
+        """
+        Sets the pos tags and lemmas of the TreeTagger output on a list of words.
+
+        :param tagged: The output of the TreeTagger, split on tabs.
+        :param words: The words which were tagged.
+        :return: The words.
+        """
+        for tag_result, word in zip(tagged, words):
+            word.pos = tag_result[1]
+            if tag_result[2]:
+                # If the word has no morphemes, we add one with the
+                # lemmatization
+                if len(word.morphemes) == 0:
+                    word.add_morpheme(Morpheme(
+                        morpheme=word.word,
+                        baseform=tag_result[2]
+                    ))
+        return words
 
     @staticmethod
     def _convert_result_to_phrase(result):
@@ -47,6 +86,13 @@ class TreeTagger(TypecraftTagger):
 
         return [TreeTagger._convert_result_to_phrase(line) for line in lines]
 
+    def warm_up(self, *languages):
+        for language in languages or ('en',):
+            self._get_tagger_instance(language)
+
+    def get_version(self):
+        return treetaggerwrapper.__version__
+
     def is_parser(self):
         return False
 
@@ -82,17 +128,48 @@ class TreeTagger(TypecraftTagger):
 
     def tag_text(self, text, language='en'):
         assert isinstance(text, Text)
-        for phrase in text:
-            self.tag_phrase(phrase, language)
+        self.tag_phrases(text.phrases, language)
         return text
 
     def tag_phrases(self, phrases, language='en'):
+        """
+        Tags a list of phrases. The words of all phrases are sent to the TreeTagger in a single call,
+        with PHRASE_SEPARATOR between the phrases, so that each phrase is tagged as a sentence of its own.
+
+        :param phrases:
+        :param language:
+        :return: The phrases.
+        """
+        words = []
+        raw_words = []
+        separators = []
         for phrase in phrases:
-            self.tag_phrase(phrase, language)
+            if not phrase.words:
+                continue
+            if words:
+                separators.append(len(raw_words))
+                raw_words.append(self.PHRASE_SEPARATOR)
+            words.extend(phrase.words)
+            raw_words.extend(word.word for word in phrase.words)
+        if len(words) == 0:
+            return phrases
+
+        tagged = self._get_tagger_instance(language).tag_text(raw_words, tagonly=True)
+        tagged = list(map(lambda x: x.split("\t"), tagged))
+        if len(tagged) != len(raw_words):
+            logging.error("Error tagging phrases with the TreeTagger. Number of tagged words does not match "
+                          "number of words passed to the TreeTagger. Falling back to tagging each phrase.")
+            for phrase in phrases:
+                self.tag_phrase(phrase, language)
+            return phrases
+
+        for position in reversed(separators):
+            del tagged[position]
+        self._add_tag_results_to_words(tagged, words)
         return phrases
 
     def tag_phrase(self, phrase, language='en'):
-        self.tag_words(phrase.words)
+        self.tag_words(phrase.words, language)
         return phrase
 
     def tag_words(self, words, language='en'):
@@ -104,21 +181,10 @@ class TreeTagger(TypecraftTagger):
                           "does not match number of words passed to the TreeTagger.")
             return words
 
-        for tag_result, word in zip(tagged, words):
-            word.pos = tag_result[1]
-            if tag_result[2]:
-                # If the word has no morphemes, we add one with the
-                # lemmatization
-                if len(word.morphemes) == 0:
-                    word.add_morpheme(Morpheme(
-                        morpheme=word.word,
-                        baseform=tag_result[2]
-                    ))
-        return words
+        return self._add_tag_results_to_words(tagged, words)
 
     def tag_word(self, word, language='en'):
         tagged = self._get_tagger_instance(language).tag_text(word.word)
         tagged = list(map(lambda x: x.split("\t"), tagged))
         word.pos = tagged[0][1]
         return word
-
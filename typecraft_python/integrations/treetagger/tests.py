@@ -14,6 +14,39 @@ except TreeTaggerError:
     treetagger_enabled = False
 
 
+class _SentenceStartTagger(object):
+    """
+    Stands in for a treetaggerwrapper.TreeTagger, and tags each word by whether it starts a sentence.
+    """
+
+    def tag_text(self, tokens, tagonly=False):
+        tagged = []
+        previous = '.'
+        for token in tokens:
+            tag = 'SENT' if token == '.' else ('START' if previous == '.' else 'MID')
+            tagged.append("%s\t%s\t%s" % (token, tag, token.lower()))
+            previous = token
+        return tagged
+
+
+def _create_phrases():
+    return [words_to_phrase(["This", "is"]), words_to_phrase([]), words_to_phrase(["It", "works", "."]),
+            words_to_phrase(["Again"])]
+
+
+def _pos_tags(phrases):
+    return [[word.pos for word in phrase.words] for phrase in phrases]
+
+
+def test_tag_phrases_does_not_run_context_across_phrases():
+    tagger = TreeTagger()
+    tagger._tagger_instances['en'] = _SentenceStartTagger()
+    batch = tagger.tag_phrases(_create_phrases())
+    alone = [tagger.tag_phrase(phrase) for phrase in _create_phrases()]
+
+    assert _pos_tags(batch) == _pos_tags(alone) == [["START", "MID"], [], ["START", "MID", "SENT"], ["START"]]
+
+
 @pytest.mark.skipif(not treetagger_enabled, reason="Treetagger is not enabled")
 class TestTreeTagger(object):
     def test_tag_raw(self):
@@ -130,6 +163,14 @@ class TestTreeTagger(object):
                 assert word.pos is not None
                 assert word.pos is not ""
 
+    def test_tag_phrases_equals_tagging_each_phrase(self):
+        sentences = [["these", "are", "short"], ["Sentences", "follow", "each", "other"], ["Fine"]]
+        tagger = TreeTagger()
+        batch = tagger.tag_phrases([words_to_phrase(words) for words in sentences])
+        alone = [tagger.tag_phrase(words_to_phrase(words)) for words in sentences]
+
+        assert _pos_tags(batch) == _pos_tags(alone)
+
     def test_tag_phrase(self):
         words = ["Let", "'s", "write", "another", "one", ",", "or", "what", "?"]
         phrase = words_to_phrase(words)
@@ -0,0 +1,84 @@
+"""
+This module contains functionality for annotating words per word type instead of per token.
+
+By Zipf's law a small number of word types cover most of the tokens in a corpus. Annotations
+which only depend on the word itself, such as lemmas or the tags of a per-word tagger, can thus
+be computed once per type and broadcast back to every token of that type.
+"""
+from collections import OrderedDict
+
+from typecraft_python.core.models import Corpus, Text, Phrase, Word
+from typecraft_python.integrations.annotations import copy_annotations
+
+
+def iter_words(obj):
+    """
+    Iterates over all words of a Corpus, Text, Phrase or Word, or of an iterable of these.
+
+    :param obj:
+    :return: A generator of Word objects.
+    """
+    if isinstance(obj, Word):
+        yield obj
+    elif isinstance(obj, Phrase):
+        for word in obj.words:
+            yield word
+    elif isinstance(obj, Text):
+        for phrase in obj.phrases:
+            for word in phrase.words:
+                yield word
+    else:
+        # Corpus objects and plain iterables
+        for child in (obj.texts if isinstance(obj, Corpus) else obj):
+            for word in iter_words(child):
+                yield word
+
+
+def collect_word_types(obj, key=None):
+    """
+    Collects the distinct word types of a Corpus, Text, Phrase or an iterable of these.
+
+    :param obj:
+    :param key: A function returning the type of a Word. Defaults to the word form.
+    :return: An OrderedDict mapping each type to the list of words of that type,
+             in order of first occurrence.
+    """
+    if key is None:
+        key = _word_form
+
+    word_types = OrderedDict()
+    for word in iter_words(obj):
+        word_type = key(word)
+        if word_type in word_types:
+            word_types[word_type].append(word)
+        else:
+            word_types[word_type] = [word]
+    return word_types
+
+
+def annotate_word_types(obj, tagger, language='en'):
+    """
+    Tags every distinct word form of a Corpus, Text or Phrase once with `tagger.tag_word`,
+    then copies the result to every word of that form.
+
+    The pos tag is always set. Morphemes are only added to words without any
+    morphemes, in the same way as the taggers do. See typecraft_python.integrations.annotations.
+
+    Note that this ignores the context of the words, and should only be used with taggers
+    whose tag_word method does not depend on context.
+
+    :param obj: A Corpus, Text, Phrase or an iterable of these.
+    :param tagger: A TypecraftTagger.
+    :param language: The language of the words.
+    :return: The number of distinct word types tagged.
+    """
+    word_types = collect_word_types(obj)
+    for word_form, words in word_types.items():
+        prototype = tagger.tag_word(Word(word_form), language)
+        for word in words:
+            copy_annotations(prototype, word)
+    return len(word_types)
+
+
+def _word_form(word):
+    return word.word
@@ -0,0 +1,263 @@
+"""
+This module contains functionality for transparently reading and writing gzip, bz2 and xz compressed files.
+
+Compressed input is detected by its magic bytes, so compressed data can also be read from stdin.
+Output is compressed according to the extension of the file name:
+
+    with open_input('corpus.xml.gz') as _file:
+        texts = Parser.parse(_file.read())
+
+    with open_output('corpus.xml.bz2') as _file:
+        _file.write(Parser.write(texts))
+"""
+import bz2
+import gzip
+import io
+import threading
+
+import six
+from six.moves import queue
+
+try:
+    import lzma
+except ImportError:
+    # lzma is only available in Python 3.3 and newer
+    lzma = None
+
+"""
+The supported compressions, by file extension.
+"""
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz'
+}
+
+"""
+The magic bytes starting a compressed file, by compression.
+"""
+MAGIC_BYTES = {
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'xz': b'\xfd7zXZ\x00'
+}
+
+_MAGIC_BYTES_LENGTH = max(len(magic) for magic in MAGIC_BYTES.values())
+
+"""
+Decompressed data is read in blocks of this many bytes by the background thread of a ThreadedReader.
+"""
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def get_compression_from_path(path):
+    """
+    Gets the compression of a file from its extension.
+
+    :param path: A file path.
+    :return: 'gzip', 'bz2', 'xz' or None.
+    """
+    for extension, compression in COMPRESSION_EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return compression
+    return None
+
+
+def detect_compression(data):
+    """
+    Gets the compression of some data from its first bytes.
+
+    :param data: The first bytes of a file.
+    :return: 'gzip', 'bz2', 'xz' or None.
+    """
+    for compression, magic in MAGIC_BYTES.items():
+        if data.startswith(magic):
+            return compression
+    return None
+
+
+def _open_compressed_file(path_or_file, compression, mode):
+    if compression == 'gzip':
+        if hasattr(path_or_file, 'read'):
+            return gzip.GzipFile(fileobj=path_or_file, mode=mode)
+        return gzip.GzipFile(path_or_file, mode=mode)
+    if compression == 'bz2':
+        return bz2.BZ2File(path_or_file, mode=mode)
+    if compression == 'xz':
+        if lzma is None:
+            raise EnvironmentError("Unable to handle xz compressed files, as the lzma module is not available.")
+        return lzma.LZMAFile(path_or_file, mode=mode)
+    raise ValueError("Unknown compression '%s'" % (compression,))
+
+
+class _PrefixedReader(io.RawIOBase):
+    """
+    A binary file object reading some given bytes, followed by the contents of another file object.
+    Lets the first bytes of a non-seekable file, such as stdin, be read twice.
+    """
+
+    def __init__(self, prefix, fileobj, close_fileobj=True):
+        self._prefix = prefix
+        self._fileobj = fileobj
+        self._close_fileobj = close_fileobj
+
+    def readable(self):
+        return True
+
+    def close(self):
+        if not self.closed and self._close_fileobj:
+            self._fileobj.close()
+        super(_PrefixedReader, self).close()
+
+    def readinto(self, buffer):
+        if self._prefix:
+            data = self._prefix[:len(buffer)]
+            self._prefix = self._prefix[len(data):]
+        else:
+            data = self._fileobj.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class _TextReader(io.TextIOBase):
+    """
+    A text file object reading from another text file object, without closing it when closed.
+    """
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self._fileobj.read(size)
+
+    def readline(self, size=-1):
+        return self._fileobj.readline(size)
+
+
+class ThreadedReader(io.RawIOBase):
+    """
+    A binary file object reading another file object in a background thread.
+
+    Decompression releases the GIL, so reading a compressed file through a ThreadedReader lets
+    the decompression run in parallel with the parsing of the decompressed data. At most
+    `max_blocks` blocks of READ_BLOCK_SIZE bytes are read ahead.
+    """
+
+    def __init__(self, fileobj, max_blocks=4, source=None):
+        """
+        :param fileobj: A binary file object.
+        :param max_blocks: The maximum number of blocks read ahead.
+        :param source: An optional file object underlying `fileobj`, which is closed along with it.
+        """
+        self._fileobj = fileobj
+        self._source = source
+        self._blocks = queue.Queue(max_blocks)
+        self._block = b''
+        self._done = False
+        self._closing = False
+        self._thread = threading.Thread(target=self._read_blocks)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _put(self, item):
+        # Gives up when the reader is closed before the file is read to its end
+        while not self._closing:
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _read_blocks(self):
+        try:
+            while not self._closing:
+                block = self._fileobj.read(READ_BLOCK_SIZE)
+                self._put(block)
+                if not block:
+                    return
+        except Exception as error:
+            self._put(error)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._block:
+            if self._done:
+                return 0
+            block = self._blocks.get()
+            if isinstance(block, Exception):
+                self._done = True
+                raise block
+            if not block:
+                self._done = True
+                return 0
+            self._block = block
+
+        data = self._block[:len(buffer)]
+        self._block = self._block[len(data):]
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._closing = True
+            self._thread.join()
+            self._fileobj.close()
+            if self._source is not None:
+                self._source.close()
+        super(ThreadedReader, self).close()
+
+
+def open_input(path_or_file):
+    """
+    Opens a file for binary reading, decompressing it if it is compressed.
+    Compressed files are decompressed in a background thread, see ThreadedReader.
+
+    :param path_or_file: A file path, or a file object. Text file objects are read through their binary buffer.
+                         Text file objects without one, such as a StringIO, are read as text, and cannot be
+                         compressed.
+    :return: A binary file object, or a text file object for a text file object without a binary buffer.
+             Closing it closes the file if it was opened by path, but not a given file object.
+    """
+    if hasattr(path_or_file, 'read'):
+        fileobj = getattr(path_or_file, 'buffer', path_or_file)
+        if isinstance(fileobj.read(0), six.text_type):
+            return _TextReader(fileobj)
+        close_fileobj = False
+    else:
+        fileobj = open(path_or_file, 'rb')
+        close_fileobj = True
+
+    # Reads from pipes may return fewer bytes than requested
+    prefix = b''
+    while len(prefix) < _MAGIC_BYTES_LENGTH:
+        data = fileobj.read(_MAGIC_BYTES_LENGTH - len(prefix))
+        if not data:
+            break
+        prefix += data
+    fileobj = _PrefixedReader(prefix, fileobj, close_fileobj)
+
+    compression = detect_compression(prefix)
+    if compression is None:
+        return io.BufferedReader(fileobj)
+
+    fileobj = io.BufferedReader(fileobj)
+    return io.BufferedReader(ThreadedReader(_open_compressed_file(fileobj, compression, 'rb'), source=fileobj))
+
+
+def open_output(path):
+    """
+    Opens a file for binary writing, compressing it if its extension is one of COMPRESSION_EXTENSIONS.
+
+    :param path: A file path.
+    :return: A binary file object.
+    """
+    compression = get_compression_from_path(path)
+    if compression is None:
+        return open(path, 'wb')
+
+    return _open_compressed_file(path, compression, 'wb')
@@ -0,0 +1,216 @@
+"""
+This module contains external-memory sorting and shuffling of the phrases of Typecraft-xml documents,
+for corpora which do not fit in memory.
+
+Phrases are serialized, and held in memory until they take up `max_memory` bytes. Sorting then spills
+sorted runs to temporary files, which are merged, at most MAX_MERGE_RUNS at a time. Shuffling spills
+the phrases to randomly chosen temporary buckets, which are shuffled one at a time.
+
+The output is a single text, with the attributes of the first text of the input, like merging the texts
+with Text.merge.
+"""
+import heapq
+import random
+import tempfile
+
+from six.moves import cPickle as pickle
+
+from typecraft_python.parsing.sampling import iter_phrases
+from typecraft_python.parsing.streaming import serialize_phrase, TextWriter
+
+"""
+The default number of bytes of serialized phrases held in memory.
+"""
+DEFAULT_MAX_MEMORY = 256 * 1024 * 1024
+
+"""
+The maximum number of sorted runs merged at once, which bounds the number of open temporary files.
+More runs are merged in several passes.
+"""
+MAX_MERGE_RUNS = 64
+
+"""
+The number of buckets phrases are spilled to when shuffling.
+"""
+NUM_SHUFFLE_BUCKETS = 16
+
+"""
+An estimate of the memory used by a phrase in addition to its serialization.
+"""
+_RECORD_OVERHEAD = 100
+
+"""
+The keys phrases can be sorted by.
+"""
+SORT_KEYS = {
+    'words': lambda phrase: len(phrase.words),
+    'characters': lambda phrase: len(phrase.phrase),
+    'phrase': lambda phrase: phrase.phrase
+}
+
+
+def _record_size(record):
+    return len(record[-1]) + _RECORD_OVERHEAD
+
+
+def _write_records(records, temporary_directory):
+    """
+    Writes records to a temporary file, which is deleted when closed.
+    """
+    _file = tempfile.TemporaryFile(dir=temporary_directory)
+    for record in records:
+        pickle.dump(record, _file, pickle.HIGHEST_PROTOCOL)
+    _file.seek(0)
+    return _file
+
+
+def _read_records(_file):
+    """
+    Reads the records of a temporary file, and closes it.
+    """
+    try:
+        while True:
+            try:
+                yield pickle.load(_file)
+            except EOFError:
+                return
+    finally:
+        _file.close()
+
+
+def _fill_memory(records, max_memory):
+    """
+    Reads records until they take up max_memory bytes.
+
+    :param records: An iterator of records.
+    :return: A tuple of the records read, and whether all records were read.
+    """
+    in_memory = []
+    size = 0
+    for record in records:
+        in_memory.append(record)
+        size += _record_size(record)
+        if size >= max_memory:
+            # Reads one more record, so that records are only spilled when there are more than fit in memory
+            for next_record in records:
+                in_memory.append(next_record)
+                return in_memory, False
+            break
+    return in_memory, True
+
+
+def _sort_records(records, max_memory, temporary_directory):
+    runs = []
+    try:
+        while True:
+            run, done = _fill_memory(records, max_memory)
+            run.sort()
+            if done and not runs:
+                # Everything fits in memory
+                for record in run:
+                    yield record
+                return
+            runs.append(_write_records(run, temporary_directory))
+            if done:
+                break
+
+        # The first runs are merged into a new run until few enough are left to merge at once
+        while len(runs) > MAX_MERGE_RUNS:
+            merged = _write_records(heapq.merge(*[_read_records(run) for run in runs[:MAX_MERGE_RUNS]]),
+                                    temporary_directory)
+            runs = runs[MAX_MERGE_RUNS:] + [merged]
+
+        for record in heapq.merge(*[_read_records(run) for run in runs]):
+            yield record
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _shuffle_records(records, generator, max_memory, temporary_directory):
+    in_memory, done = _fill_memory(records, max_memory)
+    if done:
+        generator.shuffle(in_memory)
+        for record in in_memory:
+            yield record
+        return
+
+    buckets = [tempfile.TemporaryFile(dir=temporary_directory) for _ in range(NUM_SHUFFLE_BUCKETS)]
+    try:
+        for record_list in [in_memory, records]:
+            for record in record_list:
+                pickle.dump(record, buckets[generator.randrange(NUM_SHUFFLE_BUCKETS)], pickle.HIGHEST_PROTOCOL)
+        del in_memory[:]
+
+        # A bucket which is still too large is shuffled by spilling it to buckets of its own
+        for bucket in buckets:
+            bucket.seek(0)
+            for record in _shuffle_records(_read_records(bucket), generator, max_memory, temporary_directory):
+                yield record
+    finally:
+        for bucket in buckets:
+            bucket.close()
+
+
+def _write_records_as_text(records, first_text, output):
+    """
+    Writes the serialized phrases of records as a single text.
+
+    :return: The number of phrases written.
+    """
+    num_phrases = 0
+    with TextWriter(output) as writer:
+        for record in records:
+            if num_phrases == 0:
+                writer.start_text(first_text[0])
+            writer.write_serialized_phrase(record[-1])
+            num_phrases += 1
+    return num_phrases
+
+
+def sort_phrases(source, output, key='words', max_memory=DEFAULT_MAX_MEMORY, temporary_directory=None):
+    """
+    Sorts the phrases of a document, holding at most about `max_memory` bytes of phrases in memory.
+    The sort is stable.
+
+    :param source: A file path or a file object.
+    :param output: A binary file object.
+    :param key: One of SORT_KEYS.
+    :param max_memory: The maximum number of bytes of serialized phrases held in memory.
+    :param temporary_directory: The directory of the temporary files, or None for the default.
+    :return: The number of phrases written.
+    """
+    sort_key = SORT_KEYS[key]
+    first_text = []
+
+    def records():
+        for number, (_, text, phrase) in enumerate(iter_phrases(source)):
+            if not first_text:
+                first_text.append(text)
+            yield sort_key(phrase), number, serialize_phrase(phrase)
+
+    return _write_records_as_text(_sort_records(records(), max_memory, temporary_directory), first_text, output)
+
+
+def shuffle_phrases(source, output, seed=None, max_memory=DEFAULT_MAX_MEMORY, temporary_directory=None):
+    """
+    Shuffles the phrases of a document, holding at most about `max_memory` bytes of phrases in memory.
+
+    :param source: A file path or a file object.
+    :param output: A binary file object.
+    :param seed: The seed of the random number generator. The same seed and max_memory give the same order.
+    :param max_memory: The maximum number of bytes of serialized phrases held in memory.
+    :param temporary_directory: The directory of the temporary files, or None for the default.
+    :return: The number of phrases written.
+    """
+    generator = random.Random(seed)
+    first_text = []
+
+    def records():
+        for _, text, phrase in iter_phrases(source):
+            if not first_text:
+                first_text.append(text)
+            yield (serialize_phrase(phrase),)
+
+    return _write_records_as_text(_shuffle_records(records(), generator, max_memory, temporary_directory),
+                                  first_text, output)
@@ -0,0 +1,135 @@
+"""
+This module contains an offset index of Typecraft-xml files, stored in a json file next to the indexed file.
+
+The index lists the byte offset, the length and the number of phrases of every text of the file, which lets
+single texts be read without scanning the file, and lets phrases be counted without parsing it.
+"""
+import json
+import os
+from xml.parsers import expat
+
+import six
+
+from typecraft_python.core.exceptions import TypecraftParseException
+from typecraft_python.parsing.compression import MAGIC_BYTES, detect_compression, open_input
+from typecraft_python.parsing.scanning import iter_raw_text_offsets, normalize_raw_text, _RawTextScanner
+from typecraft_python.parsing.streaming import parse_serialized_text
+
+"""
+The index of a file is stored at the path of the file with this extension added.
+"""
+INDEX_EXTENSION = '.index.json'
+
+_MAGIC_BYTES_LENGTH = max(len(magic) for magic in MAGIC_BYTES.values())
+
+
+def get_index_path(path):
+    return path + INDEX_EXTENSION
+
+
+def _count_phrases(raw_text):
+    """
+    Counts the phrase elements of a raw text element. The text is scanned with expat, so that phrase tags
+    in comments and CDATA sections are not counted.
+    """
+    counts = [0]
+
+    def start_element(name, attributes):
+        # Namespaces are not processed, as the text may use a prefix declared on the root element
+        if name.rpartition(':')[2] == 'phrase':
+            counts[0] += 1
+
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = start_element
+    try:
+        parser.Parse(raw_text, True)
+    except expat.ExpatError as error:
+        raise TypecraftParseException("Unable to parse text: " + str(error))
+    return counts[0]
+
+
+def build_offset_index(path):
+    """
+    Builds the offset index of a file. See `iter_raw_text_offsets`.
+    The offsets of a compressed file are offsets into the decompressed file.
+
+    :param path: A file path.
+    :return: The index, as a dict with the keys 'size' and 'mtime' of the indexed file, 'encoding' and
+             'declarations' of the file for normalize_raw_text, and 'texts', a list of
+             [offset, length, number of phrases] lists.
+    """
+    stat = os.stat(path)
+    scanner = _RawTextScanner()
+    texts = []
+    for offset, raw_text in iter_raw_text_offsets(path, scanner):
+        normalized_text = normalize_raw_text(raw_text, scanner.encoding, scanner.declarations)
+        texts.append([offset, len(raw_text), _count_phrases(normalized_text)])
+    return {
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'encoding': scanner.encoding,
+        'declarations': scanner.declarations.decode('utf-8'),
+        'texts': texts
+    }
+
+
+def write_offset_index(path):
+    """
+    Builds the offset index of a file, and writes it next to the file.
+
+    :param path: A file path.
+    :return: The index.
+    """
+    index = build_offset_index(path)
+    with open(get_index_path(path), 'w') as _file:
+        json.dump(index, _file)
+    return index
+
+
+def load_offset_index(path):
+    """
+    Loads the offset index of a file, if it exists and the file has not changed since it was built.
+
+    :param path: A file path. Anything else, such as a file object, has no index.
+    :return: The index, or None.
+    """
+    if not isinstance(path, six.string_types) or not os.path.exists(get_index_path(path)):
+        return None
+
+    with open(get_index_path(path)) as _file:
+        index = json.load(_file)
+
+    stat = os.stat(path)
+    if index.get('size') != stat.st_size or index.get('mtime') != stat.st_mtime:
+        return None
+    return index
+
+
+def iter_indexed_texts(path, index, text_numbers):
+    """
+    Reads and parses the given texts of a file, using its offset index.
+    Uncompressed files are read by seeking directly to the texts.
+
+    :param path: A file path.
+    :param index: The index of the file.
+    :param text_numbers: The (zero based) numbers of the texts to read.
+    :return: A generator of (text number, Text) tuples, in file order.
+    """
+    with open(path, 'rb') as _file:
+        compressed = detect_compression(_file.read(_MAGIC_BYTES_LENGTH)) is not None
+
+    with (open_input(path) if compressed else open(path, 'rb')) as _file:
+        position = 0
+        for text_number in sorted(set(text_numbers)):
+            offset, length, _ = index['texts'][text_number]
+            if compressed:
+                # Compressed files cannot be seeked in, so the bytes before the text are skipped by reading them
+                while position < offset:
+                    position += len(_file.read(min(offset - position, 1024 * 1024)))
+            else:
+                _file.seek(offset)
+            raw_text = _file.read(length)
+            position = offset + length
+            raw_text = normalize_raw_text(raw_text, index.get('encoding', 'utf-8'),
+                                          index.get('declarations', u'').encode('utf-8'))
+            yield text_number, parse_serialized_text(raw_text)
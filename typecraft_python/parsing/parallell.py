@@ -1,25 +1,104 @@
 import six
+from six.moves import zip_longest
 
 from typecraft_python.core.models import Phrase
 from typecraft_python.util import batch
 
 
+def iter_lines(inputs, strip=True):
+    """
+    Reads the non-empty lines of one or more files lazily.
+
+    :param inputs: An iterable of text file objects, or of iterables of lines.
+    :param strip: If true, whitespace is stripped from the lines.
+    :return: A generator of strings.
+    """
+    for _input in inputs:
+        for line in _input:
+            line = line.strip() if strip else line.rstrip("\r\n")
+            if line != "":
+                yield line
+
+
+def iter_continuous_parallel_tuples(lines, num_of_langs):
+    """
+    Groups lines, where each phrase is followed by its translations on the following lines, into tuples.
+
+    :param lines: An iterable of non-empty lines.
+    :param num_of_langs: The number of languages, i.e. lines per tuple.
+    :return: A generator of tuples of strings.
+    """
+    for lines_batch in batch(lines, num_of_langs):
+        yield tuple(lines_batch)
+
+
+def iter_tab_separated_parallel_tuples(lines):
+    """
+    Splits lines holding a phrase and its translations, separated by tabs, into tuples.
+
+    :param lines: An iterable of non-empty lines.
+    :return: A generator of tuples of strings.
+    """
+    for line in lines:
+        yield tuple(column.strip() for column in line.split("\t"))
+
+
+def iter_aligned_files_parallel_tuples(inputs, strip=True):
+    """
+    Reads one file per language, where line n of every file holds the same phrase, into tuples.
+    Lines which are empty in every file are ignored. A file with fewer lines than the others
+    gives empty strings.
+
+    :param inputs: A list of text file objects, or of iterables of lines, one per language.
+    :param strip: If true, whitespace is stripped from the lines.
+    :return: A generator of tuples of strings.
+    """
+    for lines in zip_longest(*inputs, fillvalue=""):
+        _tuple = tuple(line.strip() if strip else line.rstrip("\r\n") for line in lines)
+        if any(line != "" for line in _tuple):
+            yield _tuple
+
+
+def parallel_tuple_to_phrase(_tuple):
+    """
+    Creates a phrase from a tuple of a phrase and up to two translations.
+
+    :param _tuple: A tuple of strings.
+    :return: A Phrase object.
+    """
+    phrase = Phrase()
+    phrase.phrase = _tuple[0]
+
+    if len(_tuple) > 1:
+        phrase.translation = _tuple[1]
+
+    if len(_tuple) > 2:
+        phrase.translation2 = _tuple[2]
+
+    return phrase
+
+
+def iter_parallel_phrases(tuples):
+    """
+    Creates phrases from tuples of a phrase and its translations, lazily.
+
+    :param tuples: An iterable of tuples of strings.
+    :return: A generator of Phrase objects.
+    """
+    for _tuple in tuples:
+        if len(_tuple) == 0:
+            continue
+        yield parallel_tuple_to_phrase(_tuple)
+
+
 def parse_continuous_parallel_text_to_tuples(
     raw_text,
     num_of_langs,
     strip=True
 ):
     assert isinstance(raw_text, six.string_types)
-    lines = raw_text.split("\n")
-    # Strip
-    if strip:
-        lines = [line.strip() for line in lines]
-
-    # Ignore empty lines
-    lines = [line for line in lines if line != ""]
-
-    lines_batched = batch(lines, num_of_langs)
-    return lines_batched
+    lines = list(iter_lines([raw_text.split("\n")], strip))
+    return batch(lines, num_of_langs)
 
 
 def parse_continuous_parallel_text_to_phrases(
@@ -28,22 +107,4 @@ def parse_continuous_parallel_text_to_phrases(
     strip=True
 ):
     tuples = parse_continuous_parallel_text_to_tuples(raw_text, num_of_langs, strip)
-    phrases = []
-    for _tuple in tuples:
-        if len(_tuple) == 0:
-            continue
-        phrase = Phrase()
-        phrase.phrase = _tuple[0]
-
-        if len(_tuple) > 1:
-            phrase.translation = _tuple[1]
-
-        if len(_tuple) > 2:
-            phrase.translation2 = _tuple[2]
-
-        phrases.append(phrase)
-
-    return phrases
-
-
-
+    return list(iter_parallel_phrases(tuples))
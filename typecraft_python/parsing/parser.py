@@ -2,6 +2,7 @@ import xml.etree.ElementTree as ElementTree
 from xml.dom import minidom
 
 from typecraft_python.core.exceptions import TypecraftParseException
+from typecraft_python.parsing.compression import open_input, open_output
 from typecraft_python.core.models import Text, Phrase, Word, Morpheme, GlobalTagSet, GlobalTag, PhraseValidity
 from typecraft_python.core.globals import *
 
@@ -496,10 +497,12 @@ class Parser:
         Will parse a Typecraft-xml file into a list of Text objects.
 
         Will read the entire contents of the file into memory, and then call parse.
-        :param file_path:
+        Compressed files are decompressed transparently.
+        :param file_path: A file path or a file object. Text file objects without a binary buffer are parsed as text.
         :return:
         """
-        tree = ElementTree.parse(file_path)
+        with open_input(file_path) as _file:
+            tree = ElementTree.parse(_file)
         return Parser.convert_etree_to_texts(tree.getroot())
 
     @staticmethod
@@ -584,7 +587,7 @@ class Parser:
     @staticmethod
     def write_to_file(file_name, texts):
         """
-        Writes a text to a file
+        Writes a text to a file. The file is compressed if its extension is .gz, .bz2 or .xz.
         :param texts:
         :param file_name:
         :return:
@@ -593,7 +596,8 @@ class Parser:
         root = Parser.convert_texts_to_etree(texts)
 
         tree = ElementTree.ElementTree(root)
-        tree.write(file_name, encoding="UTF-8")
+        with open_output(file_name) as _file:
+            tree.write(_file, encoding="UTF-8")
 
     @staticmethod
     def write(texts):
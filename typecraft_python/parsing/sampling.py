@@ -0,0 +1,145 @@
+"""
+This module contains functionality for reading the first texts or phrases of a Typecraft-xml document,
+and for taking random samples of its phrases, without reading more of the document than necessary.
+"""
+import copy
+import itertools
+import random
+
+from typecraft_python.parsing.index import load_offset_index, iter_indexed_texts
+from typecraft_python.parsing.streaming import iter_texts
+
+
+def head_texts(source, n):
+    """
+    Reads the first texts of a document. The rest of the document is not read.
+
+    :param source: A file path or a file object.
+    :param n: The number of texts.
+    :return: A generator of at most n Text objects.
+    """
+    texts = iter_texts(source)
+    try:
+        for text in itertools.islice(texts, n):
+            yield text
+    finally:
+        texts.close()
+
+
+def head_phrases(source, n):
+    """
+    Reads the texts of a document holding its first phrases. The rest of the document is not read.
+
+    :param source: A file path or a file object.
+    :param n: The number of phrases.
+    :return: A generator of Text objects, the last of which holds only the phrases needed to get n phrases.
+    """
+    if n <= 0:
+        return
+
+    texts = iter_texts(source)
+    try:
+        for text in texts:
+            text.phrases = text.phrases[:n]
+            n -= len(text.phrases)
+            yield text
+            if n == 0:
+                return
+    finally:
+        texts.close()
+
+
+def _without_phrases(text):
+    text = copy.copy(text)
+    text.phrases = []
+    return text
+
+
+def iter_phrases(source):
+    """
+    Reads the phrases of a document, one text at a time.
+
+    :param source: A file path or a file object.
+    :return: A generator of (text number, text, phrase) tuples. The text holds the attributes of the
+             text of the phrase, but not its phrases.
+    """
+    for text_number, text in enumerate(iter_texts(source)):
+        attributes = _without_phrases(text)
+        for phrase in text.phrases:
+            yield text_number, attributes, phrase
+
+
+def reservoir_sample(iterable, k, seed=None):
+    """
+    Takes a uniform random sample of the items of an iterable, in a single pass, holding
+    at most k items in memory.
+
+    :param iterable:
+    :param k: The size of the sample.
+    :param seed: The seed of the random number generator. The same seed gives the same sample.
+    :return: A list of (item number, item) tuples, in the order of the iterable.
+    """
+    generator = random.Random(seed)
+    reservoir = []
+    for item_number, item in enumerate(iterable):
+        if item_number < k:
+            reservoir.append((item_number, item))
+        else:
+            replaced = generator.randint(0, item_number)
+            if replaced < k:
+                reservoir[replaced] = (item_number, item)
+    return sorted(reservoir, key=lambda sampled: sampled[0])
+
+
+def _iter_sampled_phrases_from_index(path, index, k, seed):
+    """
+    Samples phrases using the offset index, which gives the number of phrases of every text.
+    Only the texts holding sampled phrases are read. The sample equals the one of a full scan.
+    """
+    phrase_counts = [num_phrases for _, _, num_phrases in index['texts']]
+    sampled = [phrase_number for phrase_number, _ in reservoir_sample(range(sum(phrase_counts)), k, seed)]
+
+    # Map the sampled phrase numbers to their text numbers, and numbers within their texts
+    sampled_by_text = {}
+    text_number = 0
+    first_phrase_number = 0
+    for phrase_number in sampled:
+        while phrase_number >= first_phrase_number + phrase_counts[text_number]:
+            first_phrase_number += phrase_counts[text_number]
+            text_number += 1
+        sampled_by_text.setdefault(text_number, []).append(phrase_number - first_phrase_number)
+
+    for text_number, text in iter_indexed_texts(path, index, sampled_by_text.keys()):
+        attributes = _without_phrases(text)
+        for phrase_number in sampled_by_text[text_number]:
+            yield text_number, attributes, text.phrases[phrase_number]
+
+
+def sample_phrases(source, k, seed=None):
+    """
+    Takes a uniform random sample of the phrases of a document, by reservoir sampling.
+
+    If the source is a path with an up to date offset index (see typecraft_python.parsing.index),
+    only the texts holding the sampled phrases are read. Otherwise, the document is read once.
+    The same seed gives the same sample either way.
+
+    :param source: A file path or a file object.
+    :param k: The number of phrases.
+    :param seed: The seed of the random number generator.
+    :return: A list of Text objects holding the sampled phrases, in document order.
+    """
+    index = load_offset_index(source)
+    if index is not None:
+        sampled = _iter_sampled_phrases_from_index(source, index, k, seed)
+    else:
+        sampled = (item for _, item in reservoir_sample(iter_phrases(source), k, seed))
+
+    texts = []
+    last_text_number = None
+    for text_number, attributes, phrase in sampled:
+        if text_number != last_text_number:
+            texts.append(copy.copy(attributes))
+            texts[-1].phrases = []
+            last_text_number = text_number
+        texts[-1].phrases.append(phrase)
+    return texts
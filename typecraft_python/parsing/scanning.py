@@ -0,0 +1,275 @@
+"""
+This module contains functionality for merging and splitting Typecraft-xml documents at the byte level.
+
+The top-level text elements of a document are found by scanning the raw bytes for text tags, skipping
+comments and CDATA sections, without parsing the contents of the texts. The bytes of each text are copied
+as they are, and only the root element around them is written anew.
+
+The text elements must have the same namespace prefix as the root element, if any. As the root element is
+not copied, the namespaces it declares are declared on each copied text instead, and texts of documents in
+other encodings than utf-8 are re-encoded. Documents must be in an encoding which is a superset of ASCII.
+"""
+import codecs
+import re
+
+from typecraft_python.core.exceptions import TypecraftParseException
+from typecraft_python.parsing.compression import open_input
+from typecraft_python.parsing.sharding import write_shards, SHARD_NAME_FORMAT
+from typecraft_python.parsing.streaming import TextWriter, _get_document_header_and_footer
+
+"""
+The number of bytes read from the input at a time.
+"""
+READ_BLOCK_SIZE = 1024 * 1024
+
+_ATTRIBUTES = br'((?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*)\s*(/?)>'
+_ATTRIBUTE = re.compile(br'([^\s=/>]+)\s*=\s*("[^"]*"|\'[^\']*\')')
+
+_BEFORE_ROOT = re.compile(br'<\?xml\s|<(?:[^\s/>!?:]+:)?(?:typecraft|text)[\s/>]|<!--|<!\[CDATA\[')
+_XML_DECLARATION = re.compile(br'<\?xml\s[^>]*?\?>')
+_DECLARED_ENCODING = re.compile(br'encoding\s*=\s*["\']([A-Za-z][\w.-]*)["\']')
+_ROOT_START_TAG = re.compile(br'<((?:[^\s/>!?:]+:)?)typecraft' + _ATTRIBUTES)
+_TEXT_NAME = re.compile(br'<(?:[^\s/>!?:]+:)?text')
+
+_SECTION_ENDS = {b'<!--': b'-->', b'<![CDATA[': b']]>'}
+
+_UNICODE_BYTE_ORDER_MARKS = [codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE, codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE]
+
+# Tokens before the root element may be cut off at the end of the buffer. This is the longest one kept.
+_MAX_TOKEN_LENGTH_BEFORE_ROOT = 256
+
+
+class _Incomplete(Exception):
+    """
+    Raised when the buffer ends in the middle of a text, a comment or a CDATA section.
+    """
+    pass
+
+
+def _skip_section(buffer, match):
+    """
+    Gets the position after the comment or CDATA section started by `match`.
+    """
+    end = buffer.find(_SECTION_ENDS[match.group()], match.end())
+    if end == -1:
+        raise _Incomplete()
+    return end + len(_SECTION_ENDS[match.group()])
+
+
+def _find_text_end(buffer, position, inside_text):
+    """
+    Gets the position after the end tag of the text whose start tag ends at `position`.
+    """
+    while True:
+        match = inside_text.search(buffer, position)
+        if match is None:
+            raise _Incomplete()
+        if match.group().startswith(b'</'):
+            return match.end()
+        position = _skip_section(buffer, match)
+
+
+def _is_utf8(encoding):
+    return codecs.lookup(encoding).name in ('utf-8', 'ascii')
+
+
+def _get_namespace_declarations(attributes):
+    return [(name, value) for name, value in _ATTRIBUTE.findall(attributes)
+            if name == b'xmlns' or name.startswith(b'xmlns:')]
+
+
+def _get_written_namespace_declarations():
+    header, _ = _get_document_header_and_footer()
+    return _get_namespace_declarations(_ROOT_START_TAG.match(header).group(2))
+
+
+def normalize_raw_text(raw_text, encoding='utf-8', declarations=b''):
+    """
+    Converts a raw text element of a document to the form of the texts written by TextWriter.
+
+    :param raw_text: The bytes of a text element, as found by iter_raw_text_offsets.
+    :param encoding: The encoding of the document. The text is re-encoded to utf-8.
+    :param declarations: The utf-8 encoded namespace declarations of the root element of the document,
+                         which are added to the start tag of the text. See _RawTextScanner.
+    :return: The utf-8 encoded text element, as bytes.
+    """
+    if not _is_utf8(encoding):
+        raw_text = raw_text.decode(encoding).encode('utf-8')
+    if declarations:
+        name_end = _TEXT_NAME.match(raw_text).end()
+        raw_text = raw_text[:name_end] + declarations + raw_text[name_end:]
+    return raw_text
+
+
+class _RawTextScanner(object):
+    """
+    Finds the text elements of a document. Once the root element is found, `encoding` is the declared encoding
+    of the document, and `declarations` holds the namespace declarations of the root element which differ from
+    those of the documents written by TextWriter, utf-8 encoded, for normalize_raw_text.
+    """
+
+    def __init__(self):
+        self.found_root = False
+        self.encoding = 'utf-8'
+        self.declarations = b''
+        self._outside_text = _BEFORE_ROOT
+        self._max_token_length = _MAX_TOKEN_LENGTH_BEFORE_ROOT
+
+    def _set_encoding(self, encoding):
+        encoding = encoding.decode('ascii')
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            raise TypecraftParseException("Unknown encoding '%s' declared by the document" % (encoding,))
+        if u'<text>'.encode(encoding) != b'<text>':
+            raise TypecraftParseException("Documents in the encoding '%s' cannot be scanned. "
+                                          "Convert the document to utf-8." % (encoding,))
+        self.encoding = encoding
+
+    def _set_root(self, root_start_tag):
+        """
+        Compiles the patterns of the text elements, with the prefix of the root element.
+        """
+        prefix = re.escape(root_start_tag.group(1))
+        self._outside_text = re.compile(br'<' + prefix + br'text[\s/>]|<!--|<!\[CDATA\[')
+        self._inside_text = re.compile(br'</' + prefix + br'text\s*>|<!--|<!\[CDATA\[')
+        self._text_start_tag = re.compile(br'<' + prefix + br'text' + _ATTRIBUTES)
+        self._max_token_length = len(b'<![CDATA[') + len(root_start_tag.group(1))
+
+        written = _get_written_namespace_declarations()
+        self.declarations = b''.join(
+            b' ' + name + b'=' + value
+            for name, value in _get_namespace_declarations(root_start_tag.group(2))
+            if (name, value) not in written
+        )
+        if not _is_utf8(self.encoding):
+            self.declarations = self.declarations.decode(self.encoding).encode('utf-8')
+        self.found_root = True
+
+    def find_text(self, buffer, position):
+        """
+        Finds the next top-level text element in the buffer.
+
+        :return: A tuple of the start and end of the text, or (None, position) if there are no more texts
+                 in the buffer. In the latter case, the buffer can be discarded up to position.
+        """
+        while True:
+            match = self._outside_text.search(buffer, position)
+            if match is None:
+                return None, max(position, len(buffer) - self._max_token_length)
+
+            token = match.group()
+            if token in _SECTION_ENDS:
+                position = _skip_section(buffer, match)
+            elif token.startswith(b'<?xml'):
+                declaration = _XML_DECLARATION.match(buffer, match.start())
+                if declaration is None:
+                    raise _Incomplete()
+                encoding = _DECLARED_ENCODING.search(declaration.group())
+                if encoding is not None:
+                    self._set_encoding(encoding.group(1))
+                position = declaration.end()
+            elif not self.found_root:
+                root_start_tag = _ROOT_START_TAG.match(buffer, match.start())
+                if root_start_tag is None:
+                    if _TEXT_NAME.match(buffer, match.start()):
+                        raise TypecraftParseException("Expect root of document to be element typecraft")
+                    raise _Incomplete()
+                self._set_root(root_start_tag)
+                position = root_start_tag.end()
+            else:
+                start_tag = self._text_start_tag.match(buffer, match.start())
+                if start_tag is None:
+                    raise _Incomplete()
+                if start_tag.group(2):
+                    return match.start(), start_tag.end()
+                return match.start(), _find_text_end(buffer, start_tag.end(), self._inside_text)
+
+
+def iter_raw_text_offsets(source, scanner=None):
+    """
+    Scans a Typecraft-xml document for its top-level text elements, and yields the raw bytes of each,
+    with its offset. The contents of the texts are not parsed. Compressed documents are decompressed
+    transparently, and the offsets are then offsets into the decompressed document.
+
+    The bytes are those of the document, in its encoding. See normalize_raw_text.
+
+    :param source: A file path or a file object.
+    :param scanner: An optional _RawTextScanner, which holds the encoding and namespace declarations
+                    of the document once a text has been yielded.
+    :return: A generator of (offset, bytes) tuples, the bytes being a complete text element.
+    """
+    scanner = scanner or _RawTextScanner()
+    buffer = b''
+    buffer_offset = 0
+    position = 0
+    read_size = READ_BLOCK_SIZE
+
+    with open_input(source) as _source:
+        while True:
+            try:
+                start, end = scanner.find_text(buffer, position)
+            except _Incomplete:
+                start, end = None, None
+                # Read larger blocks while in a large text, so that it is not rescanned once per block
+                read_size = max(read_size, len(buffer) - position)
+            else:
+                if start is not None:
+                    yield buffer_offset + start, buffer[start:end]
+                    position = end
+                    read_size = READ_BLOCK_SIZE
+                    continue
+                position = end
+
+            data = _source.read(read_size)
+            if not data:
+                if end is None:
+                    raise TypecraftParseException("Unexpected end of document")
+                break
+            buffer = buffer[position:] + data
+            buffer_offset += position
+            position = 0
+
+    if not scanner.found_root:
+        raise TypecraftParseException("Expect root of document to be element typecraft")
+
+
+def iter_raw_texts(source):
+    """
+    Scans a Typecraft-xml document for its top-level text elements, and yields the raw bytes of each,
+    re-encoded to utf-8 and with the namespace declarations of the root element. See iter_raw_text_offsets.
+
+    :param source: A file path or a file object.
+    :return: A generator of bytes, each a complete text element.
+    """
+    scanner = _RawTextScanner()
+    for _, raw_text in iter_raw_text_offsets(source, scanner):
+        yield normalize_raw_text(raw_text, scanner.encoding, scanner.declarations)
+
+
+def concatenate_documents(sources, output):
+    """
+    Merges the texts of several Typecraft-xml documents into a single document, without parsing the texts.
+
+    :param sources: An iterable of file paths or file objects.
+    :param output: A binary file object.
+    :return: The number of texts written.
+    """
+    with TextWriter(output) as writer:
+        for source in sources:
+            for raw_text in iter_raw_texts(source):
+                writer.write_serialized(raw_text)
+    return writer.num_texts
+
+
+def shard_documents(sources, directory, texts_per_shard=1, max_shard_size=None, name_format=SHARD_NAME_FORMAT,
+                    jobs=1):
+    """
+    Splits the texts of one or more Typecraft-xml documents into numbered shards, without parsing the texts.
+    See typecraft_python.parsing.sharding.write_shards.
+
+    :param sources: An iterable of file paths or file objects.
+    :return: The manifest, as a dict.
+    """
+    raw_texts = (raw_text for source in sources for raw_text in iter_raw_texts(source))
+    return write_shards(raw_texts, directory, texts_per_shard, max_shard_size, name_format, jobs)
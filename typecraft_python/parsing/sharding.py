@@ -0,0 +1,168 @@
+"""
+This module contains functionality for writing texts to a number of numbered Typecraft-xml files, or shards,
+in parallel, together with a json manifest listing the shards.
+
+Each shard is written to a hidden temporary file, which is renamed when the shard is complete. A consumer
+may therefore start reading the first shards while later shards are still being written.
+
+When shards are written to a directory holding shards of an earlier run, the earlier manifest is removed
+before any shard is written, and the earlier shards which are not overwritten are removed once the new
+manifest is written.
+"""
+import json
+import os
+
+import six
+
+from typecraft_python.parsing.compression import open_output
+from typecraft_python.parsing.streaming import serialize_text, TextWriter
+from typecraft_python.util import imap_ordered
+
+"""
+The default file name format of shards. It is given the (one based) number of the shard.
+A compressed extension, such as ".xml.gz", gives compressed shards.
+"""
+SHARD_NAME_FORMAT = '%05d.xml'
+
+MANIFEST_FILE_NAME = 'manifest.json'
+
+
+def group_texts(texts, texts_per_shard=1, max_shard_size=None):
+    """
+    Groups texts into shards of at most `texts_per_shard` texts.
+
+    If `max_shard_size` is given, the texts are serialized, and a shard is also ended before it would
+    grow larger than `max_shard_size` bytes. A text larger than `max_shard_size` gets a shard of its own.
+
+    :param texts: An iterable of Text objects or serialized texts.
+    :param texts_per_shard: The maximum number of texts per shard, or None for no limit.
+    :param max_shard_size: The maximum size of the texts of a shard in bytes, or None for no limit.
+    :return: A generator of lists of Text objects, or of serialized texts if `max_shard_size` is given.
+    """
+    shard = []
+    shard_size = 0
+    for text in texts:
+        if max_shard_size is not None:
+            if not isinstance(text, six.binary_type):
+                text = serialize_text(text)
+            if shard and shard_size + len(text) > max_shard_size:
+                yield shard
+                shard = []
+                shard_size = 0
+            shard_size += len(text)
+
+        shard.append(text)
+        if texts_per_shard and len(shard) >= texts_per_shard:
+            yield shard
+            shard = []
+            shard_size = 0
+
+    if shard:
+        yield shard
+
+
+def _replace(source, target):
+    """
+    Renames a file, replacing the target if it exists, also on Windows and in Python 2.
+    """
+    if hasattr(os, 'replace'):
+        os.replace(source, target)
+        return
+    if os.path.exists(target):
+        os.remove(target)
+    os.rename(source, target)
+
+
+def _read_manifest(directory):
+    path = os.path.join(directory, MANIFEST_FILE_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as _file:
+        return json.load(_file)
+
+
+def _remove_stale_shards(directory, manifest, old_manifest, name_format):
+    """
+    Removes the shards of an earlier run which are not part of the new manifest: those listed in the
+    earlier manifest, and those numbered after the last new shard.
+    """
+    current_files = set(shard['file'] for shard in manifest['shards'])
+    stale_files = set(shard['file'] for shard in old_manifest['shards']) if old_manifest else set()
+
+    number = len(manifest['shards']) + 1
+    while os.path.exists(os.path.join(directory, name_format % (number,))):
+        stale_files.add(name_format % (number,))
+        number += 1
+
+    for file_name in stale_files - current_files:
+        path = os.path.join(directory, file_name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def write_shard(path, texts):
+    """
+    Writes texts to a Typecraft-xml file. The file only appears at `path` once it is complete.
+
+    :param path: The path of the shard. It is compressed if it has a compressed extension.
+    :param texts: A list of Text objects or serialized texts.
+    :return: The size of the written file in bytes.
+    """
+    directory, file_name = os.path.split(path)
+    temporary_path = os.path.join(directory, '.' + file_name)
+
+    with open_output(temporary_path) as _file:
+        with TextWriter(_file) as writer:
+            for text in texts:
+                if isinstance(text, six.binary_type):
+                    writer.write_serialized(text)
+                else:
+                    writer.write(text)
+
+    _replace(temporary_path, path)
+    return os.path.getsize(path)
+
+
+def _write_shard(arguments):
+    return write_shard(*arguments)
+
+
+def write_shards(texts, directory, texts_per_shard=1, max_shard_size=None, name_format=SHARD_NAME_FORMAT, jobs=1):
+    """
+    Writes texts to numbered shards in a directory, see `group_texts`, with `jobs` parallel writers.
+    When all shards are written, a manifest listing the shards in order is written to manifest.json,
+    and any shards of an earlier run which are not listed in it are removed:
+
+        {"shards": [{"file": "00001.xml", "texts": 10, "size": 52012}, ...], "texts": 95}
+
+    :param texts: An iterable of Text objects or serialized texts.
+    :param directory: The directory to write to. It is created if it does not exist.
+    :param texts_per_shard: See `group_texts`.
+    :param max_shard_size: See `group_texts`.
+    :param name_format: The file name format of the shards.
+    :param jobs: The number of worker processes writing shards.
+    :return: The manifest, as a dict.
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    # Consumers must not read the earlier manifest while its shards are overwritten
+    old_manifest = _read_manifest(directory)
+    if old_manifest is not None:
+        os.remove(os.path.join(directory, MANIFEST_FILE_NAME))
+
+    def tasks():
+        for index, shard in enumerate(group_texts(texts, texts_per_shard, max_shard_size)):
+            file_name = name_format % (index + 1,)
+            yield (file_name, len(shard)), (os.path.join(directory, file_name), shard)
+
+    manifest = {'shards': [], 'texts': 0}
+    for (file_name, num_texts), size in imap_ordered(_write_shard, tasks(), jobs):
+        manifest['shards'].append({'file': file_name, 'texts': num_texts, 'size': size})
+        manifest['texts'] += num_texts
+
+    with open(os.path.join(directory, MANIFEST_FILE_NAME), 'w') as _file:
+        json.dump(manifest, _file, indent=2)
+
+    _remove_stale_shards(directory, manifest, old_manifest, name_format)
+    return manifest
@@ -0,0 +1,129 @@
+"""
+This module contains a fast scan of Typecraft-xml documents, which counts the texts, phrases, words,
+morphemes and glosses of a document without building any model objects.
+"""
+from collections import OrderedDict
+from xml.parsers import expat
+
+from typecraft_python.core.exceptions import TypecraftParseException
+from typecraft_python.core.models import PhraseValidity
+from typecraft_python.parsing.compression import open_input
+from typecraft_python.parsing.parser import ns
+
+"""
+The number of bytes read from the input at a time.
+"""
+READ_BLOCK_SIZE = 1024 * 1024
+
+"""
+The counted elements, keyed by their expat names, i.e. "namespace local-name".
+"""
+_COUNTED_ELEMENTS = OrderedDict(
+    (ns[1:-1] + ' ' + name, name + 'es' if name == 'gloss' else name + 's')
+    for name in ['text', 'phrase', 'word', 'morpheme', 'gloss']
+)
+
+_ROOT_ELEMENT = ns[1:-1] + ' typecraft'
+
+_TEXT_ELEMENT = ns[1:-1] + ' text'
+
+"""
+Und is the default for the undefined language, as for Text objects. Elements outside any text,
+which the parser rejects, are counted under it too.
+"""
+_UNDEFINED_LANGUAGE = 'und'
+
+
+def _create_counts():
+    return OrderedDict((key, 0) for key in _COUNTED_ELEMENTS.values())
+
+
+def _get_validity(phrase_attributes):
+    """
+    Gets the validity of a phrase element, as the parser would interpret it.
+    """
+    validity = phrase_attributes.get('valid')
+    if validity is None:
+        return PhraseValidity.EMPTY.value
+    if hasattr(PhraseValidity, validity):
+        return validity
+    return PhraseValidity.UNKNOWN.value
+
+
+def collect_statistics(source):
+    """
+    Counts the texts, phrases, words, morphemes and glosses of a Typecraft-xml document,
+    in total and per language, and counts the phrases per validity. Phrases, words, morphemes and
+    glosses outside any text are counted under the undefined language.
+
+    The document is scanned with expat, without building an element tree or any model objects.
+    Compressed documents are decompressed transparently.
+
+    :param source: A file path or a file object.
+    :return: A dict like
+             {'texts': 2, 'phrases': 10, 'words': 50, 'morphemes': 60, 'glosses': 40,
+              'languages': {'nob': {'texts': 2, ...}},
+              'validity': {'VALID': 8, 'EMPTY': 2}}
+    """
+    statistics = _create_counts()
+    statistics['languages'] = OrderedDict()
+    statistics['validity'] = OrderedDict()
+    state = {'root': None, 'language': None}
+
+    def get_language_counts(language):
+        if language not in statistics['languages']:
+            statistics['languages'][language] = _create_counts()
+        return statistics['languages'][language]
+
+    def start_element(name, attributes):
+        if state['root'] is None:
+            if name != _ROOT_ELEMENT:
+                raise TypecraftParseException("Expect root of document to be element " + ns + "typecraft"
+                                              ", and not " + name)
+            state['root'] = name
+            return
+
+        key = _COUNTED_ELEMENTS.get(name)
+        if key is None:
+            return
+
+        if key == 'texts':
+            state['language'] = get_language_counts(attributes.get('lang') or _UNDEFINED_LANGUAGE)
+        elif key == 'phrases':
+            validity = _get_validity(attributes)
+            statistics['validity'][validity] = statistics['validity'].get(validity, 0) + 1
+
+        statistics[key] += 1
+        (state['language'] or get_language_counts(_UNDEFINED_LANGUAGE))[key] += 1
+
+    def end_element(name):
+        if name == _TEXT_ELEMENT:
+            state['language'] = None
+
+    parser = expat.ParserCreate(namespace_separator=' ')
+    parser.buffer_text = True
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+
+    try:
+        with open_input(source) as _source:
+            while True:
+                data = _source.read(READ_BLOCK_SIZE)
+                if not data:
+                    break
+                parser.Parse(data, False)
+        parser.Parse(b'', True)
+    except expat.ExpatError as error:
+        raise TypecraftParseException("Unable to parse document: " + str(error))
+
+    return statistics
+
+
+def count_texts(source):
+    """
+    Counts the texts of a Typecraft-xml document. See `collect_statistics`.
+
+    :param source: A file path or a file object.
+    :return: The number of texts.
+    """
+    return collect_statistics(source)['texts']
@@ -0,0 +1,247 @@
+"""
+This module contains functionality for reading and writing Typecraft-xml incrementally,
+one text at a time, without holding the full document in memory.
+"""
+import copy
+import xml.etree.ElementTree as ElementTree
+
+from typecraft_python.core.exceptions import TypecraftParseException
+from typecraft_python.parsing.compression import open_input
+from typecraft_python.parsing.parser import Parser, tag_typecraft
+
+
+def iter_texts(source):
+    """
+    Parses a Typecraft-xml document incrementally, yielding each text as soon as it is parsed.
+    Parsed elements are discarded, so memory use is bounded by the size of the largest text.
+    Compressed documents are decompressed transparently.
+
+    :param source: A file path or a file object.
+    :return: A generator of Text objects.
+    """
+    root = None
+    depth = 0
+    with open_input(source) as _source:
+        for event, element in ElementTree.iterparse(_source, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    if tag_typecraft not in element.tag:
+                        raise TypecraftParseException("Expect root of document to be element "
+                                                      + tag_typecraft +
+                                                      ", and not " + element.tag)
+                    root = element
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 1:
+                    yield Parser.convert_etree_to_text(element)
+                    root.clear()
+
+
+def _get_document_header_and_footer():
+    """
+    Gets the opening and closing tag of the root element of a Typecraft-xml document,
+    exactly as written by Parser.write.
+
+    :return: A tuple of bytes.
+    """
+    root = Parser.convert_texts_to_etree([])
+    ElementTree.SubElement(root, 'text')
+    header, footer = ElementTree.tostring(root, encoding='utf-8').split(b'<text />')
+    return header, footer
+
+
+def serialize_text(text):
+    """
+    Serializes a single text to a Typecraft-xml text element.
+
+    :param text: A Text object.
+    :return: The utf-8 encoded text element, as bytes.
+    """
+    root = ElementTree.Element('typecraft')
+    Parser.convert_text_to_etree(root, text)
+    return ElementTree.tostring(root[0], encoding='utf-8')
+
+
+def parse_serialized_text(serialized_text):
+    """
+    Parses a single Typecraft-xml text element, as given by `serialize_text`.
+
+    :param serialized_text: The utf-8 encoded text element, as bytes.
+    :return: A Text object.
+    """
+    header, footer = _get_document_header_and_footer()
+    return Parser.parse(header + serialized_text + footer)[0]
+
+
+def _serialize_text_start(text):
+    """
+    Serializes everything of a text element but its phrases and its closing tag.
+
+    :param text: A Text object.
+    :return: The utf-8 encoded start of the text element, as bytes.
+    """
+    text = copy.copy(text)
+    text.phrases = []
+    serialized = serialize_text(text)
+    assert serialized.endswith(b'</text>')
+    return serialized[:-len(b'</text>')]
+
+
+def serialize_phrase(phrase):
+    """
+    Serializes a single phrase to a Typecraft-xml phrase element.
+
+    :param phrase: A Phrase object.
+    :return: The utf-8 encoded phrase element, as bytes.
+    """
+    root = ElementTree.Element('text')
+    Parser.convert_phrase_to_etree(root, phrase)
+    return ElementTree.tostring(root[0], encoding='utf-8')
+
+
+def iter_serialized_document(texts):
+    """
+    Serializes texts to a Typecraft-xml document, one text at a time.
+    Joining the chunks gives the same document as Parser.write.
+
+    :param texts: An iterable of Text objects.
+    :return: A generator of bytes.
+    """
+    header, footer = _get_document_header_and_footer()
+    yield header
+    for text in texts:
+        yield serialize_text(text)
+    yield footer
+
+
+class TextWriter(object):
+    """
+    Writes texts to a binary file object one at a time, as a single Typecraft-xml document.
+
+    The output is identical to the output of Parser.write for the same texts. The document
+    is completed when the writer is closed:
+
+        with TextWriter(output_file) as writer:
+            for text in texts:
+                writer.write(text)
+
+    A text can also be written one phrase at a time, so that not even a single text has to be
+    held in memory. The phrases of the given text are ignored by `start_text`:
+
+        with TextWriter(output_file) as writer:
+            writer.start_text(Text(title="Title"))
+            for phrase in phrases:
+                writer.write_phrase(phrase)
+            writer.end_text()
+    """
+
+    def __init__(self, output):
+        """
+        :param output: A binary file object.
+        """
+        self.output = output
+        self.num_texts = 0
+        self._header, self._footer = _get_document_header_and_footer()
+        self._started = False
+        self._closed = False
+        self._in_text = False
+
+    def _start(self):
+        if not self._started:
+            self.output.write(self._header)
+            self._started = True
+
+    def write(self, text):
+        """
+        Writes a text.
+
+        :param text: A Text object.
+        :return: Nothing
+        """
+        self.write_serialized(serialize_text(text))
+
+    def write_serialized(self, serialized_text):
+        """
+        Writes a text serialized with `serialize_text`.
+
+        :param serialized_text: Bytes.
+        :return: Nothing
+        """
+        assert not self._closed and not self._in_text
+        self._start()
+        self.output.write(serialized_text)
+        self.num_texts += 1
+
+    def start_text(self, text):
+        """
+        Starts a text, whose phrases are written with `write_phrase`.
+
+        :param text: A Text object, with the attributes and metadata of the text.
+        :return: Nothing
+        """
+        assert not self._closed and not self._in_text
+        self._start()
+        self.output.write(_serialize_text_start(text))
+        self._in_text = True
+
+    def write_phrase(self, phrase):
+        """
+        Writes a phrase to the text started by `start_text`.
+
+        :param phrase: A Phrase object.
+        :return: Nothing
+        """
+        self.write_serialized_phrase(serialize_phrase(phrase))
+
+    def write_serialized_phrase(self, serialized_phrase):
+        """
+        Writes a phrase serialized with `serialize_phrase` to the text started by `start_text`.
+
+        :param serialized_phrase: Bytes.
+        :return: Nothing
+        """
+        assert self._in_text
+        self.output.write(serialized_phrase)
+
+    def end_text(self):
+        """
+        Ends the text started by `start_text`.
+
+        :return: Nothing
+        """
+        assert self._in_text
+        self.output.write(b'</text>')
+        self._in_text = False
+        self.num_texts += 1
+
+    def write_texts(self, texts):
+        """
+        Writes an iterable of texts.
+
+        :param texts:
+        :return: Nothing
+        """
+        for text in texts:
+            self.write(text)
+
+    def close(self):
+        """
+        Completes the document. Does not close the underlying file object.
+
+        :return: Nothing
+        """
+        if not self._closed:
+            if self._in_text:
+                self.end_text()
+            self._start()
+            self.output.write(self._footer)
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Leave the document incomplete on errors, so that it cannot be mistaken for a complete one
+        if exc_type is None:
+            self.close()
@@ -1,5 +1,7 @@
 # coding: utf-8
 from typecraft_python.parsing.parallell import parse_continuous_parallel_text_to_tuples, parse_continuous_parallel_text_to_phrases
+from typecraft_python.parsing.parallell import iter_lines, iter_continuous_parallel_tuples, \
+    iter_tab_separated_parallel_tuples, iter_aligned_files_parallel_tuples, iter_parallel_phrases
 
 
 class TestParseContinuousParallelTextToTuples(object):
@@ -11,6 +13,7 @@ class TestParseContinuousParallelTextToTuples(object):
         Dette er den andre setningen."""
         tuples = list(parse_continuous_parallel_text_to_tuples(raw_text, 2))
         assert len(tuples) == 2
+        assert all(isinstance(_tuple, list) for _tuple in tuples)
 
         assert tuples[0][0] == u"This is the first sentence."
         assert tuples[0][1] == u"Dette er den første setningen."
@@ -89,3 +92,36 @@ class TestParseContinuousParallelTextToPhrases(object):
         assert phrases[1].translation == u"Sentence2 in lang2."
         assert phrases[1].translation2 == u"Sentence2 in lang3."
 
+
+class TestStreamingParallelText(object):
+
+    def test_lines_are_read_lazily(self):
+        def lines():
+            yield u"First.\n"
+            yield u"Første.\n"
+            raise AssertionError("Read too far")
+
+        tuples = iter_continuous_parallel_tuples(iter_lines([lines()]), 2)
+        assert next(tuples) == (u"First.", u"Første.")
+
+    def test_lines_across_files(self):
+        lines = list(iter_lines([[u" a \n", u"\n"], [u"b\n"]]))
+        assert lines == [u"a", u"b"]
+
+    def test_tab_separated(self):
+        tuples = list(iter_tab_separated_parallel_tuples([u"First.\tFørste.\tErste.", u"Second.\tAndre."]))
+        assert tuples == [(u"First.", u"Første.", u"Erste."), (u"Second.", u"Andre.")]
+
+    def test_aligned_files(self):
+        english = [u"First.\n", u"\n", u"Third.\n"]
+        norwegian = [u"Første.\n", u"\n", u"Tredje.\n", u"Fjerde.\n"]
+        tuples = list(iter_aligned_files_parallel_tuples([english, norwegian]))
+
+        assert tuples == [(u"First.", u"Første."), (u"Third.", u"Tredje."), (u"", u"Fjerde.")]
+
+    def test_phrases(self):
+        phrases = list(iter_parallel_phrases([(u"First.", u"Første."), ()]))
+
+        assert len(phrases) == 1
+        assert phrases[0].phrase == u"First."
+        assert phrases[0].translation == u"Første."
@@ -0,0 +1,124 @@
+"""
+This module contains keyword-in-context (KWIC) concordances, served from an inverted index.
+
+The hits of a query are looked up in the index, and their left and right contexts are taken from the
+word forms of the index, so the corpus itself is not read:
+
+    for line in concordance(index, 'lemma:hus', window=5):
+        print(" ".join(line.left), line.keyword, " ".join(line.right))
+
+The context of a hit never extends beyond its phrase.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+"""
+The number of hits whose contexts are looked up at once.
+"""
+BATCH_SIZE = 1024
+
+DEFAULT_WINDOW = 5
+
+"""
+The orders concordance lines can be sorted in. Sorting by the left context compares the nearest words first.
+"""
+SORT_ORDERS = ['left', 'right']
+
+"""
+A concordance line: the text, phrase and word number of the hit, the words of the left context,
+the hit itself and the words of the right context.
+"""
+ConcordanceLine = namedtuple('ConcordanceLine', ['text', 'phrase', 'word', 'left', 'keyword', 'right'])
+
+
+def _get_contexts(index, token_ids, window):
+    """
+    Gets the token numbers of the contexts of some hits.
+
+    :return: A tuple of the left and right context token numbers, as arrays of shape (hits, window),
+             with -1 for positions outside the phrase of the hit.
+    """
+    texts = index.get_location_array('texts')
+    phrases = index.get_location_array('phrases')
+    offsets = np.arange(1, window + 1)
+
+    def context(direction):
+        positions = token_ids[:, np.newaxis] + direction * offsets
+        clipped = np.clip(positions, 0, len(texts) - 1)
+        inside = (positions >= 0) & (positions < len(texts)) & \
+            (texts[clipped] == texts[token_ids][:, np.newaxis]) & \
+            (phrases[clipped] == phrases[token_ids][:, np.newaxis])
+        return np.where(inside, positions, -1)
+
+    return context(-1)[:, ::-1], context(1)
+
+
+def iter_concordance(index, query, window=DEFAULT_WINDOW):
+    """
+    Finds the hits of a query, and yields them with their contexts, in corpus order.
+
+    :param index: An InvertedIndex.
+    :param query: A query, see typecraft_python.search.index.parse_query.
+    :param window: The maximum number of words of context on either side.
+    :return: A generator of ConcordanceLine tuples.
+    """
+    token_ids = index.search(query)
+    forms = index.fields['form'].terms
+    form_ids = index.get_location_array('forms')
+
+    def words(context):
+        return [forms[form_ids[token_id]] for token_id in context if token_id >= 0]
+
+    for start in range(0, len(token_ids), BATCH_SIZE):
+        batch = token_ids[start:start + BATCH_SIZE]
+        left, right = _get_contexts(index, batch, window)
+        locations = zip(*index.get_locations(batch))
+        for token_id, location, left_context, right_context in zip(batch, locations, left, right):
+            yield ConcordanceLine(
+                int(location[0]), int(location[1]), int(location[2]),
+                words(left_context), forms[form_ids[token_id]], words(right_context)
+            )
+
+
+def _sort_key(order):
+    if order == 'left':
+        return lambda line: ([word.lower() for word in reversed(line.left)], line.keyword.lower())
+    if order == 'right':
+        return lambda line: (line.keyword.lower(), [word.lower() for word in line.right])
+    raise ValueError("Unknown sort order '%s', expected one of %s" % (order, ", ".join(SORT_ORDERS)))
+
+
+def concordance(index, query, window=DEFAULT_WINDOW, sort=None):
+    """
+    Gets the concordance lines of a query.
+
+    Without sorting, the lines are yielded as they are found. Sorting by the left context orders the lines
+    by the word before the hit, then the word before that and so on, and sorting by the right context orders
+    them by the hit, then the words after it. Sorting is stable, so equal lines remain in corpus order.
+
+    :param index: An InvertedIndex.
+    :param query: A query, see typecraft_python.search.index.parse_query.
+    :param window: The maximum number of words of context on either side.
+    :param sort: None, 'left' or 'right'.
+    :return: An iterator of ConcordanceLine tuples.
+    """
+    lines = iter_concordance(index, query, window)
+    if sort is None:
+        return lines
+    return iter(sorted(lines, key=_sort_key(sort)))
+
+
+def format_concordance_line(line, width=40):
+    """
+    Formats a concordance line for display, with the left context right aligned in `width` characters,
+    so that the hits of consecutive lines line up. Longer left contexts are cut off at the start.
+
+    :param line: A ConcordanceLine.
+    :param width: The width of the left context.
+    :return: A string.
+    """
+    left = " ".join(line.left)
+    if len(left) > width:
+        left = left[len(left) - width:]
+    return u"%s  %s  %s" % (left.rjust(width), line.keyword, " ".join(line.right))
@@ -0,0 +1,459 @@
+"""
+This module contains an inverted index of the words of a corpus, by word form, lowercased word form,
+lemma (Morpheme.baseform), POS tag and gloss.
+
+Every word of the corpus is a token, numbered in corpus order. The index keeps the text, phrase and
+word number and the form of each token in flat arrays, and for every term of every field, the sorted
+array of the tokens having that term:
+
+    index = InvertedIndex()
+    index.add_texts(texts)
+    token_ids = index.search('lemma:hus AND pos:N OR gloss:PL')
+    for text_number, phrase_number, word_number in index.iter_locations(token_ids):
+        ...
+
+Texts added after the index was built or loaded get new token numbers, and are merged into the postings
+the next time the index is searched or saved, or once COMPACTION_SIZE tokens have been added. The index is
+saved as a numpy .npz file holding the arrays, and a json file holding the terms.
+"""
+import json
+import os
+import re
+from array import array
+
+import numpy as np
+import six
+
+from typecraft_python.parsing.streaming import iter_texts
+
+"""
+The fields of the index.
+"""
+FIELDS = ['form', 'lower', 'lemma', 'pos', 'gloss']
+
+"""
+The field of query terms given without a field.
+"""
+DEFAULT_FIELD = 'form'
+
+"""
+The type of token numbers. An index holds at most 2^31 - 1 tokens.
+"""
+TOKEN_DTYPE = np.int32
+
+"""
+The inverted index of a file is stored at the path of the file with this extension added,
+followed by .npz and .json.
+"""
+INVERTED_INDEX_EXTENSION = '.search'
+
+"""
+The number of added tokens held in typed lists before they are merged into the arrays of the index,
+which bounds the memory used while building an index from a stream of texts.
+"""
+COMPACTION_SIZE = 1000000
+
+_LOCATION_ARRAYS = ['texts', 'phrases', 'words', 'forms']
+
+# The typecode of the lists of added term and token numbers
+_PENDING_TYPECODE = 'i'
+
+_QUERY_TOKEN = re.compile(r'\(|\)|[^\s()":]+:"[^"]*"|"[^"]*"|[^\s()]+', re.UNICODE)
+
+
+def get_word_terms(word):
+    """
+    Gets the terms of a word in every field.
+
+    :param word: A Word object.
+    :return: A dict mapping each field to a list of distinct terms.
+    """
+    lemmas = []
+    glosses = []
+    for morpheme in word.morphemes:
+        if morpheme.baseform and morpheme.baseform not in lemmas:
+            lemmas.append(morpheme.baseform)
+        for gloss in morpheme.glosses:
+            if gloss and gloss not in glosses:
+                glosses.append(gloss)
+
+    return {
+        'form': [word.word],
+        'lower': [word.word.lower()],
+        'lemma': lemmas,
+        'pos': [word.pos] if word.pos else [],
+        'gloss': glosses
+    }
+
+
+def sorted_unique(values):
+    """
+    Gets the distinct values of an integer array, sorted. Unlike np.unique, always sorts rather than hashes,
+    which is faster for large arrays.
+    """
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+    return values[np.concatenate([[True], values[1:] != values[:-1]])]
+
+
+class _Field(object):
+    """
+    The terms of a field, and the sorted token numbers of every term, as a single array of postings.
+    The postings of term i are postings[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, terms=(), offsets=None, postings=None):
+        self.terms = list(terms)
+        self.term_ids = dict((term, term_id) for term_id, term in enumerate(self.terms))
+        self.offsets = offsets if offsets is not None else np.zeros(1, dtype=np.int64)
+        self.postings = postings if postings is not None else np.zeros(0, dtype=TOKEN_DTYPE)
+        self._pending_term_ids = array(_PENDING_TYPECODE)
+        self._pending_token_ids = array(_PENDING_TYPECODE)
+
+    def add(self, term, token_id):
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = self.term_ids[term] = len(self.terms)
+            self.terms.append(term)
+        self._pending_term_ids.append(term_id)
+        self._pending_token_ids.append(token_id)
+
+    def compact(self):
+        """
+        Merges the postings added since the last compaction into the postings array.
+
+        Only the added postings are sorted, by a stable sort by term, which keeps the postings of each term
+        sorted. Added tokens have larger numbers than the existing ones, so the added postings of a term go
+        after its existing postings.
+        """
+        if not self._pending_term_ids:
+            return
+
+        term_ids = np.array(self._pending_term_ids, dtype=np.int64)
+        order = np.argsort(term_ids, kind='stable')
+        added_counts = np.bincount(term_ids, minlength=len(self.terms))
+        # Terms added since the last compaction have no existing postings
+        old_offsets = np.concatenate([
+            self.offsets, np.repeat(self.offsets[-1], len(self.terms) + 1 - len(self.offsets))
+        ])
+        old_counts = np.diff(old_offsets)
+
+        # Every existing posting moves by the number of postings added to the terms before its term,
+        # and the added postings of a term follow its existing postings
+        postings = np.empty(len(self.postings) + len(term_ids), dtype=TOKEN_DTYPE)
+        shifts = np.concatenate([[0], np.cumsum(added_counts)[:-1]])
+        postings[np.arange(len(self.postings)) + np.repeat(shifts, old_counts)] = self.postings
+        postings[np.arange(len(term_ids)) + np.repeat(old_offsets[1:], added_counts)] = \
+            np.array(self._pending_token_ids, dtype=TOKEN_DTYPE)[order]
+
+        self.postings = postings
+        self.offsets = np.concatenate([[0], np.cumsum(old_counts + added_counts)])
+        self._pending_term_ids = array(_PENDING_TYPECODE)
+        self._pending_token_ids = array(_PENDING_TYPECODE)
+
+    def get_postings(self, term):
+        self.compact()
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return np.zeros(0, dtype=TOKEN_DTYPE)
+        return self.postings[self.offsets[term_id]:self.offsets[term_id + 1]]
+
+    def get_frequency(self, term):
+        return len(self.get_postings(term))
+
+
+def parse_query(query):
+    """
+    Parses a boolean query of terms. A term is written field:term, or just term for a word form,
+    and may be quoted, as in gloss:"3SG". Terms are combined with AND and OR, AND binding tighter,
+    and grouped with parentheses:
+
+        (lemma:hus OR lemma:bygning) AND gloss:PL
+
+    :param query: A string.
+    :return: A tree of ('term', field, term), ('and', [trees]) and ('or', [trees]) tuples.
+    """
+    tokens = _QUERY_TOKEN.findall(query)
+    position = [0]
+
+    def peek():
+        return tokens[position[0]] if position[0] < len(tokens) else None
+
+    def take():
+        position[0] += 1
+        return tokens[position[0] - 1]
+
+    def parse_or():
+        children = [parse_and()]
+        while peek() == 'OR':
+            take()
+            children.append(parse_and())
+        return children[0] if len(children) == 1 else ('or', children)
+
+    def parse_and():
+        children = [parse_atom()]
+        while peek() == 'AND':
+            take()
+            children.append(parse_atom())
+        return children[0] if len(children) == 1 else ('and', children)
+
+    def parse_atom():
+        token = peek()
+        if token is None or token in ('AND', 'OR', ')'):
+            raise ValueError("Invalid query '%s': expected a term at position %d" % (query, position[0]))
+        take()
+        if token == '(':
+            tree = parse_or()
+            if peek() != ')':
+                raise ValueError("Invalid query '%s': missing ')'" % (query,))
+            take()
+            return tree
+
+        field, term = DEFAULT_FIELD, token
+        if ':' in token and not token.startswith('"'):
+            field, term = token.split(':', 1)
+        if field not in FIELDS:
+            raise ValueError("Invalid query '%s': unknown field '%s'" % (query, field))
+        if len(term) >= 2 and term.startswith('"') and term.endswith('"'):
+            term = term[1:-1]
+        return 'term', field, term
+
+    tree = parse_or()
+    if peek() is not None:
+        raise ValueError("Invalid query '%s': unexpected '%s'" % (query, peek()))
+    return tree
+
+
+class InvertedIndex(object):
+    """
+    An inverted index of the words of a corpus. See the module documentation.
+    """
+
+    def __init__(self):
+        self.fields = dict((field, _Field()) for field in FIELDS)
+        self.num_texts = 0
+        self.metadata = {}
+        self._locations = dict((name, np.zeros(0, dtype=TOKEN_DTYPE)) for name in _LOCATION_ARRAYS)
+        self._pending_locations = dict((name, array(_PENDING_TYPECODE)) for name in _LOCATION_ARRAYS)
+
+    def __len__(self):
+        """
+        :return: The number of tokens.
+        """
+        return len(self._locations['texts']) + len(self._pending_locations['texts'])
+
+    def add_text(self, text):
+        """
+        Adds the words of a text to the index. The text gets the next text number.
+
+        :param text: A Text object.
+        :return: The text number of the text.
+        """
+        text_number = self.num_texts
+        token_id = len(self)
+        forms = self.fields['form']
+        pending = self._pending_locations
+
+        for phrase_number, phrase in enumerate(text.phrases):
+            for word_number, word in enumerate(phrase.words):
+                for field, terms in get_word_terms(word).items():
+                    for term in terms:
+                        self.fields[field].add(term, token_id)
+                pending['texts'].append(text_number)
+                pending['phrases'].append(phrase_number)
+                pending['words'].append(word_number)
+                pending['forms'].append(forms.term_ids[word.word])
+                token_id += 1
+
+        if token_id > np.iinfo(TOKEN_DTYPE).max:
+            raise OverflowError("An inverted index holds at most %d tokens" % (np.iinfo(TOKEN_DTYPE).max,))
+
+        self.num_texts += 1
+        if len(pending['texts']) >= COMPACTION_SIZE:
+            self.compact()
+        return text_number
+
+    def add_texts(self, texts):
+        """
+        Adds the words of a number of texts, such as a Corpus, to the index. The added tokens are merged into
+        the arrays of the index every COMPACTION_SIZE tokens, so that texts can be streamed in bounded memory.
+
+        :param texts: An iterable of Text objects.
+        """
+        for text in texts:
+            self.add_text(text)
+
+    def compact(self):
+        """
+        Merges the tokens added since the last compaction into the arrays of the index.
+        This is done automatically when the index is searched or saved.
+        """
+        for field in self.fields.values():
+            field.compact()
+        for name in _LOCATION_ARRAYS:
+            if self._pending_locations[name]:
+                self._locations[name] = np.concatenate([
+                    self._locations[name], np.array(self._pending_locations[name], dtype=TOKEN_DTYPE)
+                ])
+                self._pending_locations[name] = array(_PENDING_TYPECODE)
+
+    def get_postings(self, field, term):
+        """
+        :return: The sorted numbers of the tokens having a term in a field.
+        """
+        return self.fields[field].get_postings(term)
+
+    def get_frequency(self, field, term):
+        """
+        :return: The number of tokens having a term in a field.
+        """
+        return self.fields[field].get_frequency(term)
+
+    def search(self, query):
+        """
+        Gets the tokens matching a query, see parse_query.
+
+        :param query: A query string or a tree returned by parse_query.
+        :return: A sorted numpy array of token numbers.
+        """
+        if isinstance(query, six.string_types):
+            query = parse_query(query)
+
+        if query[0] == 'term':
+            return self.get_postings(query[1], query[2])
+
+        results = [self.search(child) for child in query[1]]
+        if query[0] == 'and':
+            # Intersecting the shortest postings first keeps the intermediate results small
+            results.sort(key=len)
+            result = results[0]
+            for other in results[1:]:
+                result = np.intersect1d(result, other, assume_unique=True)
+            return result
+        return sorted_unique(np.concatenate(results))
+
+    def get_locations(self, token_ids):
+        """
+        :param token_ids: A numpy array of token numbers.
+        :return: A tuple of numpy arrays of the text, phrase and word numbers of the tokens.
+        """
+        self.compact()
+        return tuple(self._locations[name][token_ids] for name in ['texts', 'phrases', 'words'])
+
+    def iter_locations(self, token_ids):
+        """
+        :param token_ids: A numpy array of token numbers.
+        :return: A generator of (text number, phrase number, word number) tuples.
+        """
+        for location in zip(*self.get_locations(token_ids)):
+            yield tuple(int(number) for number in location)
+
+    def get_forms(self, token_ids):
+        """
+        :param token_ids: A numpy array of token numbers.
+        :return: A list of the word forms of the tokens.
+        """
+        self.compact()
+        terms = self.fields['form'].terms
+        return [terms[form_id] for form_id in self._locations['forms'][token_ids]]
+
+    def get_location_array(self, name):
+        """
+        :param name: 'texts', 'phrases', 'words' or 'forms'.
+        :return: The numpy array of the text, phrase or word numbers, or form ids, of all tokens.
+        """
+        self.compact()
+        return self._locations[name]
+
+    def save(self, path, metadata=None):
+        """
+        Saves the index to path.npz and path.json.
+
+        :param path: A path without extension.
+        :param metadata: A dict stored with the index. Defaults to the metadata of the index.
+        """
+        self.compact()
+        arrays = dict(self._locations)
+        for name, field in self.fields.items():
+            arrays[name + '_offsets'] = field.offsets
+            arrays[name + '_postings'] = field.postings
+        with open(path + '.npz', 'wb') as _file:
+            np.savez(_file, **arrays)
+
+        with open(path + '.json', 'w') as _file:
+            json.dump({
+                'num_texts': self.num_texts,
+                'terms': dict((name, field.terms) for name, field in self.fields.items()),
+                'metadata': metadata if metadata is not None else self.metadata
+            }, _file)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads an index saved with `save`.
+
+        :param path: A path without extension.
+        :return: An InvertedIndex.
+        """
+        with open(path + '.json') as _file:
+            description = json.load(_file)
+
+        index = cls()
+        index.num_texts = description['num_texts']
+        index.metadata = description.get('metadata', {})
+        with np.load(path + '.npz') as arrays:
+            for name in _LOCATION_ARRAYS:
+                index._locations[name] = arrays[name]
+            for name in FIELDS:
+                index.fields[name] = _Field(
+                    description['terms'][name], arrays[name + '_offsets'], arrays[name + '_postings']
+                )
+        return index
+
+
+def get_inverted_index_path(path):
+    return path + INVERTED_INDEX_EXTENSION
+
+
+def build_inverted_index(source):
+    """
+    Builds the inverted index of a Typecraft-xml document, reading one text at a time.
+
+    :param source: A file path or a file object.
+    :return: An InvertedIndex.
+    """
+    index = InvertedIndex()
+    index.add_texts(iter_texts(source))
+    return index
+
+
+def write_inverted_index(path):
+    """
+    Builds the inverted index of a file, and writes it next to the file.
+
+    :param path: A file path.
+    :return: The index.
+    """
+    stat = os.stat(path)
+    index = build_inverted_index(path)
+    index.save(get_inverted_index_path(path), {'size': stat.st_size, 'mtime': stat.st_mtime})
+    return index
+
+
+def load_inverted_index(path):
+    """
+    Loads the inverted index of a file, if it exists and the file has not changed since it was built.
+
+    :param path: A file path. Anything else, such as a file object, has no index.
+    :return: An InvertedIndex, or None.
+    """
+    if not isinstance(path, six.string_types) or \
+            not os.path.exists(get_inverted_index_path(path) + '.json'):
+        return None
+
+    index = InvertedIndex.load(get_inverted_index_path(path))
+    stat = os.stat(path)
+    if index.metadata.get('size') != stat.st_size or index.metadata.get('mtime') != stat.st_mtime:
+        return None
+    return index
@@ -0,0 +1,490 @@
+"""
+This module contains a small query language for sequences of words, in the style of the Corpus Query Language.
+
+A query is a sequence of word patterns in brackets, each a condition on the attributes of a word: word (the
+word form), lemma (the base forms of its morphemes), pos and gloss (the glosses of its morphemes). Values are
+regular expressions which must match a whole value, and a word with several lemmas or glosses matches if any
+of them does. Conditions are combined with & (and), | (or) and ! (not), and [] matches any word. Patterns,
+and groups of patterns in parentheses, may be repeated with ?, *, + and {n,m}, and groups may hold
+alternatives separated by |:
+
+    [pos="ADJ"] []{0,2} [pos="N" & gloss="PL"]
+    [lemma="hus"] ([pos="ADV"] | [pos="ADJ"]+)
+
+Queries are compiled to a nondeterministic finite automaton, which is run over the words of a phrase,
+tracking where each match started. Every phrase gives its leftmost longest, non-overlapping matches.
+When an inverted index is available, only the phrases holding the rarest word required by the query
+are searched.
+"""
+import re
+from collections import namedtuple
+
+from typecraft_python.parsing.index import load_offset_index, iter_indexed_texts
+from typecraft_python.parsing.streaming import iter_texts
+from typecraft_python.search.index import get_word_terms, load_inverted_index
+
+"""
+The attributes of the query language, and the fields of typecraft_python.search.index they correspond to.
+"""
+ATTRIBUTE_FIELDS = {
+    'word': 'form',
+    'lemma': 'lemma',
+    'pos': 'pos',
+    'gloss': 'gloss'
+}
+
+_TOKEN = re.compile(r'\s*(?:("(?:[^"\\]|\\.)*")|(!=|[\[\]()|&!=?*+{},])|(\d+)|([A-Za-z_]\w*))', re.UNICODE)
+
+_REGEX_CHARACTERS = set('.^$*+?{}[]\\|()')
+
+"""
+A match of a query: the text and phrase number, the (start, end) word indices of the match, the end being
+exclusive, and the matched Word objects.
+"""
+QueryMatch = namedtuple('QueryMatch', ['text', 'phrase', 'span', 'words'])
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def _tokenize(query):
+    tokens = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = _TOKEN.match(query, position)
+        if match is None:
+            raise QuerySyntaxError("Invalid query '%s': unexpected character at position %d" % (query, position))
+        string, symbol, number, name = match.groups()
+        if string is not None:
+            tokens.append(('string', re.sub(r'\\(.)', r'\1', string[1:-1])))
+        elif symbol is not None:
+            tokens.append(('symbol', symbol))
+        elif number is not None:
+            tokens.append(('number', int(number)))
+        else:
+            tokens.append(('name', name))
+        position = match.end()
+    return tokens
+
+
+class _Parser(object):
+    """
+    Parses a query into a tree of tuples:
+
+        ('word', condition), ('sequence', [trees]), ('alternatives', [trees]), ('repeat', tree, min, max)
+
+    where a condition is one of
+
+        ('any',), ('compare', attribute, value, negated), ('and', [conditions]), ('or', [conditions]),
+        ('not', condition)
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.tokens = _tokenize(query)
+        self.position = 0
+
+    def error(self, message):
+        return QuerySyntaxError("Invalid query '%s': %s" % (self.query, message))
+
+    def peek(self, kind=None, value=None):
+        if self.position >= len(self.tokens):
+            return None
+        token = self.tokens[self.position]
+        if (kind is not None and token[0] != kind) or (value is not None and token[1] != value):
+            return None
+        return token
+
+    def take(self, kind=None, value=None):
+        token = self.peek(kind, value)
+        if token is None:
+            found = self.tokens[self.position][1] if self.position < len(self.tokens) else 'end of query'
+            raise self.error("expected %s, found '%s'" % (value or kind, found))
+        self.position += 1
+        return token
+
+    def parse(self):
+        tree = self.parse_alternatives()
+        if self.peek() is not None:
+            raise self.error("unexpected '%s'" % (self.peek()[1],))
+        return tree
+
+    def parse_alternatives(self):
+        alternatives = [self.parse_sequence()]
+        while self.peek('symbol', '|'):
+            self.take()
+            alternatives.append(self.parse_sequence())
+        return alternatives[0] if len(alternatives) == 1 else ('alternatives', alternatives)
+
+    def parse_sequence(self):
+        elements = []
+        while self.peek('symbol', '[') or self.peek('symbol', '('):
+            elements.append(self.parse_element())
+        if not elements:
+            raise self.error("expected a word pattern")
+        return elements[0] if len(elements) == 1 else ('sequence', elements)
+
+    def parse_element(self):
+        if self.peek('symbol', '('):
+            self.take()
+            atom = self.parse_alternatives()
+            self.take('symbol', ')')
+        else:
+            self.take('symbol', '[')
+            condition = ('any',) if self.peek('symbol', ']') else self.parse_or()
+            self.take('symbol', ']')
+            atom = ('word', condition)
+
+        if self.peek('symbol', '?'):
+            self.take()
+            return 'repeat', atom, 0, 1
+        if self.peek('symbol', '*'):
+            self.take()
+            return 'repeat', atom, 0, None
+        if self.peek('symbol', '+'):
+            self.take()
+            return 'repeat', atom, 1, None
+        if self.peek('symbol', '{'):
+            self.take()
+            minimum = maximum = self.take('number')[1]
+            if self.peek('symbol', ','):
+                self.take()
+                maximum = self.take('number')[1] if self.peek('number') else None
+            self.take('symbol', '}')
+            if maximum is not None and maximum < minimum:
+                raise self.error("invalid repetition {%d,%d}" % (minimum, maximum))
+            return 'repeat', atom, minimum, maximum
+        return atom
+
+    def parse_or(self):
+        conditions = [self.parse_and()]
+        while self.peek('symbol', '|'):
+            self.take()
+            conditions.append(self.parse_and())
+        return conditions[0] if len(conditions) == 1 else ('or', conditions)
+
+    def parse_and(self):
+        conditions = [self.parse_unary()]
+        while self.peek('symbol', '&'):
+            self.take()
+            conditions.append(self.parse_unary())
+        return conditions[0] if len(conditions) == 1 else ('and', conditions)
+
+    def parse_unary(self):
+        if self.peek('symbol', '!'):
+            self.take()
+            return 'not', self.parse_unary()
+        if self.peek('symbol', '('):
+            self.take()
+            condition = self.parse_or()
+            self.take('symbol', ')')
+            return condition
+
+        attribute = self.take('name')[1]
+        if attribute not in ATTRIBUTE_FIELDS:
+            raise self.error("unknown attribute '%s'" % (attribute,))
+        negated = self.peek('symbol', '!=') is not None
+        if not negated:
+            self.take('symbol', '=')
+        else:
+            self.take()
+        return 'compare', attribute, self.take('string')[1], negated
+
+
+def parse_query(query):
+    """
+    Parses a query. See the module documentation.
+
+    :param query: A string.
+    :return: A tree of tuples.
+    """
+    return _Parser(query).parse()
+
+
+def _compile_condition(condition):
+    """
+    Compiles a condition to a function of the terms of a word, see get_word_terms.
+    """
+    kind = condition[0]
+    if kind == 'any':
+        return lambda terms: True
+    if kind == 'compare':
+        _, attribute, value, negated = condition
+        field = ATTRIBUTE_FIELDS[attribute]
+        if _is_literal(value):
+            matches = (lambda terms: value in terms[field])
+        else:
+            pattern = re.compile(u'(?:%s)\\Z' % (value,), re.UNICODE)
+            matches = (lambda terms: any(pattern.match(term) for term in terms[field]))
+        return (lambda terms: not matches(terms)) if negated else matches
+    if kind == 'not':
+        inner = _compile_condition(condition[1])
+        return lambda terms: not inner(terms)
+
+    children = [_compile_condition(child) for child in condition[1]]
+    if kind == 'and':
+        return lambda terms: all(child(terms) for child in children)
+    return lambda terms: any(child(terms) for child in children)
+
+
+def _is_literal(value):
+    return not (_REGEX_CHARACTERS & set(value))
+
+
+class _Automaton(object):
+    """
+    A Thompson NFA. Every state has a list of (condition number, state) transitions on words, and
+    a list of states reached without reading a word.
+    """
+
+    def __init__(self):
+        self.conditions = []
+        self.transitions = []
+        self.epsilons = []
+
+    def add_state(self):
+        self.transitions.append([])
+        self.epsilons.append([])
+        return len(self.transitions) - 1
+
+    def build(self, tree):
+        """
+        Adds the states of a tree.
+
+        :return: A tuple of the start state and the accepting state of the tree.
+        """
+        kind = tree[0]
+        if kind == 'word':
+            start, end = self.add_state(), self.add_state()
+            self.conditions.append(_compile_condition(tree[1]))
+            self.transitions[start].append((len(self.conditions) - 1, end))
+            return start, end
+
+        if kind == 'sequence':
+            start, end = self.build(tree[1][0])
+            for child in tree[1][1:]:
+                child_start, child_end = self.build(child)
+                self.epsilons[end].append(child_start)
+                end = child_end
+            return start, end
+
+        if kind == 'alternatives':
+            start, end = self.add_state(), self.add_state()
+            for child in tree[1]:
+                child_start, child_end = self.build(child)
+                self.epsilons[start].append(child_start)
+                self.epsilons[child_end].append(end)
+            return start, end
+
+        # Repetitions are expanded to `minimum` copies, followed by optional copies, or by a loop if unbounded
+        _, child, minimum, maximum = tree
+        start = end = self.add_state()
+        for _ in range(minimum):
+            child_start, child_end = self.build(child)
+            self.epsilons[end].append(child_start)
+            end = child_end
+
+        if maximum is None:
+            child_start, child_end = self.build(child)
+            loop_end = self.add_state()
+            self.epsilons[end].extend([child_start, loop_end])
+            self.epsilons[child_end].extend([child_start, loop_end])
+            return start, loop_end
+
+        final = self.add_state()
+        for _ in range(maximum - minimum):
+            child_start, child_end = self.build(child)
+            self.epsilons[end].extend([child_start, final])
+            end = child_end
+        self.epsilons[end].append(final)
+        return start, final
+
+    def get_closures(self):
+        """
+        Gets the states reachable from every state without reading a word, including the state itself.
+        Only the states with transitions on words, and the accepting state, are kept.
+        """
+        closures = []
+        for state in range(len(self.transitions)):
+            reached = set([state])
+            stack = [state]
+            while stack:
+                for target in self.epsilons[stack.pop()]:
+                    if target not in reached:
+                        reached.add(target)
+                        stack.append(target)
+            closures.append(reached)
+        return closures
+
+
+class TokenQuery(object):
+    """
+    A compiled query. See the module documentation.
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.tree = parse_query(query)
+
+        automaton = _Automaton()
+        start, self.accepting_state = automaton.build(self.tree)
+        self.conditions = automaton.conditions
+        closures = automaton.get_closures()
+        # Only states with transitions on words, or the accepting state, need to be tracked
+        self._closures = [
+            sorted(state for state in closure if automaton.transitions[state] or state == self.accepting_state)
+            for closure in closures
+        ]
+        self._start_closure = self._closures[start]
+        self._transitions = [
+            [(condition, self._closures[target]) for condition, target in transitions]
+            for transitions in automaton.transitions
+        ]
+
+    def _find_first_span(self, words, terms, begin):
+        """
+        Finds the leftmost longest match starting at or after `begin`, running the automaton from `begin`.
+        A match is started at every position until a match is found. Of the threads of the automaton in the
+        same state, only the one with the earliest start is kept, as it gives the leftmost match.
+        """
+        # The states the automaton is in, with the earliest start of a match reaching each
+        current = {}
+        span = None
+        for position in range(begin, len(words) + 1):
+            if span is None:
+                for state in self._start_closure:
+                    if state not in current:
+                        current[state] = position
+
+            start = current.get(self.accepting_state)
+            if start is not None and start < position and (span is None or start <= span[0]):
+                span = (start, position)
+            if span is not None:
+                # Only matches starting at or before the match found can be leftmost
+                current = dict((state, start) for state, start in current.items() if start <= span[0])
+
+            if position == len(words) or not current:
+                break
+
+            results = {}
+            following = {}
+            for state, start in current.items():
+                for condition, targets in self._transitions[state]:
+                    if condition not in results:
+                        if terms[position] is None:
+                            terms[position] = get_word_terms(words[position])
+                        results[condition] = self.conditions[condition](terms[position])
+                    if results[condition]:
+                        for target in targets:
+                            if following.get(target, position + 1) > start:
+                                following[target] = start
+            current = following
+        return span
+
+    def find_spans(self, words):
+        """
+        Finds the leftmost longest, non-overlapping matches of the query in a sequence of words. Each match is
+        searched for from the end of the previous one, so every word is read about once.
+
+        :param words: A list of Word objects.
+        :return: A list of (start, end) tuples of word indices, the end being exclusive. Empty matches are left out.
+        """
+        # The terms of each word are only computed if a condition is evaluated on the word
+        terms = [None] * len(words)
+        spans = []
+        position = 0
+        while position < len(words):
+            span = self._find_first_span(words, terms, position)
+            if span is None:
+                break
+            spans.append(span)
+            position = span[1]
+        return spans
+
+    def get_required_terms(self):
+        """
+        Gets the terms every match of the query has a word with, as (field, term) tuples of the inverted index.
+        """
+        return _get_required_terms(self.tree)
+
+    def get_candidate_phrases(self, inverted_index):
+        """
+        Gets the phrases which may hold matches, from the postings of the rarest term required by the query.
+
+        :param inverted_index: An InvertedIndex.
+        :return: A set of (text number, phrase number) tuples, or None if the query requires no term.
+        """
+        required = self.get_required_terms()
+        if not required:
+            return None
+        field, term = min(required, key=lambda required_term: inverted_index.get_frequency(*required_term))
+        texts, phrases, _ = inverted_index.get_locations(inverted_index.get_postings(field, term))
+        return set(zip(texts.tolist(), phrases.tolist()))
+
+
+def _get_required_terms(tree):
+    kind = tree[0]
+    if kind == 'word':
+        condition = tree[1]
+        conditions = condition[1] if condition[0] == 'and' else [condition]
+        return [
+            (ATTRIBUTE_FIELDS[child[1]], child[2]) for child in conditions
+            if child[0] == 'compare' and not child[3] and _is_literal(child[2])
+        ]
+    if kind == 'sequence':
+        return [term for child in tree[1] for term in _get_required_terms(child)]
+    if kind == 'repeat' and tree[2] > 0:
+        return _get_required_terms(tree[1])
+    return []
+
+
+def _search_numbered_texts(query, numbered_texts, candidates):
+    for text_number, text in numbered_texts:
+        for phrase_number, phrase in enumerate(text.phrases):
+            if candidates is not None and (text_number, phrase_number) not in candidates:
+                continue
+            for start, end in query.find_spans(phrase.words):
+                yield QueryMatch(text_number, phrase_number, (start, end), phrase.words[start:end])
+
+
+def search_texts(query, texts, inverted_index=None):
+    """
+    Searches texts for matches of a query.
+
+    :param query: A query string or a TokenQuery.
+    :param texts: An iterable of Text objects, such as a Corpus.
+    :param inverted_index: An optional InvertedIndex of the texts. If given, only the phrases holding
+                           the rarest term required by the query are searched.
+    :return: A generator of QueryMatch tuples, in order.
+    """
+    if not isinstance(query, TokenQuery):
+        query = TokenQuery(query)
+    candidates = query.get_candidate_phrases(inverted_index) if inverted_index is not None else None
+    return _search_numbered_texts(query, enumerate(texts), candidates)
+
+
+def search_file(query, source):
+    """
+    Searches a Typecraft-xml document for matches of a query, one text at a time.
+
+    If the source is a path with an up to date inverted index, only the phrases holding the rarest term required
+    by the query are searched, and if it also has an offset index, only the texts holding those phrases are read.
+
+    :param query: A query string or a TokenQuery.
+    :param source: A file path or a file object.
+    :return: A generator of QueryMatch tuples, in order.
+    """
+    if not isinstance(query, TokenQuery):
+        query = TokenQuery(query)
+
+    inverted_index = load_inverted_index(source)
+    candidates = query.get_candidate_phrases(inverted_index) if inverted_index is not None else None
+    offset_index = load_offset_index(source) if candidates is not None else None
+
+    if offset_index is not None:
+        texts = iter_indexed_texts(source, offset_index, set(text_number for text_number, _ in candidates))
+    else:
+        texts = enumerate(iter_texts(source))
+    return _search_numbered_texts(query, texts, candidates)
@@ -0,0 +1,321 @@
+"""
+This module contains a suffix array of the phrases and translations of a corpus, for finding arbitrary
+substrings, such as partial morphemes, without scanning the corpus.
+
+The phrases and translations are concatenated, separated by NUL characters, into a single array of
+code points, and the suffix array lists the start of every suffix of it in sorted order. The suffixes
+starting with a substring are adjacent in the suffix array, and are found by binary search, in
+O(m log n) time for a substring of length m. Each match is mapped back to its phrase through the
+offsets of the phrases in the concatenation:
+
+    suffix_array = SuffixArray.build(texts)
+    for match in suffix_array.find(u"ɔba"):
+        ...
+
+The arrays are saved as .npy files in a directory, and are memory-mapped when loaded, so a suffix array
+can be searched without reading it into memory.
+"""
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+import six
+
+from typecraft_python.parsing.streaming import iter_texts
+
+"""
+The attributes of a phrase which are indexed.
+"""
+FIELDS = ['phrase', 'translation', 'translation2']
+
+"""
+The suffix array of a file is stored in a directory at the path of the file with this extension added.
+"""
+SUFFIX_ARRAY_EXTENSION = '.suffix'
+
+_SEPARATOR = u'\x00'
+
+_ARRAYS = ['codes', 'suffixes', 'segment_starts', 'segment_texts', 'segment_phrases', 'segment_fields']
+
+_METADATA_FILE_NAME = 'metadata.json'
+
+"""
+A match of a substring: the text and phrase number, the field it was found in, and its offset in the field.
+"""
+SubstringMatch = namedtuple('SubstringMatch', ['text', 'phrase', 'field', 'offset'])
+
+
+def _to_codes(string):
+    return np.frombuffer(string.encode('utf-32-le'), dtype=np.uint32)
+
+
+def _from_codes(codes):
+    return np.asarray(codes, dtype=np.uint32).tobytes().decode('utf-32-le')
+
+
+def build_suffixes(codes):
+    """
+    Sorts the suffixes of an array by prefix doubling: the suffixes are ranked by their first k characters,
+    and then repeatedly by the ranks of their first k and next k characters, doubling k, until all ranks
+    are distinct. As many characters as fit in a 64-bit key are compared in the first round.
+
+    :param codes: A numpy array of integers.
+    :return: A numpy array of the start of every suffix, in sorted order.
+    """
+    length = len(codes)
+    if length == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    def following(ranks, step):
+        # The ranks of the suffixes `step` characters later, shifted by 1 so that 0 is past the end
+        shifted = np.zeros(length, dtype=np.int64)
+        shifted[:max(length - step, 0)] = ranks[step:] + 1
+        return shifted
+
+    def rank(keys):
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+        ranks = np.empty(length, dtype=np.int64)
+        ranks[order] = np.concatenate([[0], np.cumsum(sorted_keys[1:] != sorted_keys[:-1])])
+        return order, ranks
+
+    # Dense ranks of the characters, packed `step` to a key
+    order, ranks = rank(codes)
+    base = int(ranks[order[-1]]) + 2
+    step = max(1, int(62 // np.log2(base)))
+    keys = ranks.copy()
+    for offset in range(1, step):
+        keys = keys * base + following(ranks, offset)
+    order, ranks = rank(keys)
+
+    while ranks[order[-1]] < length - 1:
+        order, ranks = rank(ranks * (length + 1) + following(ranks, step))
+        step *= 2
+    return order
+
+
+class SuffixArray(object):
+    """
+    A suffix array of the phrases and translations of a corpus. See the module documentation.
+
+    A segment is the value of a field of a phrase. Segment i starts at segment_starts[i] in the
+    concatenation, and belongs to phrase segment_phrases[i] of text segment_texts[i].
+    """
+
+    def __init__(self, codes, suffixes, segment_starts, segment_texts, segment_phrases, segment_fields):
+        self.codes = codes
+        self.suffixes = suffixes
+        self.segment_starts = segment_starts
+        self.segment_texts = segment_texts
+        self.segment_phrases = segment_phrases
+        self.segment_fields = segment_fields
+
+    def __len__(self):
+        return len(self.suffixes)
+
+    @classmethod
+    def build(cls, texts, fields=FIELDS):
+        """
+        Builds the suffix array of the phrases of some texts.
+
+        :param texts: An iterable of Text objects, such as a Corpus.
+        :param fields: The attributes of the phrases to index.
+        :return: A SuffixArray.
+        """
+        segments = []
+        segment_starts, segment_texts, segment_phrases, segment_fields = [], [], [], []
+        position = 0
+        for text_number, text in enumerate(texts):
+            for phrase_number, phrase in enumerate(text.phrases):
+                for field in fields:
+                    value = (getattr(phrase, field) or u"").replace(_SEPARATOR, u"")
+                    if not value:
+                        continue
+                    segments.append(value)
+                    segment_starts.append(position)
+                    segment_texts.append(text_number)
+                    segment_phrases.append(phrase_number)
+                    segment_fields.append(FIELDS.index(field))
+                    position += len(value) + 1
+
+        codes = _to_codes(u"".join(segment + _SEPARATOR for segment in segments))
+        suffixes = build_suffixes(codes)
+        index_type = np.int32 if len(codes) < np.iinfo(np.int32).max else np.int64
+        return cls(
+            codes,
+            suffixes.astype(index_type),
+            np.array(segment_starts, dtype=np.int64),
+            np.array(segment_texts, dtype=np.int32),
+            np.array(segment_phrases, dtype=np.int32),
+            np.array(segment_fields, dtype=np.int8)
+        )
+
+    def save(self, directory, metadata=None):
+        """
+        Saves the arrays as .npy files in a directory, which is created if it does not exist.
+
+        :param directory: A directory path.
+        :param metadata: An optional dict stored with the arrays.
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        for name in _ARRAYS:
+            np.save(os.path.join(directory, name + '.npy'), getattr(self, name))
+        with open(os.path.join(directory, _METADATA_FILE_NAME), 'w') as _file:
+            json.dump(metadata or {}, _file)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Loads a suffix array saved with `save`.
+
+        :param directory: A directory path.
+        :param mmap: If true, the arrays are memory-mapped instead of read.
+        :return: A SuffixArray.
+        """
+        arrays = [np.load(os.path.join(directory, name + '.npy'), mmap_mode='r' if mmap else None) for name in _ARRAYS]
+        suffix_array = cls(*arrays)
+        with open(os.path.join(directory, _METADATA_FILE_NAME)) as _file:
+            suffix_array.metadata = json.load(_file)
+        return suffix_array
+
+    def _compare(self, position, query):
+        """
+        Compares the suffix starting at position, cut to the length of the query, with the query.
+
+        :return: -1, 0 or 1.
+        """
+        window = self.codes[position:position + len(query)]
+        differences = np.flatnonzero(window != query[:len(window)])
+        if len(differences) > 0:
+            return -1 if window[differences[0]] < query[differences[0]] else 1
+        return 0 if len(window) == len(query) else -1
+
+    def _get_range(self, query):
+        """
+        Gets the range of the suffixes starting with the query by binary search.
+        """
+        query = _to_codes(query)
+        low, high = 0, len(self.suffixes)
+        while low < high:
+            middle = (low + high) // 2
+            if self._compare(self.suffixes[middle], query) < 0:
+                low = middle + 1
+            else:
+                high = middle
+        start, high = low, len(self.suffixes)
+        while low < high:
+            middle = (low + high) // 2
+            if self._compare(self.suffixes[middle], query) <= 0:
+                low = middle + 1
+            else:
+                high = middle
+        return start, low
+
+    def count(self, query):
+        """
+        Counts the occurrences of a substring, without looking them up.
+
+        :param query: A non-empty string.
+        :return: The number of occurrences.
+        """
+        if not query or _SEPARATOR in query:
+            return 0
+        start, end = self._get_range(query)
+        return end - start
+
+    def find(self, query, prefix=False):
+        """
+        Finds the occurrences of a substring.
+
+        :param query: A non-empty string.
+        :param prefix: If true, only occurrences at the start of a phrase or translation are found.
+        :return: A list of SubstringMatch tuples, in corpus order.
+        """
+        if not query or _SEPARATOR in query:
+            return []
+        start, end = self._get_range(query)
+        positions = np.sort(np.asarray(self.suffixes[start:end], dtype=np.int64))
+        segments = np.searchsorted(self.segment_starts, positions, side='right') - 1
+        offsets = positions - self.segment_starts[segments]
+        if prefix:
+            segments, offsets = segments[offsets == 0], offsets[offsets == 0]
+
+        return [
+            SubstringMatch(int(self.segment_texts[segment]), int(self.segment_phrases[segment]),
+                           FIELDS[self.segment_fields[segment]], int(offset))
+            for segment, offset in zip(segments, offsets)
+        ]
+
+    def get_segment(self, text_number, phrase_number, field):
+        """
+        Gets the value of a field of a phrase from the concatenation. The segments are ordered by text,
+        phrase and field, so the segment is found by binary search.
+
+        :return: A string, which is empty if the phrase has no value for the field.
+        """
+        low, high = 0, len(self.segment_starts)
+        for keys, key in [(self.segment_texts, text_number), (self.segment_phrases, phrase_number),
+                          (self.segment_fields, FIELDS.index(field))]:
+            low, high = low + np.searchsorted(keys[low:high], key), low + np.searchsorted(keys[low:high], key, 'right')
+        if low == high:
+            return u""
+        end = self.segment_starts[low + 1] if low + 1 < len(self.segment_starts) else len(self.codes)
+        return _from_codes(self.codes[self.segment_starts[low]:end - 1])
+
+
+def scan_substring(query, source, prefix=False, fields=FIELDS):
+    """
+    Finds the occurrences of a substring by reading a Typecraft-xml document one text at a time.
+    Gives the same matches as SuffixArray.find.
+
+    :param query: A non-empty string.
+    :param source: A file path or a file object.
+    :param prefix: If true, only occurrences at the start of a phrase or translation are found.
+    :param fields: The attributes of the phrases to search.
+    :return: A generator of (SubstringMatch, string) tuples, the string being the value the substring was found in.
+    """
+    for text_number, text in enumerate(iter_texts(source)):
+        for phrase_number, phrase in enumerate(text.phrases):
+            for field in fields:
+                value = (getattr(phrase, field) or u"").replace(_SEPARATOR, u"")
+                offset = value.find(query) if query else -1
+                while offset != -1 and not (prefix and offset > 0):
+                    yield SubstringMatch(text_number, phrase_number, field, offset), value
+                    offset = value.find(query, offset + 1)
+
+
+def get_suffix_array_path(path):
+    return path + SUFFIX_ARRAY_EXTENSION
+
+
+def write_suffix_array(path):
+    """
+    Builds the suffix array of the phrases and translations of a file, and writes it next to the file.
+
+    :param path: A file path.
+    :return: The SuffixArray.
+    """
+    stat = os.stat(path)
+    suffix_array = SuffixArray.build(iter_texts(path))
+    suffix_array.save(get_suffix_array_path(path), {'size': stat.st_size, 'mtime': stat.st_mtime})
+    return suffix_array
+
+
+def load_suffix_array(path):
+    """
+    Loads the memory-mapped suffix array of a file, if it exists and the file has not changed since it was built.
+
+    :param path: A file path. Anything else, such as a file object, has no suffix array.
+    :return: A SuffixArray, or None.
+    """
+    if not isinstance(path, six.string_types) or \
+            not os.path.exists(os.path.join(get_suffix_array_path(path), _METADATA_FILE_NAME)):
+        return None
+
+    suffix_array = SuffixArray.load(get_suffix_array_path(path))
+    stat = os.stat(path)
+    if suffix_array.metadata.get('size') != stat.st_size or suffix_array.metadata.get('mtime') != stat.st_mtime:
+        return None
+    return suffix_array
@@ -1,16 +1,28 @@
-
-# Define these below batch to avoid circular dependency
-from typecraft_python.integrations.obt.tagger import ObtTagger
-from typecraft_python.integrations.nltk.tagger import NltkTagger
-from typecraft_python.integrations.treetagger import TreeTagger
+import importlib
+import itertools
+import multiprocessing
+from collections import OrderedDict, deque
 
 import six
 
 
 def batch(iterable, n=1):
-    length = len(iterable)
-    for next_index in range(0, length, n):
-        yield iterable[next_index:min(next_index + n, length)]
+    """
+    Splits an iterable into batches of n items. Sequences are split into slices, and
+    any other iterable is consumed lazily, into lists.
+    """
+    if hasattr(iterable, '__len__') and hasattr(iterable, '__getitem__'):
+        length = len(iterable)
+        for next_index in range(0, length, n):
+            yield iterable[next_index:min(next_index + n, length)]
+        return
+
+    iterator = iter(iterable)
+    while True:
+        next_batch = list(itertools.islice(iterator, n))
+        if not next_batch:
+            return
+        yield next_batch
 
 
 # Taken from https://stackoverflow.com/questions/2130016/splitting-a-list-into-n-parts-of-approximately-equal-length
@@ -19,24 +31,207 @@ def split(a, n):
     return (a[i * k + min(i, m):(i + 1) * k + min(i + 1, m)] for i in range(n))
 
 
-TAGGER_TRANSLATIONS = {
-    'tree': TreeTagger,
-    'obt': ObtTagger,
-    'nltk': NltkTagger
+def imap_ordered(function, tasks, jobs=1, max_pending=None):
+    """
+    Applies a function to the arguments of a number of tasks, in a pool of `jobs` worker processes.
+
+    The results are yielded in the order of the tasks, regardless of the order they finish in.
+    Tasks are read lazily, and at most `max_pending` tasks are in flight at any time.
+
+    :param function: A picklable function taking a single argument.
+    :param tasks: An iterable of (key, argument) tuples. Only the argument is sent to the workers.
+    :param jobs: The number of worker processes. If 1 or less, the tasks are run in this process.
+    :param max_pending: The maximum number of tasks in flight. Defaults to twice `jobs`.
+    :return: A generator of (key, result) tuples.
+    """
+    if jobs <= 1:
+        for key, argument in tasks:
+            yield key, function(argument)
+        return
+
+    max_pending = max_pending or 2 * jobs
+    pool = multiprocessing.Pool(jobs)
+    pending = deque()
+    try:
+        for key, argument in tasks:
+            pending.append((key, pool.apply_async(function, (argument,))))
+            if len(pending) >= max_pending:
+                key, result = pending.popleft()
+                yield key, result.get()
+        while pending:
+            key, result = pending.popleft()
+            yield key, result.get()
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+
+"""
+The built-in taggers, given as "module:attribute" paths. The tagger modules pull in heavy
+dependencies (nltk, treetaggerwrapper), so a module is only imported once its tagger is requested.
+"""
+TAGGER_REGISTRY = {
+    'tree': 'typecraft_python.integrations.treetagger.tagger:TreeTagger',
+    'obt': 'typecraft_python.integrations.obt.tagger:ObtTagger',
+    'nltk': 'typecraft_python.integrations.nltk.tagger:NltkTagger'
 }
 
+"""
+Abbreviations accepted by get_tagger_by_name. A name containing the first
+string of a pair is resolved to the tagger named by the second.
+"""
+TAGGER_ABBREVIATIONS = [
+    ('tree', 'tree'),
+    ('nl', 'nltk'),
+    ('ob', 'obt')
+]
+
+"""
+Third party packages can provide taggers by declaring entry points in this group, e.g.
+
+    entry_points={
+        'typecraft_python.taggers': ['mytagger = mypackage.tagger:MyTagger']
+    }
+"""
+TAGGER_ENTRY_POINT_GROUP = 'typecraft_python.taggers'
+
+_loaded_taggers = {}
+
+
+def register_tagger(name, tagger):
+    """
+    Registers a tagger under a name, making it available through get_tagger_by_name.
+
+    :param name: The name of the tagger.
+    :param tagger: A TypecraftTagger class, or a "module:attribute" path to one.
+    :return: Nothing
+    """
+    assert isinstance(name, six.string_types)
+
+    name_lower = name.lower()
+    _loaded_taggers.pop(name_lower, None)
+    if isinstance(tagger, six.string_types):
+        TAGGER_REGISTRY[name_lower] = tagger
+    else:
+        TAGGER_REGISTRY[name_lower] = "%s:%s" % (tagger.__module__, tagger.__name__)
+        _loaded_taggers[name_lower] = tagger
+
+
+def _iter_tagger_entry_points():
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        try:
+            import pkg_resources
+        except ImportError:
+            return []
+        return list(pkg_resources.iter_entry_points(TAGGER_ENTRY_POINT_GROUP))
+
+    all_entry_points = entry_points()
+    if hasattr(all_entry_points, 'select'):
+        return list(all_entry_points.select(group=TAGGER_ENTRY_POINT_GROUP))
+    return list(all_entry_points.get(TAGGER_ENTRY_POINT_GROUP, []))
+
+
+def get_tagger_names():
+    """
+    Returns the names of all available taggers, including the ones provided through entry points.
+    Does not import any tagger.
+
+    :return: A sorted list of names.
+    """
+    names = set(TAGGER_REGISTRY.keys())
+    names.update(entry_point.name.lower() for entry_point in _iter_tagger_entry_points())
+    return sorted(names)
+
+
+def _load_tagger(name):
+    tagger = _loaded_taggers.get(name)
+    if tagger is None:
+        module_name, attribute = TAGGER_REGISTRY[name].split(':')
+        tagger = getattr(importlib.import_module(module_name), attribute)
+        _loaded_taggers[name] = tagger
+    return tagger
+
 
 def get_tagger_by_name(name):
+    """
+    Gets a tagger class by its name, importing the module of the tagger if necessary.
+
+    The name is looked up among the built-in and registered taggers, then among the
+    abbreviations in TAGGER_ABBREVIATIONS, and finally among the taggers provided
+    through the `typecraft_python.taggers` entry point group.
+
+    :param name: The name of the tagger, e.g. 'nltk' or 'tree'.
+    :return: The tagger class.
+    """
     assert isinstance(name, six.string_types)
 
     name_lower = name.lower()
-    if 'tree' in name_lower:
-        return TreeTagger
-    if 'nl' in name_lower:
-        return NltkTagger
-    if 'ob' in name_lower:
-        return ObtTagger
+    if name_lower in TAGGER_REGISTRY:
+        return _load_tagger(name_lower)
+
+    for abbreviation, tagger_name in TAGGER_ABBREVIATIONS:
+        if abbreviation in name_lower:
+            return _load_tagger(tagger_name)
+
+    for entry_point in _iter_tagger_entry_points():
+        if entry_point.name.lower() == name_lower:
+            register_tagger(name_lower, entry_point.load())
+            return _loaded_taggers[name_lower]
 
     raise ValueError("Tagger %s not found" % (name,))
 
 
+def group_texts_by_language(texts):
+    """
+    Groups texts by their language.
+
+    :param texts: An iterable of Text objects.
+    :return: An OrderedDict mapping each language to a list of its texts, in order of first occurrence.
+    """
+    groups = OrderedDict()
+    for text in texts:
+        groups.setdefault(text.language, []).append(text)
+    return groups
+
+
+def get_tagger_for_language(tagger_name, language, taggers):
+    """
+    Gets a warm tagger for a language from a dict of taggers, creating and warming it up if necessary.
+
+    :param tagger_name: The name of the tagger. See get_tagger_by_name.
+    :param language: The language the tagger will be used for.
+    :param taggers: A dict mapping languages to tagger instances. New taggers are added to it.
+    :return: A TypecraftTagger instance.
+    """
+    tagger = taggers.get(language)
+    if tagger is None:
+        tagger = get_tagger_by_name(tagger_name)()
+        tagger.warm_up(language)
+        taggers[language] = tagger
+    return tagger
+
+
+def tag_texts_by_language(texts, tagger_name, taggers=None):
+    """
+    Tags texts, grouped by language. One tagger is created per language, and all
+    phrases of the texts of a language are tagged in a single call.
+
+    :param texts: A list of Text objects.
+    :param tagger_name: The name of the tagger. See get_tagger_by_name.
+    :param taggers: An optional dict mapping languages to tagger instances, which lets
+                    taggers be reused across calls.
+    :return: The texts.
+    """
+    if taggers is None:
+        taggers = {}
+
+    for language, group in group_texts_by_language(texts).items():
+        tagger = get_tagger_for_language(tagger_name, language, taggers)
+        tagger.tag_phrases([phrase for text in group for phrase in text.phrases], language)
+    return texts